@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+
+import os
+import argparse
+import rvvts
+
+parser = argparse.ArgumentParser(
+    description="Convert code blocks and machine states (e.g. 00_orig_code_block.json, 99_res_end_dut_mstate.bin) "
+    + "between json and compact binary format",
+    epilog="(C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz",
+)
+parser.add_argument(
+    "dirs", nargs="+", help="directories containing artifacts (searched recursively)"
+)
+parser.add_argument(
+    "-f",
+    "--format",
+    default="bin",
+    choices=list(rvvts.ARTIFACT_FORMATS),
+    help="target format",
+)
+parser.add_argument(
+    "--remove", action="store_true", help="remove converted source files"
+)
+args = parser.parse_args()
+
+converted = 0
+for top in args.dirs:
+    for dir, subdirs, files in os.walk(top):
+        sources = rvvts.convert_artifacts(dir, args.format, remove=args.remove)
+        for src in sources:
+            print(src)
+        converted += len(sources)
+print(f"{converted} files converted to {args.format}")
@@ -26,15 +26,31 @@ config = dict(
     # force frm to specific value (keep empty for random)
     RVFProgramGenerator_force_float_frm = "",
 
+    # exclusion of known-bug patterns at generation time (see rvvts/ISG_Exclusion.py)
+    # fragments with instructions matching a rule (mnemonic, operands, vtype) are re-generated
+    # (at most ProgramGenerator_exclusion_retries times, then dropped and re-drawn; blocks still
+    # below min_fragments are counted as shortfalls in ExclusionProfile.get_stats)
+    # profile: None (disabled), json file (list of rules), list of rules or ExclusionProfile
+    # (e.g. from buckets of a repro corpus: repro_corpus.py --exclusion-profile)
+    ProgramGenerator_exclusion_profile = None,
+    ProgramGenerator_exclusion_retries = 100,
+
     # EXPERIMENTAL: ENABLING THIS MAKES NOT MUCH SENSE YET!
     CovGuidedFuzzerGen_allow_exceptions = False,
 
     # only show differences in machine state diff
     CompareRunner_mstate_diff_full = False,
 
+    # compare fingerprints of raw dumps first (machine states are only extracted and
+    # diffed on mismatch)
+    CompareRunner_fingerprint = True,
+
     # keep memory dumps (consumes significant amount of harddrive space)
     DumpFile_keep_dumpfile = False,
 
+    # page size for per-page memory digests (xmempages/dmempages in machine state)
+    DumpFile_page_size = 4096,
+
     # ARA may hang on test case execution (running clock, but no instructions retired)
     # with this we can control, whether we count such cases as TIMEOUT or ERROR (with lastPC-1)
     # (handling it as error makes it possible to minimize the case with CodeErrMinRunner, but
@@ -53,11 +69,120 @@ config = dict(
     # QUIRK: set this value to 0x20 if sail is used as reference or dut
     quirk_sail_load_offset = 0x20,
 
+    # Directory for sharing immutable setup artifacts (build harness, sail-riscv config, ...)
+    # between processes (None .. share only between runners within a process)
+    SetupCache_dir = None,
+
+    # Debug link between DuT and GDB (DuTGDBRunner, e.g. for QEMU and RISC-V VP++)
+    # fixed tcp debug port (None .. allocate a free port automatically on each run)
+    debug_port = None,
+    # "tcp" or "unix" (unix domain socket per run; falls back to "tcp" if not supported by the DuT)
+    DuTGDBRunner_debug_transport = "tcp",
+    # retries with a new debug link, if the DuT fails to bind it (e.g. port taken in the meantime)
+    # (the debug stub must be ready within the run timeout over all retries)
+    DuTGDBRunner_debug_link_retries = 3,
+
+    # Reduction of failing tests in CodeErrMinRunner
+    # "delta" .. binary search over prefixes (each candidate is executed from reset)
+    # "qemu_snapshot" .. QEMU DuT only: snapshots are taken at fragment boundaries once and
+    #                   restored for candidate prefixes (see QEMUSnapshotCompareRunner)
+    # "trace" .. a snapshot (register hash) is traced after each fragment -> a single run of
+    #            reference and DuT locates the first diverging fragment, which is confirmed
+    #            with two prefix runs (falls back to "delta" if inconclusive)
+    # "checkpoint" .. like "delta", but probes restore the reference state of the last good probe
+    #                 and execute only the remaining fragment window (result is confirmed from reset)
+    # "commit_log" .. reference and DuT write commit logs, which are compared in lockstep -> a single
+    #                 run locates the first divergent instruction (see TraceCompareRunner; needs
+    #                 commit log support, e.g. SpikeRunner, SailRunner)
+    CodeErrMinRunner_reduction = "delta",
+    # number of concurrent probes of "delta" reduction (1 .. sequential binary search,
+    # k > 1 .. k split points are executed concurrently -> interval shrinks by k + 1 per round)
+    CodeErrMinRunner_reduction_parallel = 1,
+    # minimization of the restored state (CodeErrMinRunner), if the state filtered by the
+    # annotations of the failing fragment does not reproduce the failure
+    # 0 .. disabled (full state is restored), k > 0 .. ddmin over state elements (registers,
+    # csrs) with k candidates executed concurrently -> smallest reproducing restore set
+    CodeErrMinRunner_state_min_parallel = 0,
+    # multi bug extraction of failing tests (CodeErrMinRunner, see replay_fragments)
+    # every main fragment is replayed in isolation from the reference state in front of it (taken
+    # from the trace states of one traced reference run) -> all failing fragments (not only the
+    # first) are saved as 03_multi_<index>_code_block with summary 03_multi_bug.log
+    # 0 .. disabled, k > 0 .. traced runs and replays with k concurrent runners
+    CodeErrMinRunner_multi_bug = 0,
+    # dump file reserve of the traced reference runs (at least dumpfile_reserve)
+    # -> trace buffer for the states of all fragments (more runs, if too small)
+    CodeErrMinRunner_multi_bug_reserve = 512*1024,
+    # skip minimization of failures similar to already minimized ones (CodeErrMinRunner)
+    # failures are bucketed by a signature of the raw end states (differing state element classes,
+    # mnemonic class of the last fragment writing them, exception counter delta, AFC hint) -> once a
+    # bucket has bucket_exemplars minimized failures, further failures are only counted
+    # (buckets.log, stats.log); every bucket_sample_every-th is still minimized (0 .. never)
+    # 0 .. disabled (every failure is minimized)
+    CodeErrMinRunner_bucket_exemplars = 0,
+    CodeErrMinRunner_bucket_sample_every = 0,
+    # write kinds compared in commit logs ("x", "f", "v", "csr", "mem"; csrs differ in implicit
+    # updates between simulators)
+    TraceCompareRunner_compare = ["x", "f", "v", "mem"],
+    # maximum number of snapshots per test and timeout for recording them
+    QEMUSnapshotCompareRunner_max_snapshots = 32,
+    QEMUSnapshotCompareRunner_record_timeout = 30.0,
+
+    # Triage of timed out tests in background (CodeErrMinRunner, see TimeoutTriageRunner)
+    # re-execution with timeout * timeout_factor and low priority (nice); classifies in
+    # reference hang, DuT hang and flake (host load)
+    CodeErrMinRunner_timeout_triage = False,
+    TimeoutTriageRunner_timeout_factor = 4.0,
+    TimeoutTriageRunner_nice = 10,
+    TimeoutTriageRunner_max_queue = 100,
+
+    # Format of code blocks and machine states saved by CodeErrMinRunner (00_orig_*, ..., 99_res_*)
+    # "json" .. jsonpickle (human readable)
+    # "bin" .. compact binary (see rvvts/BinFormat.py; DuT states as delta to reference states)
+    # convert existing files with artifact_convert.py
+    CodeErrMinRunner_artifact_format = "json",
+
+    # Decoupled minimization of failing tests (see rvvts/MinimizeService.py)
+    # True .. FuzzCodeErrMinRunner only tests and submits failing tests to a MinimizeService, which
+    # reduces/minimizes them in MinimizeService_workers threads and archives the results
+    # (share one service between fuzz runners by passing it as "MinimizeService" in the config)
+    # MinimizeService_spool_dir .. pass cases as files between processes (None .. in-process queue)
+    # -> fuzz processes: workers = 0, minimize processes: rvvts.MinimizeService(config).serve()
+    FuzzCodeErrMinRunner_minimize_service = False,
+    MinimizeService_workers = 1,
+    MinimizeService_max_queue = 100,
+    MinimizeService_spool_dir = None,
+    MinimizeService_poll_interval = 1.0,
+
+    # In-session memo of compare/check results in CodeErrMinRunner (see rvvts/RunMemo.py)
+    # maximum number of entries (0 .. disabled); cleared for every test, hit rate in stats.log
+    CodeErrMinRunner_memo_size = 16,
+
+    # Repro corpus (see rvvts/ReproCorpus.py, repro_corpus.py)
+    # indexed store of minimized repros collected from archived failing tests
+    # ReproCorpusRunner re-validates all repros against the configured DuT with
+    # ReproCorpusRunner_parallel concurrent runners and reports fixed, still failing and changed
+    # buckets (report.log) -> enable RefCovRunner_store_dir and SetupCache_dir for fast re-runs
+    ReproCorpus_dir = None,
+    ReproCorpusRunner_parallel = 4,
+
     archive_on_timeout = True,
     archive_on_ignore = True,
     archive_on_error = True,
     archive_on_complete = False,
 
+    # Persistence of artifacts per kind (see Runner.persist_artifact)
+    #  persist_sim_mstate .. end states of simulator runs (mstate.json)
+    #  persist_code_block .. code blocks of CodeErrMinRunner/TestsetCodeErrMinRunner
+    #  persist_mstate .. machine states of CodeErrMinRunner
+    # "never", "on_failure" (test not COMPLETE), "on_archive" (test is archived by ArchiveRunner)
+    # or "always" (written after every run)
+    # deferred artifacts are written by ArchiveRunner (and MinimizeService) -> nothing is written
+    # for passing tests; runners used without them (e.g. CodeErrMinRunner in a notebook) write
+    # all artifacts except "never" immediately
+    persist_sim_mstate = "on_archive",
+    persist_code_block = "on_archive",
+    persist_mstate = "on_archive",
+
     # Default Reference Runner -> NOTE: has to be set!
     RefCovRunner_ref = None,
 
@@ -69,6 +194,11 @@ config = dict(
     RefCovRunner_ignore_invalid_sequences = False,
 
     RefCovRunner_coverage = None,
+
+    # Persistent store of reference results (see rvvts/RefStateStore.py; None .. disabled)
+    # shared between sessions -> e.g. regression runs of test sets execute the reference only once
+    # entries are invalidated by changes of the reference simulator binary and configuration
+    RefCovRunner_store_dir = None,
     RISCVOVPSIMCover_extensions = "V",
     # WARNING: B in OVPSim is outdated! -> not really useful
     #RISCVOVPSIMCover_extensions = "B",
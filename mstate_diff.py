@@ -6,7 +6,7 @@
 # SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
 
 import sys
-from rvvts import MachineState
+from rvvts import load_artifact
 
 argvalid = False
 diff_full = False
@@ -23,15 +23,15 @@ elif len(sys.argv) == 4 and sys.argv[1] == "-f":
     mstateB_filename = sys.argv[3]
 
 if not argvalid:
-    print("Diff MachineStates stored in json format")
+    print("Diff MachineStates stored in json or binary format")
     print("(C) 2025 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz\n")
-    print("Usage: " + sys.argv[0] + "[-f] <MachineState A json file> <MachineState B json file>")
+    print("Usage: " + sys.argv[0] + "[-f] <MachineState A file> <MachineState B file>")
     print("  -f .. show all state elements (difference is marked with 'X')")
     print("")
     sys.exit(1)
 
-mstateA = MachineState.load(mstateA_filename)
-mstateB = MachineState.load(mstateB_filename)
+mstateA = load_artifact(mstateA_filename)
+mstateB = load_artifact(mstateB_filename)
 diff = mstateA.compare(mstateB, diff_full = diff_full)
 print(diff[1])
 print("STATES DIFFER: " + str(not diff[0]))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+
+import os
+import argparse
+import config_base
+import config_host
+import rvvts
+
+parser = argparse.ArgumentParser(
+    description="End-to-end benchmark of the rvvts orchestration overhead "
+    + "(ArchiveRunner/FuzzCodeErrMinRunner with fake build, reference and DuT runners; no external tools needed)",
+    epilog="(C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz",
+)
+parser.add_argument("-n", "--iter", type=int, default=100, help="number of tests")
+parser.add_argument("--min-fragments", type=int, default=10)
+parser.add_argument("--max-fragments", type=int, default=100)
+parser.add_argument(
+    "-x", "--extensions", default="v", help="comma separated extensions under test"
+)
+parser.add_argument("-l", "--xlen", type=int, default=64)
+parser.add_argument("-v", "--vlen", type=int, default=512)
+parser.add_argument(
+    "-e",
+    "--error-rate",
+    type=float,
+    default=0.001,
+    help="probability of a buggy instruction line (DuT)",
+)
+parser.add_argument(
+    "-T",
+    "--timeout-rate",
+    type=float,
+    default=0.0,
+    help="probability of a hanging instruction line (DuT)",
+)
+parser.add_argument("-t", "--timeout", type=float, default=1.0)
+parser.add_argument("-r", "--seed", type=int, default=0)
+parser.add_argument("-d", "--dir", default=os.getcwd() + "/run/OrchestrationBench")
+parser.add_argument("-o", "--json", default=None, help="json output file")
+args = parser.parse_args()
+
+config = dict()
+config.update(config_base.config.copy())
+config.update(config_host.config.copy())
+config.update(
+    dict(
+        dir=args.dir,
+        rvisacfg=rvvts.RVISACfg(
+            xlen=args.xlen,
+            extensions_under_test=args.extensions.split(","),
+            vlen=args.vlen,
+            velen=64,
+        ),
+        FakeDuTRunner_error_rate=args.error_rate,
+        FakeDuTRunner_timeout_rate=args.timeout_rate,
+    )
+)
+os.makedirs(args.dir, exist_ok=True)
+
+rvvts.orchestration_bench(
+    config,
+    iter=args.iter,
+    min_fragments=args.min_fragments,
+    max_fragments=args.max_fragments,
+    timeout=args.timeout,
+    seed=args.seed,
+    json_filename=args.json,
+)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+
+import argparse
+import json
+import rvvts
+
+parser = argparse.ArgumentParser(
+    description="Collect minimized repros of archived failing tests (ERROR-*) into a repro corpus "
+    + "and list its buckets (re-validation against a DuT: rvvts.ReproCorpusRunner)",
+    epilog="(C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz",
+)
+parser.add_argument("corpus", help="corpus directory")
+parser.add_argument(
+    "dirs",
+    nargs="*",
+    help="directories containing archived tests (searched recursively)",
+)
+parser.add_argument(
+    "--exclusion-profile",
+    help="write exclusion profile of the buckets to file (config ProgramGenerator_exclusion_profile)",
+)
+parser.add_argument(
+    "--report",
+    help="report.json of ReproCorpusRunner (exclusion profile of still failing buckets only)",
+)
+parser.add_argument(
+    "--categories", nargs="+", help="AFC categories of exclusion profile (default: all)"
+)
+args = parser.parse_args()
+
+corpus = rvvts.ReproCorpus(args.corpus)
+added = corpus.collect(args.dirs)
+print(f"{len(added)} repros added")
+for bucket, ids in sorted(corpus.get_buckets().items()):
+    print(f"{bucket}: {len(ids)}")
+
+if args.exclusion_profile is not None:
+    report = None
+    if args.report is not None:
+        with open(args.report, "r") as f:
+            report = json.load(f)
+    profile = rvvts.ExclusionProfile.from_corpus(
+        corpus, categories=args.categories, report=report
+    )
+    profile.save(args.exclusion_profile)
+    print(
+        f"{len(profile.get_rules())} exclusion rules written to {args.exclusion_profile}"
+    )
@@ -9,6 +9,7 @@
 
 import os
 import re
+from .MachineState import MachineState, RVREGS_IDX_DICT
 
 
 # AFC Categorizer base class and default
@@ -36,6 +37,15 @@ class AFC:
         # return results
         return category, attributes
 
+    # category of raw (unminimized) end states without report
+    # e.g. for bucketing failures before minimization (see FailureBuckets)
+    # returns None, if not categorizable
+    def hint(self, code_block, ref_mstate, dut_mstate):
+        try:
+            return self._categorize(None, code_block, ref_mstate, dut_mstate)[0]
+        except Exception:
+            return None
+
     # override in derived classes
     def _categorize(self, dir, res_code_block, res_end_ref_mstate, res_end_dut_mstate):
         # default: nocat, no attributes
@@ -90,6 +100,41 @@ class AFC_Ara(AFC):
             "VALREG_ONLY",
         ]
 
+    # groups of differing machine state elements
+    # (precompiled predicates on MachineStateDiffEntry, first match)
+    GROUPS = [
+        ("ireg", lambda e: e.section == "reg" and e.name != "pc"),
+        ("pc", lambda e: e.section == "reg" and e.name == "pc"),
+        ("xmem", lambda e: e.name in ("xmemhash", "xmempages")),
+        ("dmem", lambda e: e.name in ("dmemhash", "dmempages")),
+        ("lastPC", lambda e: e.name == "lastPC"),
+        ("exc", lambda e: e.name == "#exceptions"),
+        ("mstatus", lambda e: e.name == "mstatus.fs/vs"),
+        ("fcsr", lambda e: e.name == "fcsr"),
+        ("freg", lambda e: MachineState._is_float_reg_name(e.name)),
+        ("vlenb", lambda e: e.name == "vlenb"),
+        ("vtype", lambda e: e.name == "vtype"),
+        ("vl", lambda e: e.name == "vl"),
+        ("vstart", lambda e: e.name == "vstart"),
+        ("vcsr", lambda e: e.name in ("vxrm", "vxsat", "vcsr")),
+        ("vreg", lambda e: MachineState._is_vector_reg_name(e.name)),
+    ]
+
+    def _group(self, entries):
+        groups = {name: [] for name, predicate in self.GROUPS}
+        for entry in entries:
+            for name, predicate in self.GROUPS:
+                if predicate(entry):
+                    groups[name].append(entry)
+                    break
+            else:
+                # sanity check
+                print(f"AFC_Ara: ERROR: unknown state element {entry}")
+                raise Exception(
+                    "AFC_Ara: Internal Error! -> Checkout output and contact developers"
+                )
+        return groups
+
     # override
     def _categorize(self, dir, res_code_block, res_end_ref_mstate, res_end_dut_mstate):
 
@@ -97,90 +142,18 @@ class AFC_Ara(AFC):
         if res_end_ref_mstate is None or res_end_dut_mstate is None:
             return "UNKNOWN", []
 
-        def tgrepmult(text, patterns):
-            res = [[] for i in patterns]
-
-            pms = []
-            for pattern in patterns:
-                pms.append(re.compile(pattern))
-
-            for line in text.split("\n"):
-                for idx, pm in enumerate(pms):
-                    if pm.match(line):
-                        res[idx].append(line)
-
-            return res
-
-        IALL = 0
-        IIREG = 1
-        IPC = 2
-        IXMEM = 3
-        IDMEM = 4
-        ILASTPC = 5
-        IEXC = 6
-        IMSTAT = 7
-        IFCSR = 8
-        IFREG = 9
-        IVLENB = 10
-        IVTYPE = 11
-        IVL = 12
-        IVSTART = 13
-        IVCSR = 14
-        IVREG = 15
-        IVTYPE_OK = 16
-        IEXC_OK = 17
-
-        # diff and extract attributes to investigate
-        mstate_diff = res_end_ref_mstate.compare(res_end_dut_mstate, diff_full=True)[1]
-        ps = r"^"
-        pe = r".*X$"
+        # differing raw elements (decoded fields are covered by their parents)
+        # grouped by precompiled predicates
+        mstate_diff = res_end_ref_mstate.compare(res_end_dut_mstate)[1]
+        entries = [e for e in mstate_diff.get_entries() if e.parent is None]
+        r = self._group(entries)
+        n_all0 = len(entries)
 
         # FOR DEBUG
         # with open(os.path.join(dir, "AFC_debug.log"), "w") as f:
         #    f.write(str(res_end_ref_mstate))
         #    f.write(str(res_end_dut_mstate))
-        #    f.write(
-        #        str(res_end_ref_mstate.compare(res_end_dut_mstate, diff_full=False)[1])
-        #    )
-
-        patterns = [
-            ps + r"[#0-9a-zA-Z].* " + pe,
-            ps + r"[0-9a-zA-Z].*\(x\d\d?\) " + pe,
-            ps + r"pc " + pe,
-            ps + r"xmemhash " + pe,
-            ps + r"dmemhash " + pe,
-            ps + r"lastPC " + pe,
-            ps + r"#exceptions " + pe,
-            ps + r"mstatus.fs/vs " + pe,
-            ps + r"fcsr " + pe,
-            ps + r"f\d\d? " + pe,
-            ps + r"vlenb " + pe,
-            ps + r"vtype " + pe,
-            ps + r"vl " + pe,
-            ps + r"vstart " + pe,
-            ps + r"(vxrm|vxsat|vcsr) " + pe,
-            ps + r"v\d\d? " + pe,
-            ps + r"vtype " + ".*$",
-            ps + r"#exceptions " + ".*$",
-        ]
-        r = tgrepmult(mstate_diff, patterns)
-        n_all0 = len(r[IALL])
-        n_all1 = sum(len(x) for x in r) - n_all0 - len(r[IVTYPE_OK]) - len(r[IEXC_OK])
-
-        # sanity check
-        if n_all0 != n_all1:
-            print(f"AFC_Ara: ERROR: is: {str(n_all1)}, should be: {str(n_all0)}")
-            print('------ should be (contains also "_OK" matches')
-            for i in r[(IALL + 1) :]:
-                for j in i:
-                    print(j)
-            print('------ is (contains only not "_OK" matches')
-            for i in r[IALL]:
-                print(i)
-            print("------")
-            raise Exception(
-                "AFC_Ara: Internal Error! -> Checkout output and contact developers"
-            )
+        #    f.write(str(mstate_diff))
 
         # classify
         # Fallback for deviations that do not match any AFC rule.
@@ -192,23 +165,14 @@ class AFC_Ara(AFC):
             # execution stalls rather than a normal architectural mismatch.
             category = "ARA_HANG"
 
-        elif len(r[IPC]) or len(r[ILASTPC]):
+        elif len(r["pc"]) or len(r["lastPC"]):
             # The program counter or last committed PC differs, but no Ara hang
             # was classified. This captures control-flow or commit-PC
             # mismatches.
             category = "PCERR"
 
-        elif len(r[IEXC]):
-            if len(r[IEXC]) > 1:
-                print("AFC_Ara: ERROR: more than one exception entries")
-                print(r)
-                raise Exception(
-                    "AFC_Ara: Internal Error! -> Checkout output and contact developers"
-                )
-
-            tmp = re.split(r"  *", r[IEXC][0])
-            cref = int(tmp[1].split("(")[0], 16)
-            cdut = int(tmp[2].split("(")[0], 16)
+        elif len(r["exc"]):
+            cref, cdut = r["exc"][0].ref, r["exc"][0].dut
             if cref > cdut:
                 # The reference reports more traps than the DUT. The DUT
                 # accepted an instruction or configuration that the reference
@@ -226,34 +190,25 @@ class AFC_Ara(AFC):
                     "AFC_Ara: Internal Error! -> Checkout output and contact developers"
                 )
 
-        elif len(r[IVCSR]) == n_all0:
+        elif len(r["vcsr"]) == n_all0:
             # Only vector CSR state such as `vxrm`, `vxsat`, or `vcsr` differs.
             # No other architectural state mismatch is present.
             category = "VCSR_ONLY"
 
-        elif len(r[IVCSR]):
+        elif len(r["vcsr"]):
             # A vector CSR mismatch is present together with other architectural
             # deviations. This separates mixed failures from pure `VCSR_ONLY`
             # cases.
             category = "VCSR"
 
-        elif len(r[IVLENB]):
+        elif len(r["vlenb"]):
             # The `vlenb` CSR differs. The DUT and reference therefore disagree
             # on the vector-register byte length reported to software.
             category = "VLENB"
 
         # TODO MSTATUS.FS/VS contains only FS and VS -> MSTATUS_STRANGE_VAL can never happen!!!
-        elif len(r[IMSTAT]):
-            if len(r[IMSTAT]) > 1:
-                print("AFC_Ara: ERROR: more than one mstat entries")
-                print(r)
-                raise Exception(
-                    "AFC_Ara: Internal Error! -> Checkout output and contact developers"
-                )
-
-            tmp = re.split(r"  *", r[IMSTAT][0])
-            cref = int(tmp[1].split("(")[0], 16)
-            cdut = int(tmp[2].split("(")[0], 16)
+        elif len(r["mstatus"]):
+            cref, cdut = r["mstatus"][0].ref, r["mstatus"][0].dut
 
             if cref == cdut:
                 print("AFC_Ara: ERROR: mstatus matches")
@@ -287,17 +242,8 @@ class AFC_Ara(AFC):
                     # captures other `mstatus.fs/vs` pattern mismatches.
                     category = "MSTATUS_DIFF"
 
-        elif len(r[IVTYPE]):
-            if len(r[IVTYPE]) > 1:
-                print("AFC_Ara: ERROR: more than one vtype entries")
-                print(r)
-                raise Exception(
-                    "AFC_Ara: Internal Error! -> Checkout output and contact developers"
-                )
-
-            tmp = re.split(r"  *", r[IVTYPE][0])
-            cref = int(tmp[1].split("(")[0], 16)
-            cdut = int(tmp[2].split("(")[0], 16)
+        elif len(r["vtype"]):
+            cref, cdut = r["vtype"][0].ref, r["vtype"][0].dut
 
             if cref == cdut:
                 print("AFC_Ara: ERROR: vtype matches")
@@ -344,16 +290,15 @@ class AFC_Ara(AFC):
                 # remaining vector-type CSR mismatches.
                 category = "VTYPE_DIFF"
 
-        elif len(r[IVL]) == n_all0:
+        elif len(r["vl"]) == n_all0:
             # Only the `vl` CSR differs. The DUT and reference agree on all
             # other state but compute or retain a different active vector
             # length.
             category = "VL_ONLY"
 
-        elif len(r[IVSTART]):
+        elif len(r["vstart"]):
             # exception missmatch already handled above -> cref == cdut
-            tmp = re.split(r"  *", r[IEXC_OK][0])
-            cref = int(tmp[1].split("(")[0], 16)
+            cref = res_end_ref_mstate.state[1]["#exceptions"]
             if cref > 0:
                 # `vstart` differs while matching non-zero exception counts show
                 # that a trap occurred. This points to vector restart-state
@@ -365,10 +310,8 @@ class AFC_Ara(AFC):
                 # normal, non-trapping execution.
                 category = "VSTART_WOEXC"
 
-        elif len(r[IFCSR]) == n_all0:
-            tmp = re.split(r"  *", r[IFCSR][0])
-            cref = int(tmp[1].split("(")[0], 16)
-            cdut = int(tmp[2].split("(")[0], 16)
+        elif len(r["fcsr"]) == n_all0:
+            cref, cdut = r["fcsr"][0].ref, r["fcsr"][0].dut
 
             fflags_ref = cref & 0x1F
             fflags_dut = cdut & 0x1F
@@ -387,53 +330,53 @@ class AFC_Ara(AFC):
                 # CSR differences.
                 category = "FCSR_ONLY"
 
-        elif len(r[IXMEM]) == n_all0:
+        elif len(r["xmem"]) == n_all0:
             # Only the dedicated instruction-memory hash differs. The visible
             # symptom is a memory-side effect outside the dedicated data-memory
             # region.
             category = "XMEM_ONLY"
-        elif len(r[IDMEM]) == n_all0:
+        elif len(r["dmem"]) == n_all0:
             # Only the dedicated data-memory hash differs. The failure
             # manifests as an unexpected data-memory update, typically from
             # store-side behavior.
             category = "DMEM_ONLY"
 
-        elif len(r[IIREG]) == n_all0:
+        elif len(r["ireg"]) == n_all0:
             # Only integer register contents differ. This can indicate a wrong
             # scalar result or an unintended write to an integer register.
             category = "IREG_ONLY"
 
-        elif len(r[IFREG]) == n_all0:
+        elif len(r["freg"]) == n_all0:
             # Only floating-point register contents differ. This captures
             # failures whose visible symptom is limited to floating-point
             # register values.
             category = "FREG_ONLY"
         elif (
-            len(r[IFREG])
-            and len(r[IFCSR])
-            and ((len(r[IFREG]) + len(r[IFCSR])) == n_all0)
+            len(r["freg"])
+            and len(r["fcsr"])
+            and ((len(r["freg"]) + len(r["fcsr"])) == n_all0)
         ):
             # Only floating-point registers and `fcsr` differ. This combines
             # floating-point value deviations with floating-point status side
             # effects.
             category = "FREG_FCSR_ONLY"
 
-        elif len(r[IVREG]) == n_all0:
+        elif len(r["vreg"]) == n_all0:
             # Only vector register contents differ between reference and DUT.
             # This usually points to wrong vector instruction results or vector
             # register handling.
             category = "VREG_ONLY"
         elif (
-            len(r[IVREG])
-            and len(r[IFCSR])
-            and ((len(r[IVREG]) + len(r[IFCSR])) == n_all0)
+            len(r["vreg"])
+            and len(r["fcsr"])
+            and ((len(r["vreg"]) + len(r["fcsr"])) == n_all0)
         ):
             # Only vector registers and `fcsr` differ. This combines a vector
             # result mismatch with floating-point status side effects, with no
             # other state deviations.
             category = "VREG_FCSR_ONLY"
 
-        elif (len(r[IIREG]) + len(r[IFREG]) + len(r[IVREG])) == n_all0:
+        elif (len(r["ireg"]) + len(r["freg"]) + len(r["vreg"])) == n_all0:
             # All deviations are confined to architectural value registers
             # across integer, floating-point, and vector registers. CSRs,
             # memory, and PC-related state match.
@@ -563,7 +506,7 @@ class AFC_FP(AFC):
         instruction_name = self._extract_instruction_name(dir, instruction_line)
         registers = self._extract_registers(instruction_line)
 
-        mstate_diff = ""
+        mstate_diff = None
         if res_end_ref_mstate is not None and res_end_dut_mstate is not None:
             mstate_diff = res_end_ref_mstate.compare(
                 res_end_dut_mstate, diff_full=True
@@ -677,26 +620,39 @@ class AFC_FP(AFC):
     def _extract_registers(self, instruction_line):
         return re.findall(r"[a-z]+[0-9]+", instruction_line)
 
+    # registers of instruction in diff entry
+    @staticmethod
+    def _entry_has_register(entry, registers):
+        if entry.section == "reg":
+            if entry.name == "pc":
+                return False
+            return "x" + str(RVREGS_IDX_DICT[entry.name]) in registers
+        return entry.parent is None and entry.name in registers
+
     def _process_mstate_diff(self, mstate_diff, registers):
         lines_with_x = []
         lines_with_registers = []
         flags_set = []
+        if mstate_diff is None:
+            return lines_with_x, lines_with_registers, flags_set
 
-        for line in mstate_diff.split("\n"):
-            line = line.rstrip()
-            match_line = line.lstrip()
-            if line.endswith("X"):
+        registers = set(registers)
+        for entry in mstate_diff.get_entries():
+            is_register = self._entry_has_register(entry, registers)
+            if entry.equal and not is_register:
+                continue
+            # first line of entry in the text diff
+            line = mstate_diff.render_entry(entry).split("\n")[0].rstrip()
+            if not entry.equal:
                 lines_with_x.append(line)
-
-            if any(
-                match_line.startswith(f"{register} ") or f"({register})" in line
-                for register in registers
-            ):
+            # (equal multi-line entries have no values in the first line)
+            if is_register and line.strip() != entry.name:
                 lines_with_registers.append(line)
 
-            m = re.match(r"\s*fcsr\.(\w+).*True", line)
-            if m:
-                flags_set.append(m.group(1))
+        # fcsr flags set on REF or DUT
+        for entry in mstate_diff.get_entries():
+            if entry.parent == "fcsr" and (entry.ref is True or entry.dut is True):
+                flags_set.append(entry.name.split(".", 1)[1])
 
         return lines_with_x, lines_with_registers, flags_set
 
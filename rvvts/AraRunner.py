@@ -33,6 +33,7 @@ class AraRunner(ProcessTimeoutRunner):
 
     def task_pre(self):
         self.dumpfile.delete()
+        self.persist_reset()
 
     def task_post(self, result):
         outcome, ret = super().task_post(result)
@@ -61,13 +62,12 @@ class AraRunner(ProcessTimeoutRunner):
                 )
             regs["pc"] = int(tmp[pc_idx].split(" ")[1])
 
-            regs, state = self.dumpfile.extract()
+            mstate = MachineState.from_dumpfile(self.config, self.dumpfile)
+            self.persist_artifact("sim_mstate", self.mstate_filename, mstate.save)
 
         except Exception as e:
             return (RunnerOutcome.ERROR, e)
 
-        mstate = MachineState(self.config, (regs, state))
-        mstate.save(self.mstate_filename)
         return (outcome, mstate)
 
     def run_handler(self, binary="", **kwargs):
@@ -18,6 +18,8 @@ class ArchiveRunner(Runner):
 
         subconfig = config.copy()
         subconfig["dir"] = self.get_dir()
+        # artifacts are written on archive (see task_post, Runner.persist_artifact)
+        subconfig["persist_deferred"] = True
 
         if self.log:
             self.statfile = RunnerFile(dir=self.get_dir(), name="stats.log")
@@ -68,6 +70,11 @@ class ArchiveRunner(Runner):
                     self.get_dir() + "/COMPLETE-iteration_" + f"{self.iteration :010d}"
                 )
 
+        # write deferred artifacts of the test (see Runner.persist_artifact)
+        self.ArchiveRunner_dut.persist_flush(
+            failure=ret[0] != RunnerOutcome.COMPLETE, archive=archivedir is not None
+        )
+
         if archivedir is not None:
             shutil.copytree(self.ArchiveRunner_dut.get_dir(), archivedir)
 
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import os
+import glob
+import jsonpickle
+from .BinFormat import BIN_KIND_CODEBLOCK, BIN_FLAG_DELTA, BinReader, is_bin_file
+from .CodeBlock import CodeBlock
+from .MachineState import MachineState
+
+# Artifacts of failing tests (e.g. CodeErrMinRunner: 00_orig_code_block.json,
+# 99_res_end_dut_mstate.json, ...) stored in json (jsonpickle) or compact
+# binary format (see BinFormat).
+# In binary format, DuT machine states are stored as delta to the reference
+# machine state of the same step (e.g. 99_res_end_dut_mstate.bin ->
+# 99_res_end_ref_mstate.bin). load_artifact resolves the base automatically.
+
+ARTIFACT_FORMATS = {"json": ".json", "bin": ".bin"}
+
+
+def artifact_ext(format):
+    ext = ARTIFACT_FORMATS.get(format, None)
+    if ext is None:
+        raise Exception(f"Artifact: unknown format {format}")
+    return ext
+
+
+# name of the delta base (reference state) of a DuT state (without extension)
+# returns None, if the artifact has no base
+def artifact_base_name(filename):
+    name = os.path.splitext(filename)[0]
+    head, tail = os.path.split(name)
+    if "_dut_mstate" not in tail:
+        return None
+    return os.path.join(head, tail.replace("_dut_mstate", "_ref_mstate"))
+
+
+# load code block or machine state (any format, delta bases are resolved)
+def load_artifact(filename, config=None):
+    if not is_bin_file(filename):
+        # jsonpickle -> type is stored in the file
+        with open(filename, "r") as file:
+            return jsonpickle.decode(file.read())
+    with BinReader(filename) as reader:
+        kind = reader.kind
+        flags = reader.flags
+    if kind == BIN_KIND_CODEBLOCK:
+        return CodeBlock.load_bin(filename)
+
+    base = None
+    if flags & BIN_FLAG_DELTA:
+        base_name = artifact_base_name(filename)
+        if base_name is None:
+            raise Exception(f"Artifact: {filename}: no base state known")
+        for ext in ARTIFACT_FORMATS.values():
+            if os.path.exists(base_name + ext):
+                base = load_artifact(base_name + ext, config=config)
+                break
+        else:
+            raise Exception(f"Artifact: {filename}: base state {base_name} missing")
+    return MachineState.load_bin(filename, config=config, base=base)
+
+
+# save code block or machine state in format
+# name .. filename without extension
+# base .. delta base of machine state (see artifact_base_name; only "bin")
+def save_artifact(data, name, format="json", base=None):
+    filename = name + artifact_ext(format)
+    if isinstance(data, CodeBlock):
+        data.save(filename)
+    elif format == "bin":
+        data.save(filename, base=base)
+    else:
+        data.save(filename)
+    return filename
+
+
+# convert all artifacts (??_*) in directory to format
+# remove .. remove converted source files
+# returns list of converted source files
+def convert_artifacts(dir, format, remove=False):
+    ext = artifact_ext(format)
+    sources = []
+    for src_ext in ARTIFACT_FORMATS.values():
+        if src_ext != ext:
+            sources += glob.glob(os.path.join(dir, "??_*" + src_ext))
+    # reference states first (delta bases)
+    sources.sort(key=lambda f: (artifact_base_name(f) is not None, f))
+
+    converted = {}
+    for src in sources:
+        name = os.path.splitext(src)[0]
+        data = load_artifact(src)
+        base = converted.get(artifact_base_name(name), None)
+        save_artifact(data, name, format=format, base=base)
+        converted[name] = data
+
+    if remove:
+        for src in sources:
+            os.remove(src)
+    return sources
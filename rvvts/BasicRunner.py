@@ -39,6 +39,31 @@ class RunnerFile:
 # ## Runner
 
 
+# decorator for lazily constructed child runners (similar to property)
+# The decorated method creates the runner on first access. The runner is
+# stored in the instance dict ("_lazy_<name>") -> handled by close.
+# Usage:
+#   @lazy_runner
+#   def child(self):
+#       return ChildRunner(config=...)
+class lazy_runner:
+    def __init__(self, create_f):
+        self.create_f = create_f
+        self.attr = "_lazy_" + create_f.__name__
+
+    def __set_name__(self, owner, name):
+        self.attr = "_lazy_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        runner = obj.__dict__.get(self.attr, None)
+        if runner is None:
+            runner = self.create_f(obj)
+            obj.__dict__[self.attr] = runner
+        return runner
+
+
 class RunnerOutcome(Enum):
     INVALID = 0
     BUSY = 1
@@ -50,6 +75,18 @@ class RunnerOutcome(Enum):
 
 class Runner:
 
+    # stage name for latency accounting of task_post (None .. not accounted)
+    # (see add_stage_time)
+    TASK_POST_STAGE = None
+
+    # Persistence policies of artifacts (see persist_artifact)
+    # config "persist_<kind>" per artifact kind:
+    #  sim_mstate .. end states of simulator runs (mstate.json)
+    #  code_block .. code blocks of CodeErrMinRunner and TestsetCodeErrMinRunner
+    #  mstate .. machine states of CodeErrMinRunner
+    PERSIST_KINDS = ["sim_mstate", "code_block", "mstate"]
+    PERSIST_POLICIES = ["never", "on_failure", "on_archive", "always"]
+
     # logging constructor -> DO NOT OVERRIDE -> use setup instead!
     def __init__(self, config=None):
         self.setup(config=config)
@@ -86,6 +123,21 @@ class Runner:
         dir = config["dir"]
         self.log = config["log"]
         self.result = (RunnerOutcome.INVALID, None)
+        self.stage_times = {}
+
+        self.persist_policies = {}
+        for kind in self.PERSIST_KINDS:
+            policy = config.get("persist_" + kind, "on_archive")
+            if policy not in self.PERSIST_POLICIES:
+                raise Exception(f"Runner: invalid persist_{kind} policy {policy}")
+            self.persist_policies[kind] = policy
+        # deferred persistence only in runner trees flushed by an owner
+        # (persist_deferred is set by ArchiveRunner, MinimizeService)
+        self.persist_deferred = config.get("persist_deferred", False)
+        # filename -> (policy, save_f) of deferred artifacts
+        self.persist_pending = {}
+        # artifacts written in the current run
+        self.persist_written = set()
 
         # create runner dir
         if config.get("RunnerDirNotIndexed", False):
@@ -104,7 +156,10 @@ class Runner:
     def _task_exec(self):
         self.task_pre()
         task_result = self.task()
+        start = time.perf_counter()
         task_post_result = self.task_post(task_result)
+        if self.TASK_POST_STAGE is not None:
+            self.add_stage_time(self.TASK_POST_STAGE, time.perf_counter() - start)
         self.result = task_post_result
         self._log_results(task_result=task_result, task_post_result=task_post_result)
 
@@ -129,9 +184,74 @@ class Runner:
     def get_dir(self):
         return self.dir
 
+    # per stage latency accounting (seconds, accumulated over runs)
+    # e.g. "launch", "execute", "extract" (see SimBench)
+    def add_stage_time(self, stage, seconds):
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+
+    def get_stage_times(self):
+        return self.stage_times
+
+    def reset_stage_times(self):
+        self.stage_times = {}
+
     def get_result(self):
         return self.result
 
+    # Deferred persistence of artifacts
+    # save_f(filename) writes the artifact (e.g. MachineState.save). Depending
+    # on the policy of kind, it is called
+    #  "never" .. never
+    #  "on_failure" .. on persist_flush, if the test failed (not COMPLETE)
+    #  "on_archive" .. on persist_flush, if the test is archived
+    #  "always" .. immediately
+    # A later artifact with the same filename replaces a pending one.
+    # persist_flush is called for the whole runner tree by ArchiveRunner
+    # -> no serialization and file system access for passing tests
+    # Runners without owner (no persist_deferred, e.g. CodeErrMinRunner in a
+    # notebook) are never flushed -> all policies except "never" act as "always"
+    def persist_artifact(self, kind, filename, save_f):
+        policy = self.persist_policies[kind]
+        if policy == "always" or (policy != "never" and not self.persist_deferred):
+            self.persist_pending.pop(filename, None)
+            self._persist_write(filename, save_f)
+        elif policy != "never":
+            self.persist_pending[filename] = (policy, save_f)
+
+    def _persist_write(self, filename, save_f):
+        save_f(filename)
+        self.persist_written.add(filename)
+
+    # remove artifacts written in the previous run and drop pending ones
+    # (call on begin of a new run)
+    def persist_reset(self):
+        for filename in self.persist_written:
+            if os.path.exists(filename):
+                os.remove(filename)
+        self.persist_written = set()
+        self.persist_pending = {}
+
+    # write pending artifacts of this runner and all child runners
+    def persist_flush(self, failure, archive):
+        self._persist_flush(failure, archive, set())
+
+    def _persist_flush(self, failure, archive, seen):
+        if id(self) in seen:
+            return
+        seen.add(id(self))
+
+        pending = self.persist_pending
+        self.persist_pending = {}
+        for filename, (policy, save_f) in pending.items():
+            if (policy == "on_failure" and failure) or (
+                policy == "on_archive" and archive
+            ):
+                self._persist_write(filename, save_f)
+
+        for value in list(vars(self).values()):
+            for runner in self._iter_child_runners(value):
+                runner._persist_flush(failure, archive, seen)
+
     # override
     def get_error_cause(self):
         return "unknown"
@@ -329,6 +449,10 @@ class ThreadingRunner(Runner):
 
 
 class ProcessTimeoutRunner(ThreadingRunner):
+
+    # task_post of simulators extracts the machine state
+    TASK_POST_STAGE = "extract"
+
     def setup(self, config=None, program=[]):
 
         super().setup(config=config)
@@ -336,6 +460,8 @@ class ProcessTimeoutRunner(ThreadingRunner):
         self.timeout = 1.0
         self.proc_pid = -1
         self.set_program(program)
+        # scheduling priority of processes (e.g. for background runners)
+        self.nice = config.get("ProcessTimeoutRunner_nice", 0)
 
     def _log_command(self, name="command.log", command=[]):
         self._log_write(name=name, content=" ".join(command) + "\n")
@@ -357,6 +483,7 @@ class ProcessTimeoutRunner(ThreadingRunner):
         self._log_input(input=self.input)
 
         timedout = False
+        start = time.perf_counter()
         proc = subprocess.Popen(
             command,
             cwd=self.get_dir(),
@@ -364,8 +491,10 @@ class ProcessTimeoutRunner(ThreadingRunner):
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             universal_newlines=True,
+            preexec_fn=self._preexec if self.nice else None,
         )
         self.proc_pid = proc.pid
+        launched = time.perf_counter()
         try:
             stdout, stderr = proc.communicate(input=self.input, timeout=self.timeout)
         except subprocess.TimeoutExpired:
@@ -373,6 +502,8 @@ class ProcessTimeoutRunner(ThreadingRunner):
             stdout, stderr = proc.communicate()
             timedout = True
         self.proc_pid = -1
+        self.add_stage_time("launch", launched - start)
+        self.add_stage_time("execute", time.perf_counter() - launched)
 
         self._log_output(stdout=stdout, stderr=stderr)
 
@@ -392,6 +523,9 @@ class ProcessTimeoutRunner(ThreadingRunner):
 
         return (outcome, ret)
 
+    def _preexec(self):
+        os.nice(self.nice)
+
     # request stop
     def stop(self):
         if self.proc_pid > 0:
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import struct
+import zlib
+
+# Compact binary container for artifacts (MachineState, CodeBlock)
+# Layout (little endian):
+#  header .. magic (8 bytes), version (u16), kind (1 byte), flags (u8)
+#  sections .. length (u32) + zlib compressed data, until end of file
+# Sections are read one by one (BinReader) -> e.g. metadata can be read
+# without decompressing the remaining sections.
+
+BIN_MAGIC = b"RVVTSBIN"
+BIN_VERSION = 1
+BIN_HEADER = struct.Struct("<8sHcB")
+BIN_SECTION = struct.Struct("<I")
+
+BIN_KIND_MACHINESTATE = b"M"
+BIN_KIND_CODEBLOCK = b"C"
+
+# section data of MachineState is stored as delta (xor) to a base state
+BIN_FLAG_DELTA = 1
+
+
+def is_bin_file(filename):
+    with open(filename, "rb") as f:
+        return f.read(len(BIN_MAGIC)) == BIN_MAGIC
+
+
+def bin_save(filename, kind, sections, flags=0, level=6):
+    with open(filename, "wb") as f:
+        f.write(BIN_HEADER.pack(BIN_MAGIC, BIN_VERSION, kind, flags))
+        for data in sections:
+            data = zlib.compress(data, level)
+            f.write(BIN_SECTION.pack(len(data)))
+            f.write(data)
+
+
+class BinReader:
+    def __init__(self, filename, kind=None):
+        self.file = open(filename, "rb")
+        header = self.file.read(BIN_HEADER.size)
+        if len(header) != BIN_HEADER.size:
+            self.close()
+            raise Exception(f"BinReader: {filename}: invalid header")
+        magic, self.version, self.kind, self.flags = BIN_HEADER.unpack(header)
+        if magic != BIN_MAGIC:
+            self.close()
+            raise Exception(f"BinReader: {filename}: no rvvts binary file")
+        if self.version > BIN_VERSION:
+            self.close()
+            raise Exception(
+                f"BinReader: {filename}: unsupported version {self.version}"
+            )
+        if kind is not None and self.kind != kind:
+            self.close()
+            raise Exception(f"BinReader: {filename}: unexpected kind {self.kind}")
+
+    # next section (None .. end of file)
+    def read_section(self):
+        length = self.file.read(BIN_SECTION.size)
+        if len(length) == 0:
+            return None
+        (length,) = BIN_SECTION.unpack(length)
+        return zlib.decompress(self.file.read(length))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -8,19 +8,24 @@
 
 from .BasicRunner import ProcessTimeoutRunner, RunnerFile
 from .MachineState import DumpFile, RegStateDump
+from .SetupCache import SetupCache
 
 
 class BuildRunner(ProcessTimeoutRunner):
+
+    # markers of trace instrumentation in test code (see trace_code)
+    TRACE_BEGIN = "# -------- BEGIN OF TRACE SNAPSHOT --------"
+    TRACE_END = "# -------- END OF TRACE SNAPSHOT --------"
+
     def setup(self, config):
 
         super().setup(config)
 
-        stop_on_exception = config["stop_on_exception"]
-        skip_on_exception = config["skip_on_exception"]
         xmemstart = config["xmemstart"]
         xmemlen = config["xmemlen"]
         rvisacfg = config["rvisacfg"]
         xlen = rvisacfg.get_xlen()
+        self.rvisacfg = rvisacfg
 
         if xlen == 32:
             march = rvisacfg.to_isa_str()
@@ -31,39 +36,90 @@ class BuildRunner(ProcessTimeoutRunner):
         else:
             raise Exception(f"xlen = {xlen} not supported! Valid values are 32, or 64")
 
-        has_float = rvisacfg.is_float_needed()
-        has_vector = rvisacfg.is_needed("v")
+        # dumpfile (temp regs, exception counter, last pc, ...)
+        self.dumpfile = DumpFile(
+            config=config, addr=xmemstart + xmemlen - config["dumpfile_reserve"]
+        )
+
+        # dump register file (only for setting - no store)
+        self.regset = RegStateDump(config=config, reglist=[i for i in range(32)])
+
+        # end of test (see _06_breakpoint_end_loop in harness)
+        self.breakpoint = xmemstart + 4
+
+        # harness (asm header and tail, linker script) depends only on the
+        # configuration -> generate once and share between runners
+        harness = SetupCache.get(
+            config,
+            "BuildRunner_harness",
+            self.harness_key(config),
+            lambda: self.gen_harness(config),
+        )
+        self.asmhdr = harness["asmhdr"]
+        self.asmtail = harness["asmtail"]
 
         if self.log:
             self.codefile = RunnerFile(dir=self.get_dir(), name="code.S")
         self.asmfile = RunnerFile(dir=self.get_dir(), name="program.S")
         self.linkerscript = RunnerFile(
-            dir=self.get_dir(),
-            name="linker.lds",
-            content='OUTPUT_ARCH( "riscv" )\n'
+            dir=self.get_dir(), name="linker.lds", content=harness["linkerscript"]
+        )
+
+        # CREATE COMMAND
+        super().set_program(
+            [
+                config["gcc_bin"],
+                self.asmfile.get_name(),
+                "-o",
+                config["binary"],
+                "-march=" + march,
+                "-mabi=" + mabi,
+                "-nostartfiles",
+                "-Wl,--no-relax",
+                "-T",
+                self.linkerscript.get_name(),
+            ]
+        )
+
+    # all configuration values the harness depends on
+    def harness_key(self, config):
+        return [
+            config["stop_on_exception"],
+            config["skip_on_exception"],
+            config["memstart"],
+            config["xmemstart"],
+            config["xmemlen"],
+            config["dumpfile_reserve"],
+            repr(config["rvisacfg"]),
+        ]
+
+    def gen_harness(self, config):
+
+        stop_on_exception = config["stop_on_exception"]
+        skip_on_exception = config["skip_on_exception"]
+        xmemstart = config["xmemstart"]
+        xmemlen = config["xmemlen"]
+        rvisacfg = config["rvisacfg"]
+
+        linkerscript = (
+            'OUTPUT_ARCH( "riscv" )\n'
             + "MEMORY { MEM(rwx): org = "
             + hex(xmemstart)
             + ", len = "
             + hex(xmemlen - config["dumpfile_reserve"])
             + "}\n"
             + "SECTIONS {.text :  { *(.text) } > MEM }\n"
-            + "ENTRY(_00_start)\n",
+            + "ENTRY(_00_start)\n"
         )
 
-        # dumpfile (temp regs, exception counter, last pc, ...)
-        self.dumpfile = DumpFile(
-            config=config, addr=xmemstart + xmemlen - config["dumpfile_reserve"]
-        )
-
-        # dump register file (only for setting - no store)
-        self.regset = RegStateDump(config=config, reglist=[i for i in range(32)])
+        has_float = rvisacfg.is_float_needed()
+        has_vector = rvisacfg.is_needed("v")
 
         # add asm header and program end code (for breakpoint)
         handle_exceptions = stop_on_exception or skip_on_exception
-        self.breakpoint = xmemstart + 4
 
         # HEADER, START AND END CODE
-        self.asmhdr = """\
+        asmhdr = """\
 # HEADER, START AND END (breakpoint loop) CODE
 
 # disable compressed instruction emission for instrumentation code
@@ -89,7 +145,7 @@ fromhost: .dword 0
 """
 
         # FINALIZATION CODE
-        self.asmhdr += f"""
+        asmhdr += f"""
 # FINALIZATION CODE (save state)
 # fini after completed testcode
 _04a_finalize_testcode_complete:
@@ -131,7 +187,7 @@ _04b_finalize_testcode_stop_on_exception:
 """
 
         if has_float:
-            self.asmhdr += f"""\
+            asmhdr += f"""\
     # save float state (maybe disabled by test code -> re-enable)
     li x5, 0x6000
     csrs mstatus, x5
@@ -142,7 +198,7 @@ _04b_finalize_testcode_stop_on_exception:
 """
 
         if has_vector:
-            self.asmhdr += f"""\
+            asmhdr += f"""\
     # save vector state (maybe disabled by test code -> re-enable)
     li x5, 0x600
     csrs mstatus, x5
@@ -158,7 +214,7 @@ _04b_finalize_testcode_stop_on_exception:
 {self.dumpfile.vregs.gen_save()}\
 """
 
-        self.asmhdr += """
+        asmhdr += """
     # restore gp
     csrrw gp, mscratch, gp
 
@@ -168,7 +224,7 @@ _04b_finalize_testcode_stop_on_exception:
 
         # EXCEPTIONS HANDLING CODE
         if handle_exceptions:
-            self.asmhdr += f"""
+            asmhdr += f"""
     # EXCEPTION HANDLER (implements count, and skip or stop)
 _exception_handler:
     # save context
@@ -184,7 +240,7 @@ _exception_handler:
 {self.dumpfile.estate.gen_save()}\
 """
             if skip_on_exception:
-                self.asmhdr += f"""
+                asmhdr += f"""
     # skip on exception: restore context and jump back to next instruction
     # compressed instructions have bits [1:0] != 0b11 and are 2 bytes long
     lhu x7, 0(x5)
@@ -202,7 +258,7 @@ _exception_handler:
     mret
 """
             elif stop_on_exception:
-                self.asmhdr += f"""
+                asmhdr += f"""
     # stop on exception: restore context and jump to stop
 {self.dumpfile.tmpregstore.gen_load()}\
     csrrw gp, mscratch, gp
@@ -214,7 +270,7 @@ _exception_handler:
                 )
 
         # INITIALIZATION CODE
-        self.asmhdr += f"""
+        asmhdr += f"""
     # INITIALIZATION CODE
 _01_testcode_init_exec:
     # set pointer to memory area of dumpfile data (mscratch)
@@ -223,7 +279,7 @@ _01_testcode_init_exec:
 """
 
         if handle_exceptions:
-            self.asmhdr += f"""
+            asmhdr += f"""
     # setup exception handling
     # set vector to _exception_handler (count, and stop or skip on exception)
     la t0, _exception_handler
@@ -245,29 +301,29 @@ _01_testcode_init_exec:
         if has_vector:
             mstatus_comment += "    # - enable vector (mstatus.vs, 0x600)\n"
             mstatus |= 0x600
-        self.asmhdr += f"""\
+        asmhdr += f"""\
 {mstatus_comment}\
     li t0, {hex(mstatus)}
     csrw mstatus, t0\n
 """
 
         if has_float:
-            self.asmhdr += "    # init float registers\n"
+            asmhdr += "    # init float registers\n"
             for i in range(0, 32):
-                self.asmhdr += f"    {rvisacfg.get_fset_max()} f{i}, zero\n"
+                asmhdr += f"    {rvisacfg.get_fset_max()} f{i}, zero\n"
 
         if has_vector:
-            self.asmhdr += """
+            asmhdr += """
     # reset vector vl to max
     vsetvli t0, zero, e8, ta, ma\n
 """
 
         # add register poison
-        self.asmhdr += "    # init integer registers\n"
+        asmhdr += "    # init integer registers\n"
         for i in range(1, 32):
-            self.asmhdr += "    li x" + str(i) + ", " + str(i) + "\n"
+            asmhdr += "    li x" + str(i) + ", " + str(i) + "\n"
 
-        self.asmhdr += """\
+        asmhdr += """\
 _02_testcode_begin:
 
 # restore (allow compressed instructions)
@@ -276,7 +332,7 @@ _02_testcode_begin:
 """
 
         # TAIL CODE (after test code)
-        self.asmtail = """\
+        asmtail = """\
 # -------- END OF TESTCODE --------
 # disable compressed instruction emission for instrumentation code
 .option push
@@ -289,21 +345,183 @@ _03_testcode_end:
 .option pop
 """
 
-        # CREATE COMMAND
-        super().set_program(
-            [
-                config["gcc_bin"],
-                self.asmfile.get_name(),
-                "-o",
-                config["binary"],
-                "-march=" + march,
-                "-mabi=" + mabi,
-                "-nostartfiles",
-                "-Wl,--no-relax",
-                "-T",
-                self.linkerscript.get_name(),
-            ]
-        )
+        return {"asmhdr": asmhdr, "asmtail": asmtail, "linkerscript": linkerscript}
+
+    # TRACE BUILD MODE
+    # After every main fragment of a code block, a snapshot of the architectural
+    # state is taken: all registers (integer, float, vector and their csrs) are
+    # saved to the dump area and hashed. (index + 1, hash) is stored to the trace
+    # buffer of the dump file (see DumpFile.extract_trace).
+    # -> a single run of reference and DuT locates the first fragment with
+    # diverging state (see trace_code_reduction in CodeErrMinRunner)
+    # With DumpFile_trace_states, the saved registers are copied to the trace
+    # buffer as well (see DumpFile.extract_trace_states).
+    # -> a single reference run yields the states in front of all fragments
+    # (entry, see replay_fragments in CodeErrMinRunner)
+    # The snapshot is transparent to the test code (registers and csrs are
+    # restored), only the instrumentation itself is added to the code.
+    # start .. index of first traced fragment (trace entry 0)
+    # entry .. snapshot in front of (instead of after) every traced fragment
+    # returns (code, number of traced fragments)
+    def trace_code(self, code_block, start=0, entry=False):
+        fragments = code_block.main_fragments.as_list()
+        traced = max(0, min(len(fragments) - start, self.dumpfile.trace_capacity))
+        end = start + traced
+        code = [code_block.init_fragments.as_code(), self.gen_trace_snapshot()]
+        for idx, fragment in enumerate(fragments):
+            if entry and start <= idx < end:
+                code.append(self.gen_trace_snapshot_call(idx - start))
+            code.append(fragment.as_code())
+            if not entry and start <= idx < end:
+                code.append(self.gen_trace_snapshot_call(idx - start))
+        code.append(code_block.deinit_fragments.as_code())
+        return ("\n".join(code), traced)
+
+    # call of snapshot function (idx .. index of trace entry)
+    def gen_trace_snapshot_call(self, idx):
+        return f"""\
+{self.TRACE_BEGIN}
+.option push
+.option norvc
+    csrrw gp, mscratch, gp
+{self.dumpfile.tmpregstore.gen_save()}\
+    li t0, {idx}
+    jal t1, _trace_snapshot
+{self.dumpfile.tmpregstore.gen_load()}\
+    csrrw gp, mscratch, gp
+.option pop
+{self.TRACE_END}"""
+
+    # snapshot function (placed in front of the main fragments)
+    # in: gp .. dump area (original gp in mscratch), t0 .. index,
+    #     t1 .. return address, original t0-t2 in tmpregstore
+    def gen_trace_snapshot(self):
+        dumpfile = self.dumpfile
+        istate = dumpfile.istate
+        rvisacfg = self.rvisacfg
+        xlen = rvisacfg.get_xlen()
+        xlenb = xlen // 8
+        has_float = rvisacfg.is_float_needed()
+        has_vector = rvisacfg.is_needed("v")
+
+        mstatus = 0
+        if has_float:
+            mstatus |= 0x6000
+        if has_vector:
+            mstatus |= 0x600
+
+        code = f"""\
+{self.TRACE_BEGIN}
+.option push
+.option norvc
+    j _trace_snapshot_end
+_trace_snapshot:
+    # save integer registers (t0, t1 from tmpregstore)
+{istate.gen_save(x3gp_in_mscratch=True)}\
+    {istate.inst_lreg} x7, {dumpfile.tmpregstore.offset}(gp)
+    {istate.inst_sreg} x7, {istate.offset + 5 * xlenb}(gp)
+    {istate.inst_lreg} x7, {dumpfile.tmpregstore.offset + xlenb}(gp)
+    {istate.inst_sreg} x7, {istate.offset + 6 * xlenb}(gp)
+    mv x28, x5
+    mv x29, x6
+    # enable float/vector (restored below)
+    csrr x30, mstatus
+    li x5, {hex(mstatus)}
+    csrs mstatus, x5
+"""
+
+        if has_float:
+            code += f"""\
+    # save float state and registers
+    csrr x5, fcsr
+{dumpfile.fstate.gen_save()}\
+{dumpfile.fregs.gen_save()}\
+"""
+
+        if has_vector:
+            code += f"""\
+    # save vector state and registers
+    csrr x5, vtype
+    csrr x6, vl
+    csrr x7, vlenb
+    csrr x8, vstart
+    csrr x9, vxrm
+    csrr x10, vxsat
+    csrr x11, vcsr
+{dumpfile.vstate.gen_save()}\
+{dumpfile.vregs.gen_save()}\
+    # restore vector configuration (x6 .. vl, x8 .. vstart)
+    {istate.inst_lreg} x5, {dumpfile.vstate.offset}(gp)
+    vsetvl x0, x6, x5
+    csrw vstart, x8
+"""
+
+        code += f"""\
+    csrw mstatus, x30
+
+    # hash over saved registers
+    addi x5, gp, {istate.offset}
+    li x6, {dumpfile.get_len()}
+    add x6, x6, gp
+    li x7, 0
+1:
+    {istate.inst_lreg} x8, 0(x5)
+    slli x9, x7, 5
+    srli x10, x7, {xlen - 5}
+    or x7, x9, x10
+    xor x7, x7, x8
+    addi x5, x5, {xlenb}
+    bltu x5, x6, 1b
+
+    # store (index + 1, hash) to trace buffer
+    slli x8, x28, {dumpfile.trace_entry_len.bit_length() - 1}
+    li x9, {dumpfile.trace_offset}
+    add x8, x8, x9
+    add x8, x8, gp
+    addi x9, x28, 1
+    {istate.inst_sreg} x9, 0(x8)
+    {istate.inst_sreg} x7, {xlenb}(x8)
+"""
+
+        if dumpfile.trace_states:
+            code += f"""\
+    # copy saved registers to trace state (slot address without mul)
+    li x8, {dumpfile.trace_states_offset}
+    add x8, x8, gp
+    li x9, {dumpfile.trace_state_len}
+    mv x10, x28
+2:
+    beqz x10, 3f
+    add x8, x8, x9
+    addi x10, x10, -1
+    j 2b
+3:
+    mv x5, gp
+    li x6, {dumpfile.get_len()}
+    add x6, x6, gp
+1:
+    {istate.inst_lreg} x9, 0(x5)
+    {istate.inst_sreg} x9, 0(x8)
+    addi x5, x5, {xlenb}
+    addi x8, x8, {xlenb}
+    bltu x5, x6, 1b
+"""
+
+        code += """\
+
+    # restore registers (gp, t0, t1 are restored by caller)
+    mv x6, x29
+"""
+        for reg in [1, 2, 4] + list(range(7, 32)):
+            code += (
+                f"    {istate.inst_lreg} x{reg}, {istate.offset + reg * xlenb}(gp)\n"
+            )
+        code += f"""\
+    jr x6
+_trace_snapshot_end:
+.option pop
+{self.TRACE_END}"""
+        return code
 
     def get_breakpoint(self):
         return self.breakpoint
@@ -7,7 +7,9 @@
 #
 
 import re
+import json
 import jsonpickle
+from .BinFormat import BIN_KIND_CODEBLOCK, BinReader, bin_save, is_bin_file
 
 
 class CodeStats:
@@ -150,10 +152,40 @@ class CodeFragmentList(CodeElement):
         return s
 
 
+# layout of (nested) fragment list for CodeBlock.save_bin
+# (fragments are appended to fragments)
+def _bin_layout(fragments, out):
+    layout = []
+    for e in fragments.as_list():
+        if isinstance(e, CodeFragmentList):
+            layout.append(_bin_layout(e, out))
+        elif isinstance(e, CodeFragment):
+            layout.append(0)
+            out.append(e)
+        else:
+            raise Exception(f"CodeBlock: unsupported element {type(e)}")
+    return layout
+
+
+# inverse of _bin_layout (fragments .. iterator of (code, ann))
+def _bin_build(layout, fragments):
+    list = CodeFragmentList()
+    for e in layout:
+        if e == 0:
+            code, ann = next(fragments)
+            list.add(CodeFragment(code, ann))
+        else:
+            list.add(_bin_build(e, fragments))
+    return list
+
+
 class CodeBlock(CodeElement):
 
+    # json (jsonpickle) or compact binary format (see load_bin)
     @classmethod
     def load(cls, filename):
+        if is_bin_file(filename):
+            return cls.load_bin(filename)
         with open(filename, "r") as file:
             json_data = file.read()
             return jsonpickle.decode(json_data)
@@ -177,11 +209,53 @@ class CodeBlock(CodeElement):
         self.deinit_fragments.replace(oldvalue, newvalue)
         self.main_fragments.replace(oldvalue, newvalue)
 
+    # format by extension: ".bin" .. compact binary (see save_bin), else json
     def save(self, filename):
+        if filename.endswith(".bin"):
+            self.save_bin(filename)
+            return
         json_data = jsonpickle.encode(self)
         with open(filename, "w") as file:
             file.write(json_data)
 
+    # Compact binary format (BinFormat, kind BIN_KIND_CODEBLOCK)
+    #  section 0 .. layout (json) of init, main and deinit fragments
+    #               (0 .. fragment, list .. nested CodeFragmentList)
+    #  section 1 .. code of all fragments (in order, separated by "\0")
+    #  section 2 .. annotations of all fragments (jsonpickle)
+    def save_bin(self, filename):
+        fragments = []
+        layout = [
+            _bin_layout(self.init_fragments, fragments),
+            _bin_layout(self.main_fragments, fragments),
+            _bin_layout(self.deinit_fragments, fragments),
+        ]
+        sections = [
+            json.dumps(layout).encode(),
+            "\0".join(f.get_code() for f in fragments).encode(),
+            jsonpickle.encode([f.get_ann() for f in fragments]).encode(),
+        ]
+        bin_save(filename, BIN_KIND_CODEBLOCK, sections)
+
+    # ann=False .. skip annotations (not decompressed, empty annotations)
+    @classmethod
+    def load_bin(cls, filename, ann=True):
+        with BinReader(filename, BIN_KIND_CODEBLOCK) as reader:
+            layout = json.loads(reader.read_section())
+            codes = reader.read_section().decode().split("\0")
+            anns = None
+            if ann:
+                anns = jsonpickle.decode(reader.read_section().decode())
+
+        if anns is None:
+            anns = [{} for code in codes]
+        fragments = iter(zip(codes, anns))
+        return cls(
+            init_fragments=_bin_build(layout[0], fragments),
+            main_fragments=_bin_build(layout[1], fragments),
+            deinit_fragments=_bin_build(layout[2], fragments),
+        )
+
     def set_init_fragments(self, fragments: CodeFragmentList):
         self.init_fragments = fragments
 
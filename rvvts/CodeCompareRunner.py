@@ -6,9 +6,10 @@
 # SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
 #
 
-from .BasicRunner import Runner, RunnerOutcome, RunnerFile
+from .BasicRunner import Runner, ThreadingRunner, RunnerOutcome, RunnerFile
 from .BuildRunner import BuildRunner
 from .CompareRunner import CompareRunner
+from .RunMemo import RunMemo
 
 
 class CodeCompareRunner(Runner):
@@ -24,12 +25,37 @@ class CodeCompareRunner(Runner):
         subconfig["dir"] = self.get_dir()
 
         subconfig["binary"] = self.binary_file.get_name()
-        self.build_runner = BuildRunner(config=subconfig)
+        BuildRunner_class = config.get("BuildRunner_class", None)
+        if BuildRunner_class is None:
+            BuildRunner_class = BuildRunner
+        self.build_runner = BuildRunner_class(config=subconfig)
 
         subconfig["breakpoint"] = self.build_runner.get_breakpoint()
         self.compare_runner = CompareRunner(config=subconfig)
 
+        # in-session memo of results (optional, shared, see RunMemo)
+        self.memo = config.get("RunMemo", None)
+        if self.memo is not None:
+            self.memo_signature = RunMemo.config_signature("CodeCompareRunner", config)
+
     def task(self):
+        if self.memo is None:
+            return self.task_run()
+
+        key = RunMemo.get_key(self.memo_signature, self.code, self.timeout)
+        # memo=False -> executed anyway (e.g. for artifacts), result replaces entry
+        entry = self.memo.get(key) if self.use_memo else None
+        if entry is not None:
+            res, self.compare_runner.ref_mstate, self.compare_runner.dut_mstate = entry
+            return res
+
+        res = self.task_run()
+        ref_mstate = self.compare_runner.ref_mstate
+        dut_mstate = self.compare_runner.dut_mstate
+        self.memo.put(key, (res, ref_mstate, dut_mstate))
+        return res
+
+    def task_run(self):
         self.build_runner.run(code=self.code, blocking=True, timeout=self.timeout)
         res = self.build_runner.get_result()
         if res[0] != RunnerOutcome.COMPLETE:
@@ -42,7 +68,15 @@ class CodeCompareRunner(Runner):
         )
         return self.compare_runner.get_result()
 
-    def run_handler(self, timeout=1.0, code="", **kwargs):
+    # memo .. False: execute, even if the result is memoized (see RunMemo)
+    def run_handler(self, timeout=1.0, code="", memo=True, **kwargs):
         self.timeout = timeout
         self.code = code
+        self.use_memo = memo
         return super().run_handler(**kwargs)
+
+
+# CodeCompareRunner executed in its own thread (run(blocking=False) + wait)
+# -> e.g. concurrent probes in parallel_delta_code_reduction
+class ThreadingCodeCompareRunner(CodeCompareRunner, ThreadingRunner):
+    pass
@@ -7,19 +7,24 @@
 #
 
 import os
-import glob
 from .CodeBlock import CodeBlock, CodeFragment
-from .BasicRunner import Runner, RunnerOutcome, RunnerFile
-from .CodeCheckRunner import CodeCheckRunner
-from .CodeCompareRunner import CodeCompareRunner
+from .BasicRunner import Runner, RunnerOutcome, RunnerFile, lazy_runner
+from .CodeCheckRunner import CodeCheckRunner, ThreadingCodeCheckRunner
+from .CodeCompareRunner import CodeCompareRunner, ThreadingCodeCompareRunner
+from .QEMUSnapshotCompareRunner import QEMUSnapshotCompareRunner
+from .TraceCompareRunner import TraceCompareRunner
+from .TimeoutTriageRunner import TimeoutTriageRunner
 from .AFC import AFC
+from .RunMemo import RunMemo
+from .FailureBuckets import FailureBuckets
+from .Artifact import artifact_ext, save_artifact
 
 
-def delta_code_reduction(runner, code, log=False, **kwargs):
+# binary search for the first bad prefix
+# test_f(test) .. runs prefix with test main fragments -> returns (test_code, ret)
+def delta_reduction(test_f, code, log=False):
 
-    start = 0
     end = code.main_len()
-
     bad_code = code
     bad_ret = (RunnerOutcome.INVALID, None)
     bad = end
@@ -31,8 +36,7 @@ def delta_code_reduction(runner, code, log=False, **kwargs):
         if log:
             print("good=", good, "bad=", bad, "test=", test, end=" -> ")
 
-        test_code = code.get_part(start, test)
-        ret = runner.run(blocking=True, code=test_code.as_code(), **kwargs)
+        test_code, ret = test_f(test)
         if ret[0] != RunnerOutcome.COMPLETE:
             if log:
                 print("bad")
@@ -54,6 +58,192 @@ def delta_code_reduction(runner, code, log=False, **kwargs):
     return (good, bad, bad_code, bad_ret)
 
 
+def delta_code_reduction(runner, code, log=False, **kwargs):
+
+    def test_f(test):
+        test_code = code.get_part(0, test)
+        return (
+            test_code,
+            runner.run(blocking=True, code=test_code.as_code(), **kwargs),
+        )
+
+    return delta_reduction(test_f, code, log)
+
+
+# delta_code_reduction with concurrent probes (one per runner, see
+# ThreadingCodeCompareRunner)
+# Each round splits the interval (good, bad) at k = len(runners) points ->
+# the interval shrinks by k + 1 per round instead of 2. For failures that
+# persist in longer prefixes (as assumed by delta_reduction), the result is
+# the same as with delta_code_reduction.
+# returns (good, bad, bad_code, bad_ret, (bad_ref_mstate, bad_dut_mstate))
+def parallel_delta_code_reduction(runners, code, log=False, **kwargs):
+
+    end = code.main_len()
+    bad_code = code
+    bad_ret = (RunnerOutcome.INVALID, None)
+    bad_mstates = (None, None)
+    bad = end
+    good = -1
+
+    while bad - good > 1:
+
+        k = min(len(runners), bad - good - 1)
+        tests = [good + (bad - good) * (i + 1) // (k + 1) for i in range(k)]
+        if log:
+            print("good=", good, "bad=", bad, "tests=", tests, end=" -> ")
+
+        probes = []
+        for test, runner in zip(tests, runners):
+            test_code = code.get_part(0, test)
+            runner.run(blocking=False, code=test_code.as_code(), **kwargs)
+            probes.append((test, test_code, runner))
+        for test, test_code, runner in probes:
+            runner.wait()
+
+        # first bad probe -> new bad, last good probe before -> new good
+        for test, test_code, runner in probes:
+            ret = runner.get_result()
+            if ret[0] != RunnerOutcome.COMPLETE:
+                bad = test
+                bad_code = test_code
+                bad_ret = ret
+                bad_mstates = (
+                    runner.compare_runner.ref_mstate,
+                    runner.compare_runner.dut_mstate,
+                )
+                break
+            good = test
+        if log:
+            print("good=", good, "bad=", bad)
+
+    return (good, bad, bad_code, bad_ret, bad_mstates)
+
+
+# delta_code_reduction with snapshots (see QEMUSnapshotCompareRunner)
+# returns None, if recording is not possible (-> use delta_code_reduction)
+def snapshot_code_reduction(runner, code, log=False, timeout=1.0, **kwargs):
+
+    if not runner.record(code, timeout=timeout):
+        return None
+
+    def test_f(test):
+        return (
+            code.get_part(0, test),
+            runner.run(blocking=True, prefix_len=test, timeout=timeout, **kwargs),
+        )
+
+    return delta_reduction(test_f, code, log)
+
+
+# confirm reduction result of strategies, which do not execute prefixes from
+# reset: prefix with good fragments passes, prefix with bad fragments fails
+# returns (good, bad, bad_code, bad_ret) or None (not confirmed)
+def confirm_code_reduction(runner, code, good, bad, **kwargs):
+    if good >= 0:
+        good_code = code.get_part(0, good)
+        ret = runner.run(blocking=True, code=good_code.as_code(), **kwargs)
+        if ret[0] != RunnerOutcome.COMPLETE:
+            return None
+    # bad prefix last -> end states of runner belong to reduced code
+    bad_code = code.get_part(0, bad)
+    bad_ret = runner.run(blocking=True, code=bad_code.as_code(), **kwargs)
+    if bad_ret[0] == RunnerOutcome.COMPLETE:
+        return None
+    return (good, bad, bad_code, bad_ret)
+
+
+# delta_code_reduction with reference checkpoints
+# The reference end state of every good probe is a checkpoint. Later probes
+# restore the latest checkpoint (MachineState.as_CodeFragmentList) and execute
+# only the fragment window from there to the candidate prefix
+# -> probes shrink with the interval instead of growing with the prefix.
+# Checkpoints contain registers only (no memory) -> the result is confirmed
+# with runs from reset.
+# returns None, if the result is not confirmed (-> use delta_code_reduction)
+def checkpoint_code_reduction(runner, code, log=False, **kwargs):
+
+    checkpoint = {"idx": 0, "mstate": None}
+
+    def test_f(test):
+        start = checkpoint["idx"]
+        if checkpoint["mstate"] is None:
+            probe = code.get_part(0, test)
+        else:
+            probe = CodeBlock(
+                init_fragments=checkpoint["mstate"].as_CodeFragmentList(),
+                main_fragments=code.main_fragments.get_part(start, test),
+                deinit_fragments=code.deinit_fragments,
+            )
+        ret = runner.run(blocking=True, code=probe.as_code(), **kwargs)
+        if ret[0] == RunnerOutcome.COMPLETE and test > start:
+            checkpoint["idx"] = test
+            checkpoint["mstate"] = runner.compare_runner.ref_mstate
+        return (code.get_part(0, test), ret)
+
+    reduced = delta_reduction(test_f, code, log)
+    if reduced is None:
+        return None
+    return confirm_code_reduction(runner, code, reduced[0], reduced[1], **kwargs)
+
+
+# index of first diverging trace entry (see BuildRunner.trace_code)
+# returns None, if traces are equal or not available
+def trace_divergence(ref_trace, dut_trace):
+    if ref_trace is None or dut_trace is None:
+        return None
+    for idx, (ref, dut) in enumerate(zip(ref_trace, dut_trace)):
+        if ref != dut:
+            return idx
+    if len(ref_trace) != len(dut_trace):
+        # one side stopped early (e.g. stop on exception)
+        return min(len(ref_trace), len(dut_trace))
+    return None
+
+
+# reduction with per fragment state traces (see BuildRunner.trace_code)
+# A single traced run of reference and DuT (trace_runner) locates the first
+# fragment with diverging state. The prefixes before and including this
+# fragment are confirmed with runner (state in memory is not traced).
+# returns None, if the fragment can not be located (-> use delta_code_reduction)
+def trace_code_reduction(trace_runner, runner, code, log=False, **kwargs):
+
+    traced_code, traced = trace_runner.build_runner.trace_code(code)
+    ret = trace_runner.run(blocking=True, code=traced_code, **kwargs)
+    if ret[0] != RunnerOutcome.ERROR:
+        return None
+    ref_mstate = trace_runner.compare_runner.ref_mstate
+    dut_mstate = trace_runner.compare_runner.dut_mstate
+    if ref_mstate is None or dut_mstate is None:
+        return None
+    good = trace_divergence(ref_mstate.trace, dut_mstate.trace)
+    if good is None or good >= traced:
+        return None
+    if log:
+        print("trace: first diverging fragment=", good)
+
+    return confirm_code_reduction(runner, code, good, good + 1, **kwargs)
+
+
+# reduction with commit logs (see TraceCompareRunner)
+# A single run of reference and DuT with commit logs locates the fragment of
+# the first divergent instruction, which is confirmed with runner.
+# returns None, if the fragment can not be located (-> use delta_code_reduction)
+def commit_log_code_reduction(trace_runner, runner, code, log=False, **kwargs):
+
+    ret = trace_runner.run(blocking=True, code=trace_runner.mark_code(code), **kwargs)
+    divergence = trace_runner.divergence
+    if ret[0] != RunnerOutcome.ERROR or divergence is None:
+        return None
+    good = divergence.fragment
+    if good < 0 or good >= code.main_len():
+        return None
+    if log:
+        print(divergence)
+
+    return confirm_code_reduction(runner, code, good, good + 1, **kwargs)
+
+
 def gen_byte_data(symname, values):
     data = (symname + ":").ljust(9) + ".byte "
     for value in values:
@@ -61,6 +251,198 @@ def gen_byte_data(symname, values):
     return data[:-1] + ""
 
 
+# ddmin over list of elements
+# test_batch(candidates) .. evaluates candidates (lists of elements)
+# concurrently -> list of bools (True .. failure reproduced)
+# Candidates are evaluated in batches of batch_size in the order of sequential
+# ddmin (subsets, then complements) and the first reproducing one is taken
+# -> same result as sequential ddmin
+# returns 1-minimal reproducing list of elements
+def ddmin(elements, test_batch, batch_size):
+
+    # failure independent of elements
+    if test_batch([[]])[0]:
+        return []
+
+    n = 2
+    while len(elements) >= 2:
+        chunk = -(-len(elements) // n)
+        subsets = []
+        complements = []
+        for i in range(0, len(elements), chunk):
+            end = i + chunk
+            subsets.append(elements[i:end])
+            complements.append(elements[:i] + elements[end:])
+        candidates = subsets
+        if len(subsets) > 2:
+            candidates = subsets + complements
+
+        found = None
+        for i in range(0, len(candidates), batch_size):
+            end = i + batch_size
+            batch = candidates[i:end]
+            for idx, reproduced in enumerate(test_batch(batch)):
+                if reproduced:
+                    found = i + idx
+                    break
+            if found is not None:
+                break
+
+        if found is None:
+            if n >= len(elements):
+                break
+            n = min(len(elements), 2 * n)
+        elif found < len(subsets):
+            elements = candidates[found]
+            n = 2
+        else:
+            elements = candidates[found]
+            n = max(n - 1, 2)
+
+    return elements
+
+
+# minimize restored state of minimized code (see MachineState.restore_elements)
+# candidates are executed concurrently on runners (ThreadingCodeCompareRunner)
+# returns set of restored state element names
+def state_ddmin(runners, ref_mstate, minimized_code, **kwargs):
+
+    def candidate_code(elements):
+        mset = set().union(*elements)
+        return CodeBlock(
+            init_fragments=ref_mstate.as_CodeFragmentList(mset=mset),
+            main_fragments=minimized_code.main_fragments,
+            deinit_fragments=minimized_code.deinit_fragments,
+        ).as_code()
+
+    def test_batch(candidates):
+        for runner, elements in zip(runners, candidates):
+            runner.run(blocking=False, code=candidate_code(elements), **kwargs)
+        results = []
+        for runner, elements in zip(runners, candidates):
+            runner.wait()
+            results.append(runner.get_result()[0] == RunnerOutcome.ERROR)
+        return results
+
+    elements = ddmin(ref_mstate.restore_elements(), test_batch, len(runners))
+    return set().union(*elements)
+
+
+# run codes on runners (threading, see e.g. ThreadingCodeCheckRunner)
+# in batches of len(runners), returns results in order of codes
+def parallel_runs(runners, codes, **kwargs):
+    results = []
+    for start in range(0, len(codes), len(runners)):
+        end = start + len(runners)
+        batch = list(zip(runners, codes[start:end]))
+        for runner, code in batch:
+            runner.run(blocking=False, code=code, **kwargs)
+        for runner, code in batch:
+            runner.wait()
+            results.append(runner.get_result())
+    return results
+
+
+# code block executing fragment from restored state (see code_minimize)
+def isolated_code(code, fragment, init_fragments):
+    isolated = CodeBlock(
+        init_fragments=init_fragments,
+        deinit_fragments=code.deinit_fragments,
+    )
+    isolated.add(CodeFragment("    // INSTRUCTION (" + str(fragment.get_ann()) + ")"))
+    isolated.add(fragment)
+    return isolated
+
+
+# isolated replay of every main fragment (multi bug extraction)
+# The reference states in front of all fragments are taken from the trace
+# states of a single traced reference run (state_runners, see
+# BuildRunner.trace_code with DumpFile_trace_states; more runs only if the
+# trace buffer holds less states than fragments). Every fragment is replayed
+# from its restored full state (compare_runners) -> independent failures
+# behind the first failing fragment are found as well. Failing replays are
+# confirmed (restore alone completes) and minimized to the state filtered by
+# the annotations of the fragment (as code_minimize), if this still fails.
+# returns list of (fragment index, replay code block, state minimized) of failing fragments
+def replay_fragments(state_runners, compare_runners, code, log=False, **kwargs):
+
+    # reference states in front of fragments (windows of trace capacity)
+    build_runner = state_runners[0].build_runner
+    capacity = build_runner.dumpfile.trace_capacity
+    codes = []
+    for start in range(0, code.main_len() if capacity > 0 else 0, capacity):
+        end = start + capacity
+        traced_code, _ = build_runner.trace_code(
+            code.get_part(0, end), start=start, entry=True
+        )
+        codes.append(traced_code)
+    replays = []
+    for res in parallel_runs(state_runners, codes, **kwargs):
+        if res[0] != RunnerOutcome.COMPLETE:
+            # e.g. timeout of reference -> later fragments unreachable
+            break
+        states = res[1]["ref:"].trace_states
+        if states is None:
+            # not traced (e.g. reference state from a store)
+            break
+        for ref_mstate in states:
+            replays.append((len(replays), ref_mstate))
+        if len(states) < capacity:
+            # trace stopped (e.g. stop on exception)
+            break
+    if log:
+        print("replay_fragments: runs=", len(codes), "states=", len(replays))
+
+    # replay all fragments from full state
+    fragments = [code.main_fragments.get_part(idx, idx + 1) for idx, _ in replays]
+    full_codes = [
+        isolated_code(code, fragment, ref_mstate.as_CodeFragmentList())
+        for (idx, ref_mstate), fragment in zip(replays, fragments)
+    ]
+    results = parallel_runs(
+        compare_runners, [c.as_code() for c in full_codes], **kwargs
+    )
+    failing = [
+        (idx, ref_mstate, fragment, full_code)
+        for (idx, ref_mstate), fragment, full_code, res in zip(
+            replays, fragments, full_codes, results
+        )
+        if res[0] == RunnerOutcome.ERROR
+    ]
+    if log:
+        print("replay_fragments: failing=", [f[0] for f in failing])
+
+    # confirm (restore alone) and try filtered state
+    filtered_codes = []
+    codes = []
+    for idx, ref_mstate, fragment, full_code in failing:
+        filtered_code = isolated_code(
+            code, fragment, ref_mstate.as_CodeFragmentList(fragment.get_ann())
+        )
+        filtered_codes.append(filtered_code)
+        codes.append(CodeBlock(main_fragments=full_code.init_fragments).as_code())
+        codes.append(CodeBlock(main_fragments=filtered_code.init_fragments).as_code())
+        codes.append(filtered_code.as_code())
+    results = iter(parallel_runs(compare_runners, codes, **kwargs))
+
+    found = []
+    for (idx, ref_mstate, fragment, full_code), filtered_code in zip(
+        failing, filtered_codes
+    ):
+        full_init, filtered_init, filtered = next(results), next(results), next(results)
+        if full_init[0] != RunnerOutcome.COMPLETE:
+            # restore itself fails -> not caused by fragment
+            continue
+        if (
+            filtered_init[0] == RunnerOutcome.COMPLETE
+            and filtered[0] == RunnerOutcome.ERROR
+        ):
+            found.append((idx, filtered_code, True))
+        else:
+            found.append((idx, full_code, False))
+    return found
+
+
 # TODO: integrate in class and rework/cleanup return
 def code_minimize(
     codecheckrunner: CodeCheckRunner,
@@ -68,6 +450,7 @@ def code_minimize(
     code: CodeBlock,
     good_idx,
     bad_idx,
+    state_min_runners=None,
     **kwargs,
 ):
 
@@ -94,7 +477,8 @@ def code_minimize(
     minimized_code.add(minimized_fragment)
     # ############# try to minimize with minimized state
 
-    # TODO: minimize state here
+    # state of registers used by the bad fragment (annotation)
+    # (full state is minimized by state_ddmin below, if this does not fail)
     minimized_code.set_init_fragments(
         ref_mstate.as_CodeFragmentList(minimized_fragment.get_ann())
     )
@@ -134,6 +518,30 @@ def code_minimize(
     if res[0] != RunnerOutcome.ERROR:
         return (False, False, res, None, None)
 
+    if not state_min_runners:
+        return (True, False, res, ref_mstate, minimized_code)
+
+    # ############# minimize full state (ddmin)
+
+    mset = state_ddmin(state_min_runners, ref_mstate, minimized_code, **kwargs)
+    state_code = CodeBlock(
+        init_fragments=ref_mstate.as_CodeFragmentList(mset=mset),
+        main_fragments=minimized_code.main_fragments,
+        deinit_fragments=minimized_code.deinit_fragments,
+    )
+    # confirm as above (end states of codecomparerunner belong to result)
+    state_res = codecomparerunner.run(
+        blocking=True, code=state_code.init_fragments.as_code(), **kwargs
+    )
+    if state_res[0] == RunnerOutcome.COMPLETE:
+        state_res = codecomparerunner.run(
+            blocking=True, code=state_code.as_code(), **kwargs
+        )
+        if state_res[0] == RunnerOutcome.ERROR:
+            return (True, True, state_res, ref_mstate, state_code)
+
+    # not confirmed -> full state
+    res = codecomparerunner.run(blocking=True, code=minimized_code.as_code(), **kwargs)
     return (True, False, res, ref_mstate, minimized_code)
 
 
@@ -156,29 +564,127 @@ class CodeErrMinRunner(Runner):
         self.unknown_faults = 0
         self.errors = 0
         self.reductions = 0
+        # "trace" reductions falling back to "delta"
+        self.trace_fallbacks = 0
+        # "checkpoint" reductions falling back to "delta"
+        self.checkpoint_fallbacks = 0
+        # "commit_log" reductions falling back to "delta"
+        self.commit_log_fallbacks = 0
         self.minimizations_state = 0
         self.minimizations = 0
         self.AFC_category_errors = {}
         self.instr_errors = {}
+        # tests with multi bug extraction and failing fragments found
+        self.multi_bug_runs = 0
+        self.multi_bug_fragments = 0
+
+        # format of saved code blocks and machine states ("json" or "bin")
+        self.artifact_format = config.get("CodeErrMinRunner_artifact_format", "json")
+        self.artifact_ext = artifact_ext(self.artifact_format)
 
         if config["log"]:
             self.status = RunnerFile(dir=self.get_dir(), name="code_status.log")
             self.statslog = RunnerFile(dir=self.get_dir(), name="stats.log")
 
-        subconfig_compare = config.copy()
-        subconfig_compare["dir"] = self.get_dir()
-        subconfig_check = subconfig_compare.copy()
+        self.subconfig_compare = config.copy()
+        self.subconfig_compare["dir"] = self.get_dir()
+        # in-session memo of compare/check results (shared by all child runners)
+        # -> code executed repeatedly during reduction/minimization runs only once
+        self.memo = None
+        memo_size = config.get("CodeErrMinRunner_memo_size", 16)
+        if memo_size > 0:
+            self.memo = RunMemo(max_entries=memo_size)
+            self.subconfig_compare["RunMemo"] = self.memo
+        self.subconfig_check = self.subconfig_compare.copy()
         # disable coverage in check runner -> performance
-        subconfig_check["RefCovRunner_coverage"] = None
+        self.subconfig_check["RefCovRunner_coverage"] = None
+        # trace build mode for "trace" reduction
+        self.subconfig_trace = self.subconfig_check.copy()
+        self.subconfig_trace["DumpFile_trace"] = True
+        # traces are not stored (see RefStateStore) -> always executed
+        self.subconfig_trace["RefCovRunner_store_dir"] = None
+
+        # strategy for reducing failing code to the first failing fragment
+        # "delta" .. binary search, every candidate prefix is executed from reset
+        # "qemu_snapshot" .. like delta, but DuT (QEMU) restores snapshots taken
+        #                   at fragment boundaries (see QEMUSnapshotCompareRunner)
+        # "trace" .. single run with per fragment state traces locates the first
+        #            diverging fragment (see trace_code_reduction), fall back to
+        #            "delta" if inconclusive
+        # "checkpoint" .. like delta, but probes start at the reference state of
+        #                 the last good probe (see checkpoint_code_reduction)
+        # "commit_log" .. single run with commit logs locates the first divergent
+        #                 instruction (see commit_log_code_reduction), needs
+        #                 reference and DuT with commit log support
+        self.reduction = config.get("CodeErrMinRunner_reduction", "delta")
+        if self.reduction == "qemu_snapshot" and not (
+            QEMUSnapshotCompareRunner.is_supported(config)
+        ):
+            print(
+                "CodeErrMinRunner: WARNING: qemu_snapshot reduction needs QEMU as DuT "
+                + '-> fall back to "delta"'
+            )
+            self.reduction = "delta"
+        elif self.reduction == "commit_log" and not (
+            TraceCompareRunner.is_supported(config)
+        ):
+            print(
+                "CodeErrMinRunner: WARNING: commit_log reduction needs reference and "
+                + 'DuT with commit log support -> fall back to "delta"'
+            )
+            self.reduction = "delta"
+        elif self.reduction not in [
+            "delta",
+            "qemu_snapshot",
+            "trace",
+            "checkpoint",
+            "commit_log",
+        ]:
+            raise Exception(
+                "invalid CodeErrMinRunner_reduction: " + str(self.reduction)
+            )
 
-        # runner for tests
-        self.codecomparerunner = CodeCompareRunner(config=subconfig_compare)
-        # runners for intermediate steps (no coverage)
-        self.codecomparerunner_red = CodeCompareRunner(config=subconfig_check)
-        self.codecomparerunner_min = self.codecomparerunner_red
+        # number of concurrent probes for "delta" reduction (and fallbacks)
+        # 1 .. sequential binary search, k > 1 .. k-ary search on k runners
+        # (see parallel_delta_code_reduction)
+        self.reduction_parallel = config.get("CodeErrMinRunner_reduction_parallel", 1)
+        if self.reduction_parallel < 1:
+            raise Exception(
+                "invalid CodeErrMinRunner_reduction_parallel: "
+                + str(self.reduction_parallel)
+            )
 
-        # runner for register values
-        self.codecheckrunner = CodeCheckRunner(config=subconfig_check)
+        # minimize restored state with ddmin, if the filtered state (see
+        # MachineState.ann2matchset) does not reproduce the failure
+        # 0 .. disabled (full state), k > 0 .. k concurrent candidates
+        self.state_min_parallel = config.get("CodeErrMinRunner_state_min_parallel", 0)
+
+        # multi bug extraction: replay every main fragment of failing tests
+        # in isolation (see replay_fragments)
+        # 0 .. disabled, k > 0 .. k concurrent runs
+        self.multi_bug = config.get("CodeErrMinRunner_multi_bug", 0)
+        # reference runs with trace states (states in front of all fragments)
+        # with larger dump file reserve -> trace buffer for many fragments
+        self.subconfig_states = self.subconfig_trace.copy()
+        self.subconfig_states["DumpFile_trace_states"] = True
+        self.subconfig_states["dumpfile_reserve"] = max(
+            config["dumpfile_reserve"],
+            config.get("CodeErrMinRunner_multi_bug_reserve", 512 * 1024),
+        )
+
+        # re-execute timed out tests in background (see TimeoutTriageRunner)
+        self.timeout_triage_enable = config.get(
+            "CodeErrMinRunner_timeout_triage", False
+        )
+        # next to the archived runner (not part of archived test dirs, see
+        # ArchiveRunner; set by FuzzCodeErrMinRunner, TestsetCodeErrMinRunner)
+        self.subconfig_triage = self.subconfig_compare.copy()
+        self.subconfig_triage["dir"] = config.get(
+            "TimeoutTriageRunner_dir", os.path.dirname(self.get_dir())
+        )
+
+        # NOTE: child runners are created lazily on first use (see below)
+        # -> runners for reduction and minimization are only created on first error
 
         # Automated failure categorization (AFC)
         AFC_Categorizer_class = config.get("AFC_Categorizer", None)
@@ -186,8 +692,88 @@ class CodeErrMinRunner(Runner):
             AFC_Categorizer_class = AFC
         self.AFC_Categorizer = AFC_Categorizer_class(config)
 
+        # reduce and minimize failing tests (False .. only test, e.g. failing
+        # tests are minimized by a MinimizeService)
+        self.minimize = config.get("CodeErrMinRunner_minimize", True)
+
+        # skip minimization of failures in buckets with enough minimized
+        # exemplars (see FailureBuckets; 0 .. disabled)
+        # shared instance from config ("FailureBuckets") or own instance
+        self.buckets = config.get("FailureBuckets", None)
+        bucket_exemplars = config.get("CodeErrMinRunner_bucket_exemplars", 0)
+        if self.buckets is None and bucket_exemplars > 0:
+            self.buckets = FailureBuckets(
+                exemplars=bucket_exemplars,
+                sample_every=config.get("CodeErrMinRunner_bucket_sample_every", 0),
+            )
+        if config["log"] and self.buckets is not None:
+            self.bucketslog = RunnerFile(dir=self.get_dir(), name="buckets.log")
+
         self.reset_run()
 
+    # runner for tests
+    @lazy_runner
+    def codecomparerunner(self):
+        return CodeCompareRunner(config=self.subconfig_compare)
+
+    # runners for intermediate steps (no coverage)
+    @lazy_runner
+    def codecomparerunner_red(self):
+        return CodeCompareRunner(config=self.subconfig_check)
+
+    @lazy_runner
+    def codecomparerunner_snap(self):
+        return QEMUSnapshotCompareRunner(config=self.subconfig_check)
+
+    @lazy_runner
+    def codecomparerunners_par(self):
+        return [
+            ThreadingCodeCompareRunner(config=self.subconfig_check)
+            for i in range(self.reduction_parallel)
+        ]
+
+    @lazy_runner
+    def codecomparerunners_state(self):
+        return [
+            ThreadingCodeCompareRunner(config=self.subconfig_check)
+            for i in range(self.state_min_parallel)
+        ]
+
+    @lazy_runner
+    def codecheckrunners_multi(self):
+        return [
+            ThreadingCodeCheckRunner(config=self.subconfig_states)
+            for i in range(self.multi_bug)
+        ]
+
+    @lazy_runner
+    def codecomparerunners_multi(self):
+        return [
+            ThreadingCodeCompareRunner(config=self.subconfig_check)
+            for i in range(self.multi_bug)
+        ]
+
+    @lazy_runner
+    def codecomparerunner_trace(self):
+        return CodeCompareRunner(config=self.subconfig_trace)
+
+    @lazy_runner
+    def tracecomparerunner(self):
+        return TraceCompareRunner(config=self.subconfig_check)
+
+    @lazy_runner
+    def timeout_triage(self):
+        return TimeoutTriageRunner(config=self.subconfig_triage)
+
+    @property
+    def codecomparerunner_min(self):
+        return self.codecomparerunner_red
+
+    # runner for register values
+    @lazy_runner
+    def codecheckrunner(self):
+        return CodeCheckRunner(config=self.subconfig_check)
+
     def reset_run(self):
         self.orig_code_block = None
         self.orig_end_ref_mstate = None
@@ -206,8 +792,22 @@ class CodeErrMinRunner(Runner):
         self.min_end_ref_mstate = None
         self.min_end_dut_mstate = None
 
-        for f in glob.glob(self.dir + "/??_*.json"):
-            os.remove(f)
+        # failing fragments of multi bug extraction
+        # list of (fragment index, instr, replay code block, state minimized)
+        self.multi_bugs = []
+
+        self.bucket_signature = None
+        # reason for skipped minimization ("bucket", "deferred"; None .. not skipped)
+        self.minimize_skipped = None
+
+        self.persist_reset()
+        # AFC report of previous test (not written, if minimization is skipped)
+        afc_report = os.path.join(self.get_dir(), "AFC_report.log")
+        if os.path.exists(afc_report):
+            os.remove(afc_report)
+        # results of previous tests are not needed anymore (memory)
+        if self.memo is not None:
+            self.memo.clear()
 
     def redmin_code(self, code_block, recursion=False):
 
@@ -233,21 +833,77 @@ class CodeErrMinRunner(Runner):
 
         # TRY TO REDUCE
 
-        good_idx, bad_idx, reduced_code, ret_reduced = delta_code_reduction(
-            runner=self.codecomparerunner_red,
-            code=code_block,
-            log=False,
-            **self.runkwargs,
-        )
+        red_runner = self.codecomparerunner_red
+        reduced = None
+        if self.reduction == "qemu_snapshot":
+            red_runner = self.codecomparerunner_snap
+            reduced = snapshot_code_reduction(
+                runner=red_runner,
+                code=code_block,
+                log=False,
+                **self.runkwargs,
+            )
+        elif self.reduction == "trace":
+            reduced = trace_code_reduction(
+                trace_runner=self.codecomparerunner_trace,
+                runner=red_runner,
+                code=code_block,
+                log=False,
+                **self.runkwargs,
+            )
+            if reduced is None:
+                self.trace_fallbacks += 1
+        elif self.reduction == "checkpoint":
+            reduced = checkpoint_code_reduction(
+                runner=red_runner,
+                code=code_block,
+                log=False,
+                **self.runkwargs,
+            )
+            if reduced is None:
+                self.checkpoint_fallbacks += 1
+        elif self.reduction == "commit_log":
+            reduced = commit_log_code_reduction(
+                trace_runner=self.tracecomparerunner,
+                runner=red_runner,
+                code=code_block,
+                log=False,
+                **self.runkwargs,
+            )
+            if reduced is None:
+                self.commit_log_fallbacks += 1
+        red_mstates = None
+        if reduced is None and self.reduction_parallel > 1:
+            reduced = parallel_delta_code_reduction(
+                runners=self.codecomparerunners_par,
+                code=code_block,
+                log=False,
+                **self.runkwargs,
+            )
+            red_mstates = reduced[4]
+            reduced = reduced[:4]
+        elif reduced is None:
+            red_runner = self.codecomparerunner_red
+            reduced = delta_code_reduction(
+                runner=red_runner,
+                code=code_block,
+                log=False,
+                **self.runkwargs,
+            )
+        good_idx, bad_idx, reduced_code, ret_reduced = reduced
         if good_idx < 0:
             # the state initialization itself is the problem -> may not happen (was checked before)
             return (code_status, code_block, None)
 
+        if red_mstates is None:
+            red_mstates = (
+                red_runner.compare_runner.ref_mstate,
+                red_runner.compare_runner.dut_mstate,
+            )
         code_status = self.CODE_STATUS_REDUCED
         res_code_block = reduced_code
         self.red_code_block = res_code_block
-        self.red_end_ref_mstate = self.codecomparerunner_red.compare_runner.ref_mstate
-        self.red_end_dut_mstate = self.codecomparerunner_red.compare_runner.dut_mstate
+        self.red_end_ref_mstate, self.red_end_dut_mstate = red_mstates
 
         # TRY TO MINIMIZE
 
@@ -258,6 +914,9 @@ class CodeErrMinRunner(Runner):
                 code=code_block,
                 good_idx=good_idx,
                 bad_idx=bad_idx,
+                state_min_runners=(
+                    self.codecomparerunners_state if self.state_min_parallel else None
+                ),
                 **self.runkwargs,
             )
         )
@@ -320,8 +979,10 @@ class CodeErrMinRunner(Runner):
             self.ignores += 1
             return ret
         elif ret[0] == RunnerOutcome.TIMEOUT:
-            # TODO: improve in future -> try to remove timeout
             self.timeouts += 1
+            if self.timeout_triage_enable:
+                # classify in background (flake, dut hang, reference hang)
+                self.timeout_triage.submit(self.orig_code_block, **self.runkwargs)
             return ret
         elif ret[0] != RunnerOutcome.ERROR:
             # paranoia fallback (unkown error -> stop)
@@ -329,6 +990,27 @@ class CodeErrMinRunner(Runner):
             return ret
         self.errors += 1
 
+        if not self.minimize:
+            # minimized elsewhere
+            self.minimize_skipped = "deferred"
+            return ret
+
+        if self.buckets is not None:
+            self.bucket_signature = self.buckets.get_signature(
+                self.orig_code_block,
+                self.orig_end_ref_mstate,
+                self.orig_end_dut_mstate,
+                hint=self.AFC_Categorizer.hint(
+                    self.orig_code_block,
+                    self.orig_end_ref_mstate,
+                    self.orig_end_dut_mstate,
+                ),
+            )
+            if not self.buckets.check(self.bucket_signature):
+                # known failure -> only counted
+                self.minimize_skipped = "bucket"
+                return ret
+
         code_status, res_code_block, ret2 = self.redmin_code(self.res_code_block)
         if code_status == self.CODE_STATUS_EXECUTED:
             # nothing to do
@@ -348,8 +1030,68 @@ class CodeErrMinRunner(Runner):
 
         self.code_status = code_status
         self.res_code_block = res_code_block
+
+        if self.multi_bug > 0:
+            self.multi_bug_runs += 1
+            for idx, replay_code, minimized in replay_fragments(
+                state_runners=self.codecheckrunners_multi,
+                compare_runners=self.codecomparerunners_multi,
+                code=self.orig_code_block,
+                log=False,
+                **self.runkwargs,
+            ):
+                fragment = self.orig_code_block.main_fragments.get_part(idx, idx + 1)
+                instr = str(fragment).strip().split("\n")[-1].strip().split()[0]
+                self.multi_bugs.append((idx, instr, replay_code, minimized))
+            self.multi_bug_fragments += len(self.multi_bugs)
+
         return ret
 
+    def timeout_triage_stats(self):
+        if not self.timeout_triage_enable:
+            return ""
+        stats = self.timeout_triage.get_stats()
+        return "".join(
+            "timeout_triage_" + key + ": " + str(value) + "\n"
+            for key, value in stats.items()
+        )
+
+    def reduction_stats(self):
+        if self.reduction == "trace":
+            return "trace_fallbacks: " + str(self.trace_fallbacks) + "\n"
+        if self.reduction == "checkpoint":
+            return "checkpoint_fallbacks: " + str(self.checkpoint_fallbacks) + "\n"
+        if self.reduction == "commit_log":
+            return "commit_log_fallbacks: " + str(self.commit_log_fallbacks) + "\n"
+        return ""
+
+    def multi_bug_stats(self):
+        if self.multi_bug <= 0:
+            return ""
+        return (
+            "multi_bug_runs: "
+            + str(self.multi_bug_runs)
+            + "\nmulti_bug_fragments: "
+            + str(self.multi_bug_fragments)
+            + "\n"
+        )
+
+    def bucket_stats(self):
+        if self.buckets is None:
+            return ""
+        stats = self.buckets.get_stats()
+        return "".join(
+            "bucket_" + key + ": " + str(value) + "\n" for key, value in stats.items()
+        )
+
+    def memo_stats(self):
+        if self.memo is None:
+            return ""
+        stats = self.memo.get_stats()
+        return "".join(
+            "memo_" + key + ": " + str(value) + "\n" for key, value in stats.items()
+        )
+
     def get_error_cause(self):
         return self.error_cause_category + "-" + self.error_cause_instr
 
@@ -378,12 +1120,37 @@ class CodeErrMinRunner(Runner):
                 + "\nminimizations_state: "
                 + str(self.minimizations_state)
                 + "\n"
+                + self.reduction_stats()
+                + self.timeout_triage_stats()
+                + self.multi_bug_stats()
+                + self.bucket_stats()
+                + self.memo_stats()
             )
 
-        if ret[0] == RunnerOutcome.ERROR:
+        if ret[0] == RunnerOutcome.ERROR and self.minimize_skipped is not None:
+            # not minimized -> error cause of bucket exemplar (no re-run, no AFC)
+            cause = None
+            if self.minimize_skipped == "bucket":
+                cause = self.buckets.get_cause(self.bucket_signature)
+            if cause is None:
+                # deferred or exemplar not finished yet (concurrent runners)
+                cause = (self.minimize_skipped.upper(), "unknown")
+            self.error_cause_category, self.error_cause_instr = cause
+            self.AFC_category_errors[self.error_cause_category] = (
+                self.AFC_category_errors.get(self.error_cause_category, 0) + 1
+            )
+            self.instr_errors[self.error_cause_instr] = (
+                self.instr_errors.get(self.error_cause_instr, 0) + 1
+            )
+
+        elif ret[0] == RunnerOutcome.ERROR:
             # if error -> re-run for later backup (e.g. ArchiveRunner)
+            # (not memoized -> artifacts of the runner belong to res_code_block)
             ret = self.codecomparerunner.run(
-                blocking=True, code=self.res_code_block.as_code(), **self.runkwargs
+                blocking=True,
+                code=self.res_code_block.as_code(),
+                memo=False,
+                **self.runkwargs,
             )
             self.res_end_ref_mstate = self.codecomparerunner.compare_runner.ref_mstate
             self.res_end_dut_mstate = self.codecomparerunner.compare_runner.dut_mstate
@@ -400,29 +1167,78 @@ class CodeErrMinRunner(Runner):
             self.AFC_category_errors[self.error_cause_category] = (
                 self.AFC_category_errors.get(self.error_cause_category, 0) + 1
             )
+            if self.buckets is not None:
+                self.buckets.add_exemplar(
+                    self.bucket_signature,
+                    self.error_cause_category,
+                    self.error_cause_instr,
+                )
+
+        if self.log and self.buckets is not None:
+            self.bucketslog.set_content(self.buckets.report())
 
-        # helper for saving mstate and code_blocks if not None
-        def save_data(data, filename):
+        # helper for persisting mstate and code_blocks if not None
+        # (written on demand, see Runner.persist_artifact)
+        # DuT states are saved as delta to the reference state (binary format)
+        def save_data(data, name, kind="mstate", base=None):
             if data is None:
                 return
-            data.save(self.dir + "/" + filename)
+            name = self.dir + "/" + name
 
-        save_data(self.orig_code_block, "00_orig_code_block.json")
-        save_data(self.orig_end_ref_mstate, "00_orig_end_ref_mstate.json")
-        save_data(self.orig_end_dut_mstate, "00_orig_end_dut_mstate.json")
+            def save_f(filename):
+                save_artifact(data, name, format=self.artifact_format, base=base)
 
-        save_data(self.red_code_block, "01_red_code_block.json")
-        save_data(self.red_end_ref_mstate, "01_red_end_ref_mstate.json")
-        save_data(self.red_end_dut_mstate, "01_red_end_dut_mstate.json")
+            self.persist_artifact(kind, name + self.artifact_ext, save_f)
 
-        save_data(self.min_code_block, "02_min_code_block.json")
-        save_data(self.min_beg_mstate, "02_min_beg_mstate.json")
-        save_data(self.min_end_ref_mstate, "02_min_end_ref_mstate.json")
-        save_data(self.min_end_dut_mstate, "02_min_end_dut_mstate.json")
+        save_data(self.orig_code_block, "00_orig_code_block", kind="code_block")
+        save_data(self.orig_end_ref_mstate, "00_orig_end_ref_mstate")
+        save_data(
+            self.orig_end_dut_mstate,
+            "00_orig_end_dut_mstate",
+            base=self.orig_end_ref_mstate,
+        )
+
+        save_data(self.red_code_block, "01_red_code_block", kind="code_block")
+        save_data(self.red_end_ref_mstate, "01_red_end_ref_mstate")
+        save_data(
+            self.red_end_dut_mstate,
+            "01_red_end_dut_mstate",
+            base=self.red_end_ref_mstate,
+        )
 
-        save_data(self.res_code_block, "99_res_code_block.json")
-        save_data(self.res_end_ref_mstate, "99_res_end_ref_mstate.json")
-        save_data(self.res_end_dut_mstate, "99_res_end_dut_mstate.json")
+        save_data(self.min_code_block, "02_min_code_block", kind="code_block")
+        save_data(self.min_beg_mstate, "02_min_beg_mstate")
+        save_data(self.min_end_ref_mstate, "02_min_end_ref_mstate")
+        save_data(
+            self.min_end_dut_mstate,
+            "02_min_end_dut_mstate",
+            base=self.min_end_ref_mstate,
+        )
+
+        # failing fragments of multi bug extraction (replays and summary)
+        for idx, instr, replay_code, minimized in self.multi_bugs:
+            save_data(replay_code, f"03_multi_{idx:04d}_code_block", kind="code_block")
+        if len(self.multi_bugs) > 0:
+            summary = "".join(
+                f"{idx} {instr} {'filtered' if minimized else 'full'}_state\n"
+                for idx, instr, replay_code, minimized in self.multi_bugs
+            )
+
+            def save_summary(filename):
+                with open(filename, "w") as f:
+                    f.write(summary)
+
+            self.persist_artifact(
+                "code_block", self.dir + "/03_multi_bug.log", save_summary
+            )
+
+        save_data(self.res_code_block, "99_res_code_block", kind="code_block")
+        save_data(self.res_end_ref_mstate, "99_res_end_ref_mstate")
+        save_data(
+            self.res_end_dut_mstate,
+            "99_res_end_dut_mstate",
+            base=self.res_end_ref_mstate,
+        )
 
         return ret
 
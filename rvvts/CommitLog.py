@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import re
+
+# Per instruction commit logs of simulators (see TraceCompareRunner)
+# Logs are parsed line by line into CommitRecords (generators) -> reference
+# and DuT logs are compared in lockstep without reading whole logs.
+# Register writes are normalized to architectural names ("x5", "f1", "v2",
+# "csr:mstatus", "mem:0x80001000") and integer values.
+#
+# Supported formats:
+#  "spike" .. spike --log-commits
+#     core   0: 3 0x0000000080000000 (0x00000297) x5  0x0000000080000000
+#  "sail" .. sail-riscv --trace-instr --trace-reg --trace-mem
+#     [42] [M]: 0x0000000080000000 (0x00000297) auipc t0, 0x0
+#     t0 <- 0x0000000080000000
+
+# fragment marker (HINT: lui with rd=x0 -> no architectural effect)
+# -> position of instructions in fragments (see TraceCompareRunner.mark_code)
+COMMIT_LOG_MARKER = "lui x0, 0x5a5a5"
+COMMIT_LOG_MARKER_INSN = 0x5A5A5037
+
+ABI_NAMES = {
+    name: "x" + str(i)
+    for i, name in enumerate(
+        ["zero", "ra", "sp", "gp", "tp", "t0", "t1", "t2", "s0", "s1"]
+        + ["a" + str(i) for i in range(8)]
+        + ["s" + str(i) for i in range(2, 12)]
+        + ["t" + str(i) for i in range(3, 7)]
+    )
+}
+ABI_NAMES["fp"] = "x8"
+ABI_NAMES.update(
+    {
+        name: "f" + str(i)
+        for i, name in enumerate(
+            ["ft" + str(i) for i in range(8)]
+            + ["fs0", "fs1"]
+            + ["fa" + str(i) for i in range(8)]
+            + ["fs" + str(i) for i in range(2, 12)]
+            + ["ft" + str(i) for i in range(8, 12)]
+        )
+    }
+)
+
+
+class CommitRecord:
+    def __init__(self, pc, insn, writes=None):
+        self.pc = pc
+        self.insn = insn
+        # name -> value
+        self.writes = writes if writes is not None else {}
+
+    def is_marker(self):
+        return self.insn == COMMIT_LOG_MARKER_INSN
+
+    # writes of kinds ("x", "f", "v", "csr", "mem"; None .. all)
+    def get_writes(self, kinds=None):
+        if kinds is None:
+            return self.writes
+        return {
+            name: value
+            for name, value in self.writes.items()
+            if write_kind(name) in kinds
+        }
+
+    def __str__(self):
+        writes = " ".join(
+            name + "=" + hex(value) for name, value in sorted(self.writes.items())
+        )
+        return f"pc={self.pc:#x} insn={self.insn:#010x} {writes}".rstrip()
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def write_kind(name):
+    if name.startswith("csr:"):
+        return "csr"
+    if name.startswith("mem:"):
+        return "mem"
+    return name[0]
+
+
+def normalize_reg(name):
+    name = ABI_NAMES.get(name, name)
+    if re.match(r"^[xfv]\d+$", name):
+        return name
+    # spike csr names: c<number>_<name>
+    m = re.match(r"^c\d+_(\w+)$", name)
+    if m:
+        return "csr:" + m.group(1)
+    return None
+
+
+SPIKE_COMMIT = re.compile(
+    r"^core\s+\d+:\s+(?:\d+\s+)?0x([0-9a-fA-F]+)\s+\(0x([0-9a-fA-F]+)\)(.*)$"
+)
+
+
+def parse_spike(lines):
+    for line in lines:
+        m = SPIKE_COMMIT.match(line)
+        if not m:
+            continue
+        record = CommitRecord(int(m.group(1), 16), int(m.group(2), 16))
+        tokens = m.group(3).split()
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            value = tokens[i + 1] if i + 1 < len(tokens) else ""
+            if token == "mem":
+                # "mem addr" (load) or "mem addr value" (store)
+                data = tokens[i + 2] if i + 2 < len(tokens) else ""
+                if data.startswith("0x"):
+                    record.writes["mem:" + hex(int(value, 16))] = int(data, 16)
+                    i += 3
+                else:
+                    i += 2
+            elif value.startswith("0x"):
+                name = normalize_reg(token)
+                if name is not None:
+                    record.writes[name] = int(value, 16)
+                i += 2
+            else:
+                # e.g. vector configuration (e8 m1 l32)
+                i += 1
+        yield record
+
+
+SAIL_INSTR = re.compile(
+    r"^\[\d+\]\s+\[\w+\]:\s+0x([0-9a-fA-F]+)\s+\(0x([0-9a-fA-F]+)\)"
+)
+SAIL_REG = re.compile(r"^(?:CSR\s+)?(\w+)\s+<-\s+0x([0-9a-fA-F]+)")
+SAIL_MEM = re.compile(r"^mem\[(0x[0-9a-fA-F]+)\]\s+<-\s+0x([0-9a-fA-F]+)")
+
+
+def parse_sail(lines):
+    record = None
+    for line in lines:
+        line = line.strip()
+        m = SAIL_INSTR.match(line)
+        if m:
+            if record is not None:
+                yield record
+            record = CommitRecord(int(m.group(1), 16), int(m.group(2), 16))
+            continue
+        if record is None:
+            continue
+        m = SAIL_MEM.match(line)
+        if m:
+            record.writes["mem:" + hex(int(m.group(1), 16))] = int(m.group(2), 16)
+            continue
+        m = SAIL_REG.match(line)
+        if m:
+            name = m.group(1)
+            if line.startswith("CSR"):
+                name = "csr:" + name
+            else:
+                name = normalize_reg(name)
+            if name is not None:
+                record.writes[name] = int(m.group(2), 16)
+    if record is not None:
+        yield record
+
+
+COMMIT_LOG_PARSERS = {"spike": parse_spike, "sail": parse_sail}
+
+
+# records of commit log file (generator, read line by line)
+def read_commit_log(filename, format):
+    parser = COMMIT_LOG_PARSERS.get(format, None)
+    if parser is None:
+        raise Exception(f"CommitLog: unknown format {format}")
+    with open(filename, "r", errors="replace") as f:
+        yield from parser(f)
+
+
+# first divergence of two commit logs
+class CommitLogDivergence:
+    def __init__(self, index, fragment, ref, dut, kinds):
+        # index of record (instruction) in logs
+        self.index = index
+        # index of main fragment (number of markers before - 1; -1 .. init)
+        self.fragment = fragment
+        # records (None .. log ended)
+        self.ref = ref
+        self.dut = dut
+        self.kinds = kinds
+
+    def __str__(self):
+        def record_str(record):
+            if record is None:
+                return "<end of log>"
+            return str(
+                CommitRecord(record.pc, record.insn, record.get_writes(self.kinds))
+            )
+
+        return (
+            "COMMIT LOG DIVERGENCE\n"
+            + f"instruction: {self.index}\n"
+            + f"fragment: {self.fragment}\n"
+            + f"REF: {record_str(self.ref)}\n"
+            + f"DUT: {record_str(self.dut)}\n"
+        )
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def records_equal(ref, dut, kinds):
+    return (
+        ref.pc == dut.pc
+        and ref.insn == dut.insn
+        and ref.get_writes(kinds) == dut.get_writes(kinds)
+    )
+
+
+# compare records in lockstep
+# kinds .. compared write kinds (see CommitRecord.get_writes)
+# returns CommitLogDivergence or None (equal)
+def commit_log_divergence(ref_records, dut_records, kinds=None):
+    ref_iter = iter(ref_records)
+    dut_iter = iter(dut_records)
+    markers = 0
+    index = 0
+    while True:
+        ref = next(ref_iter, None)
+        dut = next(dut_iter, None)
+        if ref is None and dut is None:
+            return None
+        if ref is None or dut is None or not records_equal(ref, dut, kinds):
+            return CommitLogDivergence(index, markers - 1, ref, dut, kinds)
+        if ref.is_marker():
+            markers += 1
+        index += 1
@@ -8,7 +8,7 @@
 
 from .BasicRunner import Runner, RunnerOutcome
 from .RefCovRunner import RefCovRunner
-from .MachineState import MachineState
+from .MachineState import MachineState, MachineStateDiff
 
 
 class CompareRunner(Runner):
@@ -18,6 +18,9 @@ class CompareRunner(Runner):
         super().setup(config)
 
         self.mstate_diff_full = config.get("CompareRunner_mstate_diff_full", True)
+        # equal dump fingerprints -> COMPLETE without state extraction and diff
+        # (only if no full diff is requested)
+        self.fingerprint = config.get("CompareRunner_fingerprint", True)
 
         subconfig = config.copy()
         subconfig["dir"] = self.get_dir()
@@ -26,6 +29,7 @@ class CompareRunner(Runner):
         self.CompareRunner_dut = config["CompareRunner_dut"](config=subconfig)
         self.binary = ""
         self.timeout = 1.0
+        self.dut_kwargs = {}
 
         self.reset_run()
 
@@ -38,7 +42,10 @@ class CompareRunner(Runner):
             binary=self.binary, blocking=False, timeout=self.timeout
         )
         self.CompareRunner_dut.run(
-            binary=self.binary, blocking=False, timeout=self.timeout
+            binary=self.binary,
+            blocking=False,
+            timeout=self.timeout,
+            **self.dut_kwargs,
         )
         self.CompareRunner_refcov.wait()
         self.CompareRunner_dut.wait()
@@ -76,20 +83,24 @@ class CompareRunner(Runner):
             return (RunnerOutcome.ERROR, res_output)
 
         try:
-            is_equal, output = res_ref[1].compare(
-                res_dut[1], diff_full=self.mstate_diff_full
-            )
+            if self.fingerprint_match(res_ref[1], res_dut[1]):
+                is_equal = True
+                output = MachineStateDiff(res_ref[1], res_dut[1], diff_keys=set())
+            else:
+                is_equal, output = res_ref[1].compare(
+                    res_dut[1], diff_full=self.mstate_diff_full
+                )
             if is_equal:
                 outcome = RunnerOutcome.COMPLETE
             else:
                 outcome = RunnerOutcome.ERROR
 
             if res_cov[1]:
-                output += "\nCOVERAGE\n"
+                cov_output = "\nCOVERAGE\n"
                 for k0, v0 in res_cov[1].items():
-                    output += " * " + k0 + "\n"
+                    cov_output += " * " + k0 + "\n"
                     for k1, v1 in v0.items():
-                        output += (
+                        cov_output += (
                             "   * "
                             + k1.ljust(16)
                             + (" (" + str(v1["type"]) + ")").ljust(20)
@@ -101,14 +112,24 @@ class CompareRunner(Runner):
                             + str(v1["percent"])
                             + "%)\n"
                         )
+                output.append_text(cov_output)
 
             return (outcome, output)
 
         except Exception as e:
             return (RunnerOutcome.ERROR, e)
 
-    def run_handler(self, timeout=1.0, binary="", **kwargs):
+    def fingerprint_match(self, ref_mstate, dut_mstate):
+        if not self.fingerprint or self.mstate_diff_full:
+            return False
+        ref_fingerprint = getattr(ref_mstate, "fingerprint", None)
+        dut_fingerprint = getattr(dut_mstate, "fingerprint", None)
+        return ref_fingerprint is not None and ref_fingerprint == dut_fingerprint
+
+    # dut_kwargs .. additional arguments for the dut run
+    def run_handler(self, timeout=1.0, binary="", dut_kwargs=None, **kwargs):
         self.reset_run()
         self.timeout = timeout
         self.binary = binary
+        self.dut_kwargs = dut_kwargs or {}
         return super().run_handler(**kwargs)
@@ -9,6 +9,85 @@
 from .MachineState import MachineState, DumpFile
 from .BasicRunner import Runner, ProcessTimeoutRunner, RunnerOutcome, RunnerFile
 
+import os
+import re
+import stat
+import time
+import shutil
+import socket
+import tempfile
+
+# output of DuTs failing to bind the debug link (e.g. port taken in the meantime)
+RE_DEBUG_LINK_IN_USE = re.compile(
+    r"address already in use|eaddrinuse|failed to bind|bind\(|bind:", re.IGNORECASE
+)
+
+
+# debug link between the debug stub of a DuT and GDB
+# (tcp port on localhost, or unix domain socket)
+class DebugLink:
+    TCP = "tcp"
+    UNIX = "unix"
+
+    def __init__(self, transport=TCP, port=None, path=None):
+        self.transport = transport
+        self.port = port
+        self.path = path
+
+    @classmethod
+    def alloc_tcp(cls):
+        # let the kernel select a free port
+        # NOTE: the port is released again before the DuT binds it -> another
+        # process may grab it in between (DuTGDBRunner retries on bind failures)
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("localhost", 0))
+            port = s.getsockname()[1]
+        return cls(transport=cls.TCP, port=port)
+
+    def gdb_target(self):
+        if self.transport == self.UNIX:
+            return self.path
+        return "localhost:" + str(self.port)
+
+    def _tcp_is_listening(self):
+        # check listening sockets via procfs -> does not connect to the
+        # debug stub (a probe connection may be taken as debugger session)
+        found_procfs = False
+        for procfile in ["/proc/net/tcp", "/proc/net/tcp6"]:
+            try:
+                with open(procfile, "r") as f:
+                    found_procfs = True
+                    for line in f.readlines()[1:]:
+                        fields = line.split()
+                        # local_address = <addr>:<port (hex)>, state 0A = LISTEN
+                        if (
+                            int(fields[1].split(":")[1], 16) == self.port
+                            and fields[3] == "0A"
+                        ):
+                            return True
+            except OSError:
+                continue
+        # no procfs -> we can not check -> assume listening
+        return not found_procfs
+
+    def _unix_is_listening(self):
+        try:
+            return stat.S_ISSOCK(os.stat(self.path).st_mode)
+        except OSError:
+            return False
+
+    def is_listening(self):
+        if self.transport == self.UNIX:
+            return self._unix_is_listening()
+        return self._tcp_is_listening()
+
+    def cleanup(self):
+        if self.transport == self.UNIX and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __repr__(self):
+        return f"DebugLink({self.transport}, {self.gdb_target()})"
+
 
 # TODO: TRY STDIN
 class GDBRunner(ProcessTimeoutRunner):
@@ -26,15 +105,15 @@ class GDBRunner(ProcessTimeoutRunner):
         )
         self.mstate_filename = self.get_dir() + "/mstate.json"
 
-        # create command file
+        # create command file (target is filled in per run -> see run_handler)
         memend = config["memstart"] + config["memlen"]
-        cmdstr = ""
-        cmdstr += "set architecture riscv:rv" + str(xlen) + "\n"
-        cmdstr += "target remote localhost:" + str(config["debug_port"]) + "\n"
-        cmdstr += "set $pc = " + hex(config["xmemstart"]) + "\n"  # force entry point
-        cmdstr += "break *" + hex(config["breakpoint"]) + "\n"
-        cmdstr += "cont\n"
-        cmdstr += (
+        self.cmdstr_pre = "set architecture riscv:rv" + str(xlen) + "\n"
+        # force entry point (may be replaced per run -> see run_handler)
+        self.cmdstr_entry = "set $pc = " + hex(config["xmemstart"]) + "\n"
+        self.cmdstr_post = ""
+        self.cmdstr_post += "break *" + hex(config["breakpoint"]) + "\n"
+        self.cmdstr_post += "cont\n"
+        self.cmdstr_post += (
             "dump binary memory "
             + self.dumpfile.get_filename()
             + " "
@@ -43,8 +122,12 @@ class GDBRunner(ProcessTimeoutRunner):
             + hex(memend)
             + "\n"
         )
-        cmdstr += "quit\n"
-        self.cmdfile = RunnerFile(dir=self.get_dir(), name="cmdin.gdb", content=cmdstr)
+        self.cmdstr_post += "quit\n"
+        self.cmdfile = RunnerFile(dir=self.get_dir(), name="cmdin.gdb")
+        self.cmdfile_content = None
+
+        # fixed debug port (legacy) -> used if no debug_link is given on run
+        self.debug_port = config.get("debug_port", None)
 
         # create command
         self.set_program(
@@ -54,6 +137,7 @@ class GDBRunner(ProcessTimeoutRunner):
 
     def task_pre(self):
         self.dumpfile.delete()
+        self.persist_reset()
 
     def task_post(self, result):
         outcome, ret = super().task_post(result)
@@ -62,13 +146,38 @@ class GDBRunner(ProcessTimeoutRunner):
             return (outcome, None)
 
         try:
-            regs, state = self.dumpfile.extract()
-            mstate = MachineState(self.config, (regs, state))
-            mstate.save(self.mstate_filename)
+            mstate = MachineState.from_dumpfile(self.config, self.dumpfile)
+            self.persist_artifact("sim_mstate", self.mstate_filename, mstate.save)
             return (outcome, mstate)
         except Exception as e:
             return (RunnerOutcome.ERROR, e)
 
+    # debug_link .. link to debug stub of DuT (None .. fixed debug_port from config)
+    # symbol_file .. binary to load symbols from (e.g. for labels in entry_commands)
+    # entry_commands .. commands after connect (None .. force entry point)
+    def run_handler(
+        self, debug_link=None, symbol_file=None, entry_commands=None, **kwargs
+    ):
+        if debug_link is None:
+            debug_link = DebugLink(port=self.debug_port)
+        if entry_commands is None:
+            entry_commands = self.cmdstr_entry
+
+        cmdstr = ""
+        if symbol_file is not None:
+            cmdstr += "file " + symbol_file + "\n"
+        cmdstr += self.cmdstr_pre
+        cmdstr += "target remote " + debug_link.gdb_target() + "\n"
+        cmdstr += entry_commands
+        cmdstr += self.cmdstr_post
+
+        # rewrite command file only if changed
+        if cmdstr != self.cmdfile_content:
+            self.cmdfile.set_content(cmdstr)
+            self.cmdfile_content = cmdstr
+
+        return super().run_handler(**kwargs)
+
 
 class DuTGDBRunner(Runner):
     def setup(self, config=None):
@@ -81,20 +190,134 @@ class DuTGDBRunner(Runner):
         self.DuTGDBRunner_gdb = GDBRunner(config=subconfig)
         self.binary = ""
         self.timeout = 1.0
+        self.dut_kwargs = {}
+        self.gdb_kwargs = {}
 
-    def task(self):
-        self.DuTGDBRunner_dut.run(
-            binary=self.binary, blocking=False, timeout=self.timeout
+        # debug link
+        # debug_port: fixed tcp port (None .. allocate free port per run)
+        # DuTGDBRunner_debug_transport: "tcp" or "unix" (unix domain socket per run)
+        self.debug_port = config.get("debug_port", None)
+        self.debug_transport = config.get("DuTGDBRunner_debug_transport", DebugLink.TCP)
+        self.debug_link_retries = config.get("DuTGDBRunner_debug_link_retries", 3)
+        dut_transports = getattr(
+            self.DuTGDBRunner_dut, "DEBUG_LINK_TRANSPORTS", [DebugLink.TCP]
         )
-        self.DuTGDBRunner_gdb.run(
-            binary=self.binary, blocking=False, timeout=self.timeout
+        if self.debug_transport not in dut_transports:
+            print(
+                f'DuTGDBRunner: WARNING: debug transport "{self.debug_transport}" not supported by '
+                + f'{type(self.DuTGDBRunner_dut).__name__} -> fall back to "{DebugLink.TCP}"'
+            )
+            self.debug_transport = DebugLink.TCP
+        # unix sockets are created in a short temporary directory
+        # (runner dirs easily exceed the unix socket path limit of ~108 chars)
+        self.debug_socket_dir = None
+
+    def new_debug_link(self):
+        if self.debug_transport == DebugLink.UNIX:
+            if self.debug_socket_dir is None or not os.path.isdir(
+                self.debug_socket_dir
+            ):
+                self.debug_socket_dir = tempfile.mkdtemp(prefix="rvvts_gdb_")
+            link = DebugLink(
+                transport=DebugLink.UNIX, path=self.debug_socket_dir + "/gdb.sock"
+            )
+            # remove stale socket (otherwise detected as listening)
+            link.cleanup()
+            return link
+        if self.debug_port is not None:
+            return DebugLink(port=self.debug_port)
+        return DebugLink.alloc_tcp()
+
+    # wait until the debug stub of the DuT is listening
+    # returns False if the DuT terminated or the deadline (time.monotonic) expired before
+    def wait_debug_link(self, link, deadline):
+        delay = 0.001
+        while True:
+            if link.is_listening():
+                return True
+            if not self.DuTGDBRunner_dut.is_busy():
+                return False
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    # True, if the terminated DuT failed to bind the debug link (see RE_DEBUG_LINK_IN_USE)
+    @staticmethod
+    def debug_link_in_use(dutres):
+        ret = dutres[1]
+        output = (getattr(ret, "stdout", None) or "") + (
+            getattr(ret, "stderr", None) or ""
         )
-        self.DuTGDBRunner_gdb.wait()
-        # gdb is complete -> stop dut
+        return RE_DEBUG_LINK_IN_USE.search(output) is not None
+
+    def stop_dut(self):
         if self.DuTGDBRunner_dut.is_busy():
             self.DuTGDBRunner_dut.stop()
             self.DuTGDBRunner_dut.wait()
 
+    def task(self):
+        start = time.perf_counter()
+        # one deadline for the debug stub over all retries
+        deadline = time.monotonic() + self.timeout
+        for retry in range(self.debug_link_retries + 1):
+            link = self.new_debug_link()
+            self.DuTGDBRunner_dut.run(
+                binary=self.binary,
+                debug_link=link,
+                blocking=False,
+                timeout=self.timeout,
+                **self.dut_kwargs,
+            )
+            link_ready = self.wait_debug_link(link, deadline)
+            if link_ready:
+                break
+            # debug stub did not come up -> stop dut
+            dut_hang = self.DuTGDBRunner_dut.is_busy()
+            self.stop_dut()
+            link.cleanup()
+            dutres = self.DuTGDBRunner_dut.get_result()
+            # dut timed out itself at the deadline -> hang as well
+            dut_hang = dut_hang or dutres[0] == RunnerOutcome.TIMEOUT
+            # retry with new link only if the dut failed to bind the link
+            # (e.g. port taken by another process in the meantime)
+            if dut_hang or not self.debug_link_in_use(dutres):
+                break
+            if self.debug_transport == DebugLink.TCP and self.debug_port is not None:
+                # fixed port -> retry makes no sense
+                break
+            if time.monotonic() > deadline:
+                break
+        # launch latency: dut start until debug stub is ready
+        self.add_stage_time("launch", time.perf_counter() - start)
+
+        if not link_ready:
+            dutres = self.DuTGDBRunner_dut.get_result()
+            if dut_hang:
+                # dut still running, but no debug stub within timeout
+                outcome = RunnerOutcome.TIMEOUT
+            else:
+                # dut terminated without ever providing a debug stub
+                outcome = RunnerOutcome.ERROR
+            return (outcome, {"DuTGDBRunner_dut": dutres[1], "DuTGDBRunner_gdb": None})
+
+        self.DuTGDBRunner_gdb.run(
+            binary=self.binary,
+            debug_link=link,
+            blocking=False,
+            timeout=self.timeout,
+            **self.gdb_kwargs,
+        )
+        self.DuTGDBRunner_gdb.wait()
+        # gdb is complete -> stop dut
+        self.stop_dut()
+        link.cleanup()
+
+        # account gdb stages (launch, execute and state extraction)
+        for stage, seconds in self.DuTGDBRunner_gdb.get_stage_times().items():
+            self.add_stage_time(stage, seconds)
+        self.DuTGDBRunner_gdb.reset_stage_times()
+
         gdbres = self.DuTGDBRunner_gdb.get_result()
         dutres = self.DuTGDBRunner_dut.get_result()
         if gdbres[0] == RunnerOutcome.COMPLETE:
@@ -106,10 +329,22 @@ class DuTGDBRunner(Runner):
             {"DuTGDBRunner_dut": dutres[1], "DuTGDBRunner_gdb": gdbres[1]},
         )
 
-    def run_handler(self, timeout=1.0, binary="", **kwargs):
+    def _close(self, seen):
+        super()._close(seen)
+        if self.debug_socket_dir is not None:
+            shutil.rmtree(self.debug_socket_dir, ignore_errors=True)
+            self.debug_socket_dir = None
+
+    # dut_kwargs, gdb_kwargs .. additional arguments for dut and gdb runs
+    # (e.g. extra_parameters for QEMURunner, entry_commands for GDBRunner)
+    def run_handler(
+        self, timeout=1.0, binary="", dut_kwargs=None, gdb_kwargs=None, **kwargs
+    ):
 
         # parameter parsing
         self.binary = binary
         self.timeout = timeout
+        self.dut_kwargs = dut_kwargs or {}
+        self.gdb_kwargs = gdb_kwargs or {}
 
         return super().run_handler(**kwargs)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import threading
+from .MachineState import MachineState, RVREGS_IDX_DICT
+
+
+# Buckets of failing tests for skipping redundant minimizations (see CodeErrMinRunner)
+# A dominant bug produces many failures, which minimize to the same result.
+# Before minimization, failures are assigned to buckets by a cheap signature
+# of the raw (unminimized) end states (see get_signature):
+#  * classes of differing state elements (registers by kind, csrs by name)
+#  * mnemonic class of the last main fragment writing a differing register
+#  * delta of the exception counters (DuT - reference)
+#  * category hint of the AFC categorizer (see AFC.hint)
+# Once a bucket holds "exemplars" minimized failures, further failures of the
+# bucket are only counted (every "sample_every"th is still minimized; 0 .. never).
+# Shared between runners (and threads) by passing it in the config ("FailureBuckets").
+class FailureBuckets:
+    def __init__(self, exemplars=1, sample_every=0):
+        self.exemplars = exemplars
+        self.sample_every = sample_every
+        # signature -> bucket (dict)
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.skips = 0
+
+    # buckets are not serialized (e.g. config of MachineState in json files)
+    def __getstate__(self):
+        return {"exemplars": self.exemplars, "sample_every": self.sample_every}
+
+    def __setstate__(self, d):
+        self.__init__(d["exemplars"], d["sample_every"])
+
+    # class of state element (registers by kind, others by name)
+    @staticmethod
+    def element_class(name):
+        if name in RVREGS_IDX_DICT:
+            return "x"
+        if MachineState._is_float_reg_name(name):
+            return "f"
+        if MachineState._is_vector_reg_name(name):
+            return "v"
+        return name
+
+    # mnemonic class (e.g. "vfwsub" for "vfwsub.vv") of the last main fragment
+    # clobbering one of the registers in diff_keys ("unknown" if not found)
+    @staticmethod
+    def get_mnemonic_class(code_block, diff_keys):
+        names = set(diff_keys)
+        names.update(
+            "x" + str(RVREGS_IDX_DICT[k]) for k in diff_keys & RVREGS_IDX_DICT.keys()
+        )
+        for fragment in reversed(code_block.main_fragments.as_list()):
+            ann = fragment.get_ann()
+            clob = ann.get("clob", set()) if isinstance(ann, dict) else set()
+            if not isinstance(clob, set) or not (clob & names):
+                continue
+            lines = str(fragment).strip().split("\n")[-1].strip().split()
+            if len(lines) == 0:
+                break
+            return lines[0].split(".")[0]
+        return "unknown"
+
+    # signature of failure or None (no states -> no bucketing)
+    def get_signature(self, code_block, ref_mstate, dut_mstate, hint=None):
+        if ref_mstate is None or dut_mstate is None:
+            return None
+        diff_keys = ref_mstate.diff_keys(dut_mstate)
+        if diff_keys is None:
+            return None
+        elements = sorted({self.element_class(name) for name in diff_keys})
+        ref_exceptions = ref_mstate.state[1].get("#exceptions", 0)
+        exceptions = dut_mstate.state[1].get("#exceptions", 0) - ref_exceptions
+        return "|".join(
+            [
+                ",".join(elements),
+                self.get_mnemonic_class(code_block, diff_keys),
+                f"exc{exceptions:+d}",
+                str(hint),
+            ]
+        )
+
+    # count failure in bucket
+    # returns True, if the failure should be minimized
+    def check(self, signature):
+        if signature is None:
+            return True
+        with self.lock:
+            bucket = self.buckets.setdefault(
+                signature,
+                {"count": 0, "minimized": 0, "category": None, "instr": None},
+            )
+            bucket["count"] += 1
+            if bucket["minimized"] < self.exemplars:
+                return True
+            skipped = bucket["count"] - bucket["minimized"]
+            if self.sample_every > 0 and skipped % self.sample_every == 0:
+                return True
+            self.skips += 1
+            return False
+
+    # record minimized exemplar (error cause of the bucket)
+    def add_exemplar(self, signature, category, instr):
+        if signature is None:
+            return
+        with self.lock:
+            bucket = self.buckets[signature]
+            bucket["minimized"] += 1
+            if bucket["category"] is None:
+                bucket["category"] = category
+                bucket["instr"] = instr
+
+    # error cause (category, instr) of bucket (None .. no exemplar yet)
+    def get_cause(self, signature):
+        with self.lock:
+            bucket = self.buckets.get(signature, None)
+            if bucket is None or bucket["category"] is None:
+                return None
+            return (bucket["category"], bucket["instr"])
+
+    def get_stats(self):
+        with self.lock:
+            return {"buckets": len(self.buckets), "skips": self.skips}
+
+    # one line per bucket (most frequent first)
+    def report(self):
+        with self.lock:
+            items = sorted(self.buckets.items(), key=lambda i: -i[1]["count"])
+            return "".join(
+                f"{b['count']} {b['minimized']} {b['category']}-{b['instr']} {s}\n"
+                for s, b in items
+            )
@@ -0,0 +1,377 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import json
+import time
+import random
+import hashlib
+from .BasicRunner import ThreadingRunner, RunnerOutcome
+from .MachineState import MachineState, DumpFile
+from .BuildRunner import BuildRunner
+from .CommitLog import COMMIT_LOG_MARKER, COMMIT_LOG_MARKER_INSN
+from .ArchiveRunner import ArchiveRunner
+from .FuzzCodeErrMinRunner import FuzzCodeErrMinRunner
+
+# Stand-ins for BuildRunner, SpikeRunner and DuTGDBRunner
+# No external tools are used -> e.g. for profiling and benchmarking the
+# orchestration overhead of rvvts itself (see orchestration_bench)
+#
+# FakeBuildRunner "builds" by writing the assembler program as binary.
+# The fake simulators derive a deterministic machine state from the program
+# and write it as dump file (extracted like real dumps).
+# FakeDuTRunner deviates from the reference (error) or hangs (timeout) if the
+# test code contains "buggy" instruction lines. Whether a line is buggy is
+# derived from its hash and the configured rates -> deterministic and
+# reducible/minimizable like real failures.
+# Traced programs (see BuildRunner.trace_code) get a per fragment trace, which
+# deviates from the fragment containing the buggy line on.
+# With config "commit_log", a commit log (spike format, see CommitLog) with one
+# record per test code line is written (buggy line with deviating write).
+#
+# Config:
+#  BuildRunner_class = FakeBuildRunner
+#  RefCovRunner_ref = FakeSpikeRunner
+#  CompareRunner_dut = FakeDuTRunner
+#  Fake*Runner_latency .. seconds per run (build or execution)
+#  FakeDuTRunner_launch_latency .. seconds until DuT is ready (debug stub)
+#  FakeDuTRunner_error_rate .. probability of an instruction line to be buggy (error)
+#  FakeDuTRunner_timeout_rate .. probability of an instruction line to hang (timeout)
+
+
+class FakeBuildRunner(BuildRunner):
+    def setup(self, config):
+
+        super().setup(config)
+
+        self.latency = config.get("FakeBuildRunner_latency", 0.0)
+        self.binary = config["binary"]
+
+    def task(self):
+        start = time.perf_counter()
+        time.sleep(self.latency)
+        with open(self.asmfile.get_name(), "rb") as src:
+            with open(self.binary, "wb") as dst:
+                dst.write(src.read())
+        self.add_stage_time("execute", time.perf_counter() - start)
+        return (RunnerOutcome.COMPLETE, None)
+
+
+class FakeSimRunner(ThreadingRunner):
+
+    TASK_POST_STAGE = "extract"
+
+    # format of commit log (see CommitLog)
+    COMMIT_LOG_FORMAT = "spike"
+
+    TESTCODE_BEGIN = "-------- BEGIN OF TESTCODE --------"
+    TESTCODE_END = "-------- END OF TESTCODE --------"
+
+    def setup(
+        self,
+        config=None,
+        latency=0.0,
+        launch_latency=0.0,
+        error_rate=0.0,
+        timeout_rate=0.0,
+    ):
+
+        super().setup(config=config)
+
+        self.config = config
+        self.latency = latency
+        self.launch_latency = launch_latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+
+        self.memstart = config["memstart"]
+        self.memlen = config["memlen"]
+        self.xmemstart = config["xmemstart"]
+        self.xlenb = config["rvisacfg"].get_xlen() // 8
+        self.vlenb = config["rvisacfg"].get_vlen() // 8
+        self.dumpfile = DumpFile(
+            filename=self.get_dir() + "/mem." + hex(config["memstart"]) + ".bin",
+            config=config,
+            addr=config["xmemstart"] + config["xmemlen"] - config["dumpfile_reserve"],
+        )
+        self.mstate_filename = self.get_dir() + "/mstate.json"
+        self.commit_log = None
+        if config.get("commit_log", False):
+            self.commit_log = self.get_dir() + "/commit.log"
+        self.binary = ""
+        self.timeout = 1.0
+
+    # fraction [0, 1) of the line hash (per rate kind)
+    @staticmethod
+    def line_hash(kind, line):
+        digest = hashlib.sha1((kind + ":" + line).encode()).digest()
+        return int.from_bytes(digest[:8], "little") / 2**64
+
+    # returns (lines, snapshots)
+    # snapshots .. number of lines before each trace snapshot (see
+    # BuildRunner.trace_code; instrumentation is not part of lines)
+    def testcode_lines(self, program):
+        lines = []
+        snapshots = []
+        in_testcode = False
+        in_trace = False
+        for line in program.splitlines():
+            if self.TESTCODE_BEGIN in line:
+                in_testcode = True
+            elif self.TESTCODE_END in line:
+                in_testcode = False
+            elif BuildRunner.TRACE_BEGIN in line:
+                in_trace = True
+            elif BuildRunner.TRACE_END in line:
+                in_trace = False
+            elif in_trace:
+                if line.strip().startswith("jal") and "_trace_snapshot" in line:
+                    snapshots.append(len(lines))
+            elif in_testcode:
+                line = line.split("#")[0].split("//")[0].strip()
+                if line and not line.endswith(":") and not line.startswith("."):
+                    lines.append(line)
+        return (lines, snapshots)
+
+    def is_buggy(self, kind, rate, lines):
+        if rate <= 0.0:
+            return None
+        for line in lines:
+            if line != COMMIT_LOG_MARKER and self.line_hash(kind, line) < rate:
+                return line
+        return None
+
+    # commit log with one record per test code line (buggy line deviates)
+    def gen_commit_log(self, lines, bug):
+        with open(self.commit_log, "w") as f:
+            for i, line in enumerate(lines):
+                pc = self.xmemstart + 0x1000 + 4 * i
+                if line == COMMIT_LOG_MARKER:
+                    f.write(
+                        f"core   0: 3 {pc:#018x} ({COMMIT_LOG_MARKER_INSN:#010x})\n"
+                    )
+                    continue
+                h = self.line_hash("commit", line)
+                insn = int(h * 2**32)
+                reg = 1 + int(h * 31)
+                value = int(h * 2**64) & ((1 << (self.xlenb * 8)) - 1)
+                if line == bug:
+                    value ^= 1
+                f.write(
+                    f"core   0: 3 {pc:#018x} ({insn:#010x}) x{reg}  {value:#018x}\n"
+                )
+
+    # base .. position of dump area in mem (None .. dump area of dump file)
+    def write_section(self, mem, section, data, base=None):
+        if base is None:
+            base = section.addr - self.memstart
+        pos = base + section.offset
+        pos -= getattr(section, "alignment_offset", 0)
+        end = pos + len(data)
+        mem[pos:end] = data
+
+    # registers derived from rng (deviating register for buggy line)
+    def gen_regs(self, mem, rng, bug, base=None):
+
+        def words(values, size):
+            return b"".join(v.to_bytes(size, "little") for v in values)
+
+        d = self.dumpfile
+        self.write_section(mem, d.estate, words([0, 0, 0], self.xlenb), base)
+        iregs = [0] + [rng.getrandbits(self.xlenb * 8) for i in range(31)]
+        if bug is not None:
+            # deviation in register derived from buggy line
+            iregs[1 + int(self.line_hash("reg", bug) * 31)] ^= 1
+        self.write_section(mem, d.istate, words(iregs, self.xlenb), base)
+        if hasattr(d, "fstate"):
+            self.write_section(mem, d.fstate, words([0], self.xlenb), base)
+            self.write_section(mem, d.fregs, rng.randbytes(d.fregs.get_len()), base)
+        if hasattr(d, "vstate"):
+            vstate = [0, 0, self.vlenb, 0, 0, 0, 0]
+            self.write_section(mem, d.vstate, words(vstate, self.xlenb), base)
+            self.write_section(mem, d.vregs, rng.randbytes(d.vregs.get_len()), base)
+
+    # per fragment trace: hash of test code up to the snapshot (deviating
+    # from buggy line on), trace states with registers derived from this hash
+    def gen_trace(self, mem, lines, snapshots, bug):
+        d = self.dumpfile
+        bug_idx = lines.index(bug) if bug is not None else len(lines)
+        h = hashlib.sha1()
+        pos = 0
+        trace = []
+        for idx, n in enumerate(snapshots[: d.trace_capacity]):
+            for line in lines[pos:n]:
+                h.update(line.encode())
+            pos = n
+            value = int.from_bytes(h.digest()[: self.xlenb], "little")
+            if bug_idx < n:
+                value ^= 1
+            trace += [idx + 1, value]
+            if d.trace_states:
+                base = d.addr - self.memstart + d.trace_states_offset
+                base += idx * d.trace_state_len
+                rng = random.Random(h.hexdigest())
+                self.gen_regs(mem, rng, bug if bug_idx < n else None, base)
+        data = b"".join(v.to_bytes(self.xlenb, "little") for v in trace)
+        pos = d.addr - self.memstart + d.trace_offset
+        end = pos + len(data)
+        mem[pos:end] = data
+
+    def gen_dump(self, program, bug, lines=None, snapshots=None):
+        rng = random.Random(hashlib.sha1(program).hexdigest())
+        mem = bytearray(self.memlen)
+        xpos = self.xmemstart - self.memstart
+        xend = xpos + len(program)
+        mem[xpos:xend] = program
+
+        self.gen_regs(mem, rng, bug)
+        if snapshots:
+            self.gen_trace(mem, lines, snapshots, bug)
+
+        with open(self.dumpfile.get_filename(), "wb") as f:
+            f.write(mem)
+
+    def task_pre(self):
+        self.dumpfile.delete()
+        self.persist_reset()
+
+    def task(self):
+        start = time.perf_counter()
+        time.sleep(self.launch_latency)
+        launched = time.perf_counter()
+        self.add_stage_time("launch", launched - start)
+
+        try:
+            with open(self.binary, "rb") as f:
+                program = f.read()
+        except OSError as e:
+            return (RunnerOutcome.ERROR, e)
+        lines, snapshots = self.testcode_lines(program.decode(errors="replace"))
+
+        if self.is_buggy("timeout", self.timeout_rate, lines) is not None:
+            time.sleep(self.timeout)
+            self.add_stage_time("execute", time.perf_counter() - launched)
+            return (RunnerOutcome.TIMEOUT, None)
+
+        time.sleep(self.latency)
+        bug = self.is_buggy("error", self.error_rate, lines)
+        self.gen_dump(program, bug, lines, snapshots)
+        if self.commit_log is not None:
+            self.gen_commit_log(lines, bug)
+        self.add_stage_time("execute", time.perf_counter() - launched)
+        return (RunnerOutcome.COMPLETE, None)
+
+    def task_post(self, result):
+        outcome, ret = result
+
+        if outcome != RunnerOutcome.COMPLETE:
+            return (outcome, None)
+
+        try:
+            mstate = MachineState.from_dumpfile(self.config, self.dumpfile)
+            self.persist_artifact("sim_mstate", self.mstate_filename, mstate.save)
+            return (outcome, mstate)
+        except Exception as e:
+            return (RunnerOutcome.ERROR, e)
+
+    def run_handler(self, binary="", timeout=1.0, **kwargs):
+        self.binary = binary
+        self.timeout = timeout
+        return super().run_handler(**kwargs)
+
+
+# stand-in for SpikeRunner (reference)
+class FakeSpikeRunner(FakeSimRunner):
+    def setup(self, config=None):
+        super().setup(config=config, latency=config.get("FakeSpikeRunner_latency", 0.0))
+
+
+# stand-in for DuTGDBRunner (DuT with launch latency and failures)
+class FakeDuTRunner(FakeSimRunner):
+    def setup(self, config=None):
+        super().setup(
+            config=config,
+            latency=config.get("FakeDuTRunner_latency", 0.0),
+            launch_latency=config.get("FakeDuTRunner_launch_latency", 0.0),
+            error_rate=config.get("FakeDuTRunner_error_rate", 0.0),
+            timeout_rate=config.get("FakeDuTRunner_timeout_rate", 0.0),
+        )
+
+
+# returns copy of config using fake runners for build, reference and DuT
+def fake_config(config, **kwargs):
+    config = config.copy()
+    config["BuildRunner_class"] = FakeBuildRunner
+    config["RefCovRunner_ref"] = FakeSpikeRunner
+    config["RefCovRunner_coverage"] = None
+    config["CompareRunner_dut"] = FakeDuTRunner
+    config.update(kwargs)
+    return config
+
+
+# End-to-end benchmark of the orchestration overhead
+# (ArchiveRunner -> FuzzCodeErrMinRunner -> ... with fake runners)
+# reports wall time per test (mean, median, p95) and outcomes
+# returns result dict (also stored as json, if json_filename is given)
+def orchestration_bench(
+    config,
+    iter=100,
+    min_fragments=10,
+    max_fragments=100,
+    timeout=1.0,
+    seed=0,
+    json_filename=None,
+    log=True,
+):
+
+    config = fake_config(config)
+    config["ArchiveRunner_dut"] = FuzzCodeErrMinRunner
+
+    start = time.perf_counter()
+    runner = ArchiveRunner(config)
+    setup_time = time.perf_counter() - start
+
+    random.seed(seed)
+    times = []
+    outcomes = {}
+    for i in range(iter):
+        start = time.perf_counter()
+        ret = runner.run(
+            blocking=True,
+            min_fragments=min_fragments,
+            max_fragments=max_fragments,
+            timeout=timeout,
+        )
+        times.append(time.perf_counter() - start)
+        outcomes[ret[0].name] = outcomes.get(ret[0].name, 0) + 1
+        if log:
+            print(f"\r{i + 1}/{iter} {outcomes}", end="")
+    runner.close()
+
+    times.sort()
+    result = {
+        "iter": iter,
+        "min_fragments": min_fragments,
+        "max_fragments": max_fragments,
+        "seed": seed,
+        "setup_s": setup_time,
+        "mean_ms": 1000.0 * sum(times) / iter,
+        "median_ms": 1000.0 * times[iter // 2],
+        "p95_ms": 1000.0 * times[min(iter - 1, (iter * 95) // 100)],
+        "tests_per_s": iter / sum(times),
+        "outcomes": outcomes,
+    }
+    if log:
+        print()
+        for key, value in result.items():
+            print(f"{key}: {value}")
+
+    if json_filename is not None:
+        with open(json_filename, "w") as f:
+            json.dump(result, f, indent=2)
+
+    return result
@@ -6,9 +6,11 @@
 # SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
 #
 
-from .BasicRunner import Runner
+import os
+from .BasicRunner import Runner, RunnerOutcome
 from .ISG import ProgramMultiGenerator
 from .CodeErrMinRunner import CodeErrMinRunner
+from .MinimizeService import MinimizeService
 
 
 class FuzzCodeErrMinRunner(Runner):
@@ -19,9 +21,27 @@ class FuzzCodeErrMinRunner(Runner):
         # fuzzer generator
         self.programgenerator = ProgramMultiGenerator(config=config)
 
-        # runner for test and code minimization on error
         subconfig = config.copy()
         subconfig["dir"] = self.get_dir()
+        # timeout triage next to own dir (see CodeErrMinRunner)
+        subconfig["TimeoutTriageRunner_dir"] = os.path.dirname(self.get_dir())
+
+        # decoupled minimization of failing tests (see MinimizeService)
+        # shared instance from config ("MinimizeService"), own instance
+        # (FuzzCodeErrMinRunner_minimize_service) or inline minimization (None)
+        self.minimize_service = config.get("MinimizeService", None)
+        if self.minimize_service is None and config.get(
+            "FuzzCodeErrMinRunner_minimize_service", False
+        ):
+            # next to own dir (not part of archived test dirs, see ArchiveRunner)
+            service_config = config.copy()
+            service_config["dir"] = os.path.dirname(self.get_dir())
+            self.minimize_service = MinimizeService(service_config)
+        if self.minimize_service is not None:
+            # test only -> failing tests are submitted
+            subconfig["CodeErrMinRunner_minimize"] = False
+
+        # runner for test and code minimization on error
         self.codeerrminrunner = CodeErrMinRunner(subconfig)
 
     def task(self):
@@ -37,6 +57,9 @@ class FuzzCodeErrMinRunner(Runner):
 
         self.res_code_block = self.codeerrminrunner.res_code_block
 
+        if ret[0] == RunnerOutcome.ERROR and self.minimize_service is not None:
+            self.minimize_service.submit(self.code_block, **self.runkwargs)
+
         return ret
 
     def get_error_cause(self):
@@ -24,6 +24,11 @@ class ProgramMultiGenerator(ProgramGenerator):
         self.rvisacfg = config["rvisacfg"]
         self.gen = []
 
+        # one exclusion profile for all generators
+        self.setup_exclusion(config)
+        config = config.copy()
+        config["ProgramGenerator_exclusion_profile"] = self.exclusion
+
         if classes is None:
             # no classes explicitly given -> generate based on config
             classes = [RVProgramGenerator]
@@ -50,7 +55,14 @@ class ProgramMultiGenerator(ProgramGenerator):
         return fragments
 
     def gen_fragment(self, **kwargs):
-        return random.choice(self.gen).gen_fragment(**kwargs)
+        fragment = random.choice(self.gen).gen_fragment(**kwargs)
+        if fragment is None:
+            # all retries excluded -> try other generators
+            for gen in self.gen:
+                fragment = gen.gen_fragment(**kwargs)
+                if fragment is not None:
+                    break
+        return fragment
 
 
 def ISG_run(
@@ -7,6 +7,7 @@
 #
 
 from .CodeBlock import CodeBlock, CodeFragmentList, CodeFragment
+from .ISG_Exclusion import ExclusionProfile
 
 import random
 import re
@@ -200,7 +201,31 @@ class RandRegImmGenerator:
 
 class ProgramGenerator:
     def __init__(self, config=None):
-        pass
+        self.setup_exclusion(config)
+
+    # exclusion of known-bug patterns (see ExclusionProfile)
+    def setup_exclusion(self, config):
+        self.exclusion = None
+        self.exclusion_retries = 100
+        if config is not None:
+            self.exclusion = ExclusionProfile.from_config(config)
+            self.exclusion_retries = config.get(
+                "ProgramGenerator_exclusion_retries", 100
+            )
+
+    # fragment of grammar, re-generated while excluded by the exclusion profile
+    # returns None, if all retries are excluded
+    def gen_grammar_fragment(self, grammar, **kwargs):
+        exclusion = getattr(self, "exclusion", None)
+        if exclusion is None:
+            code, ann = grammarISG(grammar, **kwargs)
+            return CodeFragment(code, ann)
+        for i in range(self.exclusion_retries):
+            code, ann = grammarISG(grammar, **kwargs)
+            if not exclusion.check(code):
+                return CodeFragment(code, ann)
+        exclusion.count_exhausted()
+        return None
 
     # may override
     def gen_init_fragments(self, log=False, **kwargs):
@@ -224,11 +249,21 @@ class ProgramGenerator:
             print("-------------- Init Fragments")
         block.set_init_fragments(self.gen_init_fragments(**fkwargs))
 
-        max_line_idx = random.randint(min_fragments, max_fragments) + 1
-        for fragment_idx in range(1, max_line_idx):
+        fragments = random.randint(min_fragments, max_fragments)
+        # excluded fragments (None, see gen_grammar_fragment) are re-drawn
+        # (bounded by ProgramGenerator_exclusion_retries additional draws)
+        max_draws = fragments + getattr(self, "exclusion_retries", 0)
+        draws = 0
+        while block.main_fragments.len() < fragments and draws < max_draws:
+            draws += 1
             if log:
-                print("-------------- Fragment", fragment_idx)
-            block.add(self.gen_fragment(**fkwargs))
+                print("-------------- Fragment", block.main_fragments.len() + 1)
+            fragment = self.gen_fragment(**fkwargs)
+            if fragment is not None:
+                block.add(fragment)
+        exclusion = getattr(self, "exclusion", None)
+        if exclusion is not None and block.main_fragments.len() < min_fragments:
+            exclusion.count_shortfall()
 
         if log:
             print("-------------- Deinit Fragment")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import re
+import json
+import threading
+
+VTYPE_SEW = re.compile(r"^e\d+$")
+VTYPE_LMUL = re.compile(r"^mf?\d+$")
+
+
+# Exclusion of known-bug patterns at generation time (see ProgramGenerator)
+# Fragments containing an instruction matching a rule are re-generated
+# (at most ProgramGenerator_exclusion_retries times, then dropped and re-drawn
+# by ProgramGenerator.gen_code_block; blocks still below min_fragments are
+# counted as shortfalls)
+# -> known bugs are not triggered again (simulator time, archive noise)
+# Rule (dict; all given fields must match the instruction):
+#  "mnemonic" .. regex (full match), e.g. "vfwsub.vv", r"vfw.*\.vf"
+#  "operands" .. regex (search in operand text), e.g. r"v0\.t"
+#  "vtype" .. dict with lists of "sew" and/or "lmul" (e.g. {"sew": ["e64"],
+#    "lmul": ["m8"]}), matches vsetvli/vsetivli with immediate vtype in range
+#  "category" .. informational (e.g. AFC category of bucket)
+# Profiles are written by hand (json file with list of rules) or built from
+# error causes of AFC buckets (see from_causes, from_corpus, repro_corpus.py).
+# Shared between generators (and threads) by passing an instance in the config.
+class ExclusionProfile:
+    def __init__(self, rules=None):
+        self.rules = []
+        self.lock = threading.Lock()
+        self.excluded = 0
+        self.exhausted = 0
+        self.shortfalls = 0
+        for rule in rules if rules is not None else []:
+            self.add_rule(**rule)
+
+    # counters are not serialized (e.g. config of MachineState in json files)
+    def __getstate__(self):
+        return {"rules": self.get_rules()}
+
+    def __setstate__(self, d):
+        self.__init__(d["rules"])
+
+    def __repr__(self):
+        return f"ExclusionProfile({self.get_rules()!r})"
+
+    # profile from config (ProgramGenerator_exclusion_profile)
+    # instance, list of rules or filename of json profile (None .. no exclusion)
+    @staticmethod
+    def from_config(config):
+        profile = config.get("ProgramGenerator_exclusion_profile", None)
+        if profile is None or isinstance(profile, ExclusionProfile):
+            return profile
+        if isinstance(profile, str):
+            return ExclusionProfile.load(profile)
+        return ExclusionProfile(profile)
+
+    @staticmethod
+    def load(filename):
+        with open(filename, "r") as f:
+            return ExclusionProfile(json.load(f))
+
+    def save(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.get_rules(), f, indent=2)
+
+    # profile from error causes (category, instr) of buckets
+    # (see FailureBuckets.get_cause, ReproCorpus); unknown instructions are ignored
+    # categories .. only causes of these AFC categories (None .. all)
+    @staticmethod
+    def from_causes(causes, categories=None):
+        profile = ExclusionProfile()
+        for category, instr in sorted(set(causes)):
+            if instr in [None, "unknown"]:
+                continue
+            if categories is not None and category not in categories:
+                continue
+            profile.add_rule(mnemonic=re.escape(instr), category=category)
+        return profile
+
+    # profile from buckets of repro corpus (see ReproCorpus)
+    # report .. only buckets still failing (see ReproCorpusRunner)
+    @staticmethod
+    def from_corpus(corpus, categories=None, report=None):
+        causes = []
+        for bucket, ids in corpus.get_buckets().items():
+            if report is not None:
+                status = report["buckets"].get(bucket, {}).get("status", None)
+                if status not in ["FAILING", "CHANGED"]:
+                    continue
+            entry = corpus.get_entries()[ids[0]]
+            causes.append((entry["category"], entry["instr"]))
+        return ExclusionProfile.from_causes(causes, categories=categories)
+
+    def add_rule(self, mnemonic=None, operands=None, vtype=None, category=None):
+        if mnemonic is None and operands is None and vtype is None:
+            raise Exception("ExclusionProfile: empty rule")
+        rule = {
+            "mnemonic": mnemonic,
+            "operands": operands,
+            "vtype": vtype,
+            "category": category,
+            # compiled
+            "re_mnemonic": None if mnemonic is None else re.compile(mnemonic),
+            "re_operands": None if operands is None else re.compile(operands),
+        }
+        # same pattern only once
+        if any(
+            all(r[key] == rule[key] for key in ["mnemonic", "operands", "vtype"])
+            for r in self.rules
+        ):
+            return
+        self.rules.append(rule)
+
+    def get_rules(self):
+        return [
+            {
+                key: rule[key]
+                for key in ["mnemonic", "operands", "vtype", "category"]
+                if rule[key] is not None
+            }
+            for rule in self.rules
+        ]
+
+    # (sew, lmul) of vsetvli/vsetivli with immediate vtype (None otherwise)
+    @staticmethod
+    def vtype(mnemonic, operands):
+        if mnemonic not in ["vsetvli", "vsetivli"]:
+            return None
+        sew = None
+        lmul = None
+        for op in operands.split(","):
+            op = op.strip()
+            if VTYPE_SEW.match(op):
+                sew = op
+            elif VTYPE_LMUL.match(op):
+                lmul = op
+        return (sew, lmul)
+
+    @staticmethod
+    def _match(rule, mnemonic, operands):
+        if rule["re_mnemonic"] is not None and not rule["re_mnemonic"].fullmatch(
+            mnemonic
+        ):
+            return False
+        if rule["re_operands"] is not None and not rule["re_operands"].search(operands):
+            return False
+        if rule["vtype"] is not None:
+            vtype = ExclusionProfile.vtype(mnemonic, operands)
+            if vtype is None:
+                return False
+            for value, key in zip(vtype, ["sew", "lmul"]):
+                if key in rule["vtype"] and value not in rule["vtype"][key]:
+                    return False
+        return True
+
+    # True, if an instruction of code (fragment) matches a rule
+    def match(self, code):
+        for line in str(code).split("\n"):
+            # strip comments and labels
+            line = line.split("#")[0].strip()
+            if ":" in line.split(" ")[0]:
+                line = line.split(":", 1)[1].strip()
+            if len(line) == 0 or line.startswith("."):
+                continue
+            parts = line.split(None, 1)
+            operands = parts[1] if len(parts) > 1 else ""
+            for rule in self.rules:
+                if self._match(rule, parts[0], operands):
+                    return True
+        return False
+
+    # count checked fragment
+    # returns True, if the fragment is excluded
+    def check(self, code):
+        if not self.match(code):
+            return False
+        with self.lock:
+            self.excluded += 1
+        return True
+
+    # count fragment given up after all retries
+    def count_exhausted(self):
+        with self.lock:
+            self.exhausted += 1
+
+    # count code block with less than min_fragments fragments
+    def count_shortfall(self):
+        with self.lock:
+            self.shortfalls += 1
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "rules": len(self.rules),
+                "excluded": self.excluded,
+                "exhausted": self.exhausted,
+                "shortfalls": self.shortfalls,
+            }
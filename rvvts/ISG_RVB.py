@@ -6,8 +6,7 @@
 # SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
 #
 
-from .CodeBlock import CodeFragment
-from .ISG_Base import ProgramGenerator, grammarISG
+from .ISG_Base import ProgramGenerator
 from .ISG_RVI import RVRandRegImmGenerator
 
 import mergedeep
@@ -18,6 +17,8 @@ import mergedeep
 class RVBProgramGenerator(ProgramGenerator):
     def __init__(self, config=None):
 
+        self.setup_exclusion(config)
+
         self.rrig = RVRandRegImmGenerator()
 
         self.__def_grammars()
@@ -34,8 +35,7 @@ class RVBProgramGenerator(ProgramGenerator):
         self.__def_grammar(extensions=extensions, xlen=rvisacfg.get_xlen())
 
     def gen_fragment(self, **kwargs):
-        code, ann = grammarISG(self.grammar, **kwargs)
-        return CodeFragment(code, ann)
+        return self.gen_grammar_fragment(self.grammar, **kwargs)
 
     def __def_grammars(self):
         # This grammar uses dummy nodes ("# dummy") to prevent empty lists which are currently not supported by our ISG
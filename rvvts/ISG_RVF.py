@@ -7,8 +7,7 @@
 # SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
 #
 
-from .CodeBlock import CodeFragment
-from .ISG_Base import RandRegImmGenerator, RegAlloc, ProgramGenerator, grammarISG
+from .ISG_Base import RandRegImmGenerator, RegAlloc, ProgramGenerator
 from .ISG_RVI import (
     CSRModGenerator,
     RVRegAlloc,
@@ -114,6 +113,8 @@ class RVFBoundedLoadStoreGenerator(RVIBoundedLoadStoreGenerator):
 class RVFProgramGenerator(ProgramGenerator):
     def __init__(self, config=None):
 
+        self.setup_exclusion(config)
+
         # F   | Single |  32
         # D   | Double |  64
         # Q   | Quad   | 128
@@ -153,8 +154,7 @@ class RVFProgramGenerator(ProgramGenerator):
         self.__def_grammar()
 
     def gen_fragment(self, **kwargs):
-        code, ann = grammarISG(self.grammar, **kwargs)
-        return CodeFragment(code, ann)
+        return self.gen_grammar_fragment(self.grammar, **kwargs)
 
     def gen_set_mstatus_en_float(self):
         return self.csrmg.gen_csr_mod("mstatus", 0x6000, [0x0000, 0x6000])
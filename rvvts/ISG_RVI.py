@@ -13,7 +13,6 @@ from .ISG_Base import (
     RandRegImmGenerator,
     RegAlloc,
     ProgramGenerator,
-    grammarISG,
 )
 
 import random
@@ -257,6 +256,8 @@ class RVRandRegImmGenerator(RandRegImmGenerator):
 class RVProgramGenerator(ProgramGenerator):
     def __init__(self, config=None):
 
+        self.setup_exclusion(config)
+
         self.mstate = MachineState(config)
         self.rlg = RandLabelGenerator()
         self.rrig = RVRandRegImmGenerator()
@@ -286,8 +287,7 @@ class RVProgramGenerator(ProgramGenerator):
         return ret
 
     def gen_fragment(self, **kwargs):
-        code, ann = grammarISG(self.grammar, **kwargs)
-        return CodeFragment(code, ann)
+        return self.gen_grammar_fragment(self.grammar, **kwargs)
 
     def gen_deinit_fragments(self, **kwargs):
         return CodeFragmentList(CodeFragment(self.rlg.gen_last()))
@@ -6,8 +6,7 @@
 # SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
 #
 
-from .CodeBlock import CodeFragment
-from .ISG_Base import RandRegImmGenerator, RegAlloc, ProgramGenerator, grammarISG
+from .ISG_Base import RandRegImmGenerator, RegAlloc, ProgramGenerator
 from .ISG_RVI import CSRModGenerator, RVRegAlloc, RVRandRegImmGenerator
 from .ISG_RVF import RVFRandRegImmGenerator
 
@@ -530,6 +529,8 @@ class RVVBoundedLoadStoreGenerator:
 class RVVProgramGenerator(ProgramGenerator):
     def __init__(self, config=None):
 
+        self.setup_exclusion(config)
+
         self.has_float = config["rvisacfg"].is_float_under_test()
 
         self.quirk_ara_csrs = config.get("quirk_ara_csrs", False)
@@ -558,8 +559,7 @@ class RVVProgramGenerator(ProgramGenerator):
         self.__def_grammar()
 
     def gen_fragment(self, **kwargs):
-        code, ann = grammarISG(self.grammar, **kwargs)
-        return CodeFragment(code, ann)
+        return self.gen_grammar_fragment(self.grammar, **kwargs)
 
     def gen_set_mstatus_en_vector(self):
         return self.csrmg.gen_csr_mod("mstatus", 0x600, [0x000, 0x600])
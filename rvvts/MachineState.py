@@ -8,13 +8,25 @@
 # TODO: support "ann" in other methods (dump, compare, ...)
 
 from .CodeBlock import CodeFragmentList, CodeFragment
+from .RVISACfg import RVISACfg
+from .BinFormat import (
+    BIN_KIND_MACHINESTATE,
+    BIN_FLAG_DELTA,
+    BinReader,
+    bin_save,
+    is_bin_file,
+)
 
 import os
+import json
+import mmap
+import struct
 import random
 import copy
 import jsonpickle
 import hashlib
 import numpy as np
+from collections.abc import MutableMapping
 
 RVREGS_IDX_DICT = {
     "zero": 0,
@@ -52,16 +64,342 @@ RVREGS_IDX_DICT = {
 }
 
 
+# Fixed layout of the compact machine state (see CompactMachineState)
+# depends only on xlen, flen and vlen -> shared by all states of a configuration
+class MachineStateSchema:
+
+    _cache = {}
+
+    @classmethod
+    def get(cls, rvisacfg):
+        flen = rvisacfg.get_flen() if rvisacfg.is_float_needed() else 0
+        vlen = rvisacfg.get_vlen() if rvisacfg.is_needed("v") else 0
+        key = (rvisacfg.get_xlen(), flen, vlen)
+        schema = cls._cache.get(key, None)
+        if schema is None:
+            schema = cls(*key)
+            cls._cache[key] = schema
+        return schema
+
+    def __init__(self, xlen, flen, vlen):
+        self.xlen = xlen
+        self.flenb = flen // 8
+        self.vlenb = vlen // 8
+
+        self.xregs = list(RVREGS_IDX_DICT)
+        self.csrs = ["lastPC", "#exceptions", "mstatus.fs/vs"]
+        self.fregs = []
+        self.vregs = []
+        if self.flenb > 0:
+            self.csrs += ["fcsr"]
+            self.fregs = ["f" + str(i) for i in range(32)]
+        vcsrs = []
+        if self.vlenb > 0:
+            vcsrs = ["vtype", "vl", "vlenb", "vstart", "vxrm", "vxsat", "vcsr"]
+            self.csrs += vcsrs
+            self.vregs = ["v" + str(i) for i in range(32)]
+        # csrs with negative values (lastPC = -1 for aborted runs)
+        self.signed = ["lastPC"]
+
+        # register name -> index
+        self.xreg_index = {name: i for i, name in enumerate(self.xregs)}
+        # state entry -> (array, index), None for entries kept in misc
+        # (same order as in DumpFile.extract)
+        self.state_keys = {"xmemhash": None, "dmemhash": None}
+        for i, name in enumerate(self.csrs):
+            if name not in vcsrs:
+                self.state_keys[name] = ("csr", i)
+        for i, name in enumerate(self.fregs):
+            self.state_keys[name] = ("f", i)
+        for i, name in enumerate(self.csrs):
+            if name in vcsrs:
+                self.state_keys[name] = ("csr", i)
+        for i, name in enumerate(self.vregs):
+            self.state_keys[name] = ("v", i)
+        self.state_keys.update({"xmempages": None, "dmempages": None})
+
+    def __eq__(self, other):
+        return isinstance(other, MachineStateSchema) and (
+            self.xlen,
+            self.flenb,
+            self.vlenb,
+        ) == (other.xlen, other.flenb, other.vlenb)
+
+    def __hash__(self):
+        return hash((self.xlen, self.flenb, self.vlenb))
+
+
+# Array backed machine state
+#  x .. integer registers (uint64[32])
+#  csr .. lastPC, #exceptions, csrs (uint64[n], see MachineStateSchema.csrs)
+#  f .. float registers (uint8[32, flenb])
+#  v .. vector registers (uint8[32, vlenb])
+#  misc .. other entries (memory hashes/pages, ...)
+# Independent of the config -> cheap to copy, compare and keep.
+# get_view() returns the [regs, state] dict view used by MachineState.state
+class CompactMachineState:
+
+    MASK = (1 << 64) - 1
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.x = np.zeros(len(schema.xregs), dtype=np.uint64)
+        self.csr = np.zeros(len(schema.csrs), dtype=np.uint64)
+        self.f = np.zeros((len(schema.fregs), schema.flenb), dtype=np.uint8)
+        self.v = np.zeros((len(schema.vregs), schema.vlenb), dtype=np.uint8)
+        self.misc = {}
+        # additional registers (e.g. pc)
+        self.regs_misc = {}
+        self.view = None
+
+    @classmethod
+    def from_state(cls, schema, state):
+        compact = cls(schema)
+        regs, entries = compact.get_view()
+        for key, value in state[0].items():
+            regs[key] = value
+        for key, value in state[1].items():
+            entries[key] = value
+        return compact
+
+    # plain dicts (regs, state)
+    def as_state(self):
+        regs, entries = self.get_view()
+        return [dict(regs), dict(entries)]
+
+    def get_view(self):
+        if self.view is None:
+            self.view = [_RegsView(self), _StateView(self)]
+        return self.view
+
+    def copy(self):
+        compact = CompactMachineState(self.schema)
+        compact.x = self.x.copy()
+        compact.csr = self.csr.copy()
+        compact.f = self.f.copy()
+        compact.v = self.v.copy()
+        compact.misc = copy.deepcopy(self.misc)
+        compact.regs_misc = self.regs_misc.copy()
+        return compact
+
+    def get_reg(self, key):
+        idx = self.schema.xreg_index.get(key, None)
+        if idx is None:
+            return self.regs_misc[key]
+        return int(self.x[idx])
+
+    def set_reg(self, key, value):
+        idx = self.schema.xreg_index.get(key, None)
+        if idx is None:
+            self.regs_misc[key] = value
+        else:
+            self.x[idx] = value & self.MASK
+
+    def get_entry(self, key):
+        loc = self.schema.state_keys.get(key, None)
+        if loc is None:
+            return self.misc[key]
+        array, idx = loc
+        if array == "csr":
+            value = int(self.csr[idx])
+            if value >> 63 and key in self.schema.signed:
+                value -= 1 << 64
+            return value
+        return getattr(self, array)[idx].tobytes()
+
+    def set_entry(self, key, value):
+        loc = self.schema.state_keys.get(key, None)
+        if loc is None:
+            self.misc[key] = value
+            return
+        array, idx = loc
+        if array == "csr":
+            self.csr[idx] = value & self.MASK
+        else:
+            getattr(self, array)[idx] = np.frombuffer(value, dtype=np.uint8)
+
+    def reg_keys(self):
+        return self.schema.xregs + list(self.regs_misc)
+
+    def state_keys(self):
+        keys = [
+            key
+            for key, loc in self.schema.state_keys.items()
+            if loc is not None or key in self.misc
+        ]
+        return keys + [key for key in self.misc if key not in self.schema.state_keys]
+
+    # per register masks of differing entries (vectorized)
+    # returns None, if the layouts differ
+    def diff_masks(self, other):
+        if self.schema != other.schema:
+            return None
+        return {
+            "x": self.x != other.x,
+            "csr": self.csr != other.csr,
+            "f": (self.f != other.f).any(axis=1),
+            "v": (self.v != other.v).any(axis=1),
+        }
+
+    # names of differing registers and state entries
+    # returns None, if the layouts differ
+    def diff_keys(self, other):
+        masks = self.diff_masks(other)
+        if masks is None:
+            return None
+        schema = self.schema
+        keys = set()
+        for array, names in [
+            ("x", schema.xregs),
+            ("csr", schema.csrs),
+            ("f", schema.fregs),
+            ("v", schema.vregs),
+        ]:
+            keys.update(names[i] for i in np.flatnonzero(masks[array]))
+        for own, theirs in [
+            (self.regs_misc, other.regs_misc),
+            (self.misc, other.misc),
+        ]:
+            for key in own.keys() | theirs.keys():
+                if key not in own or key not in theirs or own[key] != theirs[key]:
+                    keys.add(key)
+        return keys
+
+    def equal(self, other):
+        keys = self.diff_keys(other)
+        return keys is not None and len(keys) == 0
+
+    # raw register arrays (x, csr, f, v; little endian)
+    def to_bytes(self):
+        return b"".join(
+            array.astype(array.dtype.newbyteorder("<"), copy=False).tobytes()
+            for array in [self.x, self.csr, self.f, self.v]
+        )
+
+    # inverse of to_bytes (misc entries are not included)
+    @classmethod
+    def from_bytes(cls, schema, data):
+        compact = cls(schema)
+        pos = 0
+        for name in ["x", "csr", "f", "v"]:
+            array = getattr(compact, name)
+            dtype = array.dtype.newbyteorder("<")
+            values = np.frombuffer(data, dtype=dtype, count=array.size, offset=pos)
+            setattr(compact, name, values.astype(array.dtype).reshape(array.shape))
+            pos += array.nbytes
+        if pos != len(data):
+            raise Exception("CompactMachineState: invalid data length")
+        return compact
+
+    # digest of the register arrays (e.g. identification of base states)
+    def digest(self):
+        return hashlib.blake2b(self.to_bytes(), digest_size=16).hexdigest()
+
+
+def _xor_bytes(a, b):
+    return np.bitwise_xor(
+        np.frombuffer(a, dtype=np.uint8), np.frombuffer(b, dtype=np.uint8)
+    ).tobytes()
+
+
+# dict views on CompactMachineState (compatibility with the former dict based state)
+class _RegsView(MutableMapping):
+    def __init__(self, compact):
+        self.compact = compact
+
+    def __getitem__(self, key):
+        return self.compact.get_reg(key)
+
+    def __setitem__(self, key, value):
+        self.compact.set_reg(key, value)
+
+    def __delitem__(self, key):
+        del self.compact.regs_misc[key]
+
+    def __iter__(self):
+        return iter(self.compact.reg_keys())
+
+    def __len__(self):
+        return len(self.compact.schema.xregs) + len(self.compact.regs_misc)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _StateView(MutableMapping):
+    def __init__(self, compact):
+        self.compact = compact
+
+    def __getitem__(self, key):
+        return self.compact.get_entry(key)
+
+    def __setitem__(self, key, value):
+        self.compact.set_entry(key, value)
+
+    def __delitem__(self, key):
+        del self.compact.misc[key]
+
+    def __iter__(self):
+        return iter(self.compact.state_keys())
+
+    def __len__(self):
+        return len(self.compact.state_keys())
+
+    def __contains__(self, key):
+        loc = self.compact.schema.state_keys.get(key, None)
+        return loc is not None or key in self.compact.misc
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class MachineState:
 
+    # json (jsonpickle) or compact binary format (see load_bin)
     @classmethod
-    def load(cls, filename):
+    def load(cls, filename, config=None, base=None):
+        if is_bin_file(filename):
+            return cls.load_bin(filename, config=config, base=base)
         with open(filename, "r") as file:
             json_data = file.read()
             return jsonpickle.decode(json_data)
         return None
 
-    def __init__(self, config, state=None):
+    # create machine state from the dump file of a simulator run
+    # Only a fingerprint of the raw dump is computed here. The state is
+    # extracted (and saved to filename) on first access of state/dstate
+    # -> equal states can be detected by fingerprint only (see CompareRunner)
+    @classmethod
+    def from_dumpfile(cls, config, dumpfile, filename=None):
+        fingerprint, extract, trace, states = dumpfile.extract_lazy()
+        if filename is not None and os.path.exists(filename):
+            # remove stale state of previous run
+            os.remove(filename)
+
+        def loader(mstate):
+            mstate.dstate = {}
+            mstate.from_state(extract())
+            if filename is not None:
+                mstate.save(filename)
+
+        mstate = cls(config, fingerprint=fingerprint, loader=loader)
+        mstate.trace = trace
+        if states is not None:
+            mstate.trace_states = [
+                cls(config, loader=cls.trace_state_loader(extract_state))
+                for extract_state in states
+            ]
+        return mstate
+
+    @staticmethod
+    def trace_state_loader(extract):
+        def loader(mstate):
+            mstate.dstate = {}
+            mstate.from_state(extract())
+
+        return loader
+
+    def __init__(self, config, state=None, fingerprint=None, loader=None):
         self.FORMAT_MAX_NAME_WIDTH = 20
         self.FORMAT_MAX_VALUE_WIDTH = 16
 
@@ -75,6 +413,19 @@ class MachineState:
         self.has_vector = self.rvisacfg.is_needed("v")
 
         self.quirk_ara_csrs = config.get("quirk_ara_csrs", False)
+        self.schema = MachineStateSchema.get(self.rvisacfg)
+
+        # fingerprint of raw dump (None .. unknown)
+        self.fingerprint = fingerprint
+        # per fragment state trace (see DumpFile.extract_trace; None .. no trace)
+        self.trace = None
+        # machine states of trace entries (see DumpFile.extract_trace_states;
+        # None .. not traced)
+        self.trace_states = None
+        if loader is not None:
+            # extracted on first access (see __getattr__)
+            self._loader = loader
+            return
 
         # decoded state
         self.dstate = {}
@@ -83,6 +434,64 @@ class MachineState:
         else:
             self.from_state(state)
 
+    # create machine state from compact state (no copy)
+    @classmethod
+    def from_compact(cls, config, compact, fingerprint=None):
+        return cls(config, compact, fingerprint=fingerprint)
+
+    # only called for missing attributes -> state/dstate of lazy machine state
+    def __getattr__(self, name):
+        loader = self.__dict__.get("_loader", None)
+        if loader is None or name not in ("_compact", "dstate"):
+            raise AttributeError(name)
+        del self._loader
+        loader(self)
+        return getattr(self, name)
+
+    # state as [regs, state] dicts (view on compact state)
+    @property
+    def state(self):
+        return self._compact.get_view()
+
+    @state.setter
+    def state(self, state):
+        if isinstance(state, CompactMachineState):
+            self._compact = state
+        else:
+            self._compact = CompactMachineState.from_state(
+                MachineStateSchema.get(self.rvisacfg), state
+            )
+
+    # copy of compact state (without config)
+    def get_compact(self):
+        return self._compact.copy()
+
+    # serialized with plain state dicts (compatible with former mstate.json)
+    # (lazy machine state is extracted before serialization/copy; trace states
+    # are not serialized)
+    def __getstate__(self):
+        if "_loader" in self.__dict__:
+            # extract lazy state first (loader sets dstate)
+            self._compact
+        d = self.__dict__.copy()
+        d.pop("_loader", None)
+        d.pop("_compact", None)
+        d.pop("schema", None)
+        d["trace_states"] = None
+        d["state"] = self._compact.as_state()
+        return d
+
+    def __setstate__(self, d):
+        d = d.copy()
+        state = d.pop("state", None)
+        d.setdefault("fingerprint", None)
+        d.setdefault("trace", None)
+        d.setdefault("trace_states", None)
+        self.__dict__.update(d)
+        self.schema = MachineStateSchema.get(self.rvisacfg)
+        if state is not None:
+            self.state = state
+
     def __str__(self):
         return self.as_string()
 
@@ -90,13 +499,84 @@ class MachineState:
         return self.__str__()
 
     def duplicate(self):
-        return MachineState(copy.deepcopy(self.config), copy.deepcopy(self.state))
+        return MachineState.from_compact(
+            self.config, self.get_compact(), fingerprint=self.fingerprint
+        )
 
-    def save(self, filename):
+    # format by extension: ".bin" .. compact binary (see save_bin), else json
+    def save(self, filename, base=None):
+        if filename.endswith(".bin"):
+            self.save_bin(filename, base=base)
+            return
         json_data = jsonpickle.encode(self)
         with open(filename, "w") as file:
             file.write(json_data)
 
+    # Compact binary format (BinFormat, kind BIN_KIND_MACHINESTATE)
+    #  section 0 .. metadata (json): isa configuration, fingerprint, misc entries
+    #  section 1 .. register arrays (CompactMachineState.to_bytes)
+    # If base is given (e.g. reference state for a DuT state), the register
+    # arrays are stored as delta (xor) to base -> mostly zeros, compresses well.
+    # The base is identified by its digest and has to be passed to load_bin.
+    # Only the isa configuration is stored, not the full config.
+    def save_bin(self, filename, base=None):
+        compact = self._compact
+        meta = {
+            "rvisacfg": {
+                "xlen": self.rvisacfg.get_xlen(),
+                "extensions": self.rvisacfg.get_under_test(),
+                "vlen": self.rvisacfg.get_vlen(),
+                "velen": self.rvisacfg.get_velen(),
+            },
+            "quirk_ara_csrs": self.quirk_ara_csrs,
+            "fingerprint": self.fingerprint,
+            "regs_misc": compact.regs_misc,
+            "misc": compact.misc,
+            "base": None,
+        }
+        data = compact.to_bytes()
+        flags = 0
+        if base is not None and base.schema == self.schema:
+            meta["base"] = base._compact.digest()
+            data = _xor_bytes(data, base._compact.to_bytes())
+            flags |= BIN_FLAG_DELTA
+        sections = [json.dumps(meta).encode(), data]
+        bin_save(filename, BIN_KIND_MACHINESTATE, sections, flags=flags)
+
+    @classmethod
+    def load_bin(cls, filename, config=None, base=None):
+        with BinReader(filename, BIN_KIND_MACHINESTATE) as reader:
+            meta = json.loads(reader.read_section())
+            data = reader.read_section()
+            flags = reader.flags
+
+        if config is None:
+            isa = meta["rvisacfg"]
+            config = {
+                "rvisacfg": RVISACfg(
+                    xlen=isa["xlen"],
+                    extensions_under_test=isa["extensions"],
+                    vlen=isa["vlen"],
+                    velen=isa["velen"],
+                ),
+                "quirk_ara_csrs": meta["quirk_ara_csrs"],
+            }
+        schema = MachineStateSchema.get(config["rvisacfg"])
+
+        if flags & BIN_FLAG_DELTA:
+            if base is None:
+                raise Exception(
+                    f"MachineState: {filename}: delta encoded -> base state needed"
+                )
+            if base.schema != schema or base._compact.digest() != meta["base"]:
+                raise Exception(f"MachineState: {filename}: base state does not match")
+            data = _xor_bytes(data, base._compact.to_bytes())
+
+        compact = CompactMachineState.from_bytes(schema, data)
+        compact.regs_misc = meta["regs_misc"]
+        compact.misc = meta["misc"]
+        return cls.from_compact(config, compact, fingerprint=meta["fingerprint"])
+
     def gen_value_from_selection(self, value_mode, last_value, mask, values):
         last_value = last_value & ~mask
         if value_mode == self.VALUE_MODE_ZERO:
@@ -179,6 +659,38 @@ class MachineState:
                 res += f"({float_str})"
         return res
 
+    @staticmethod
+    def _is_pages(value):
+        return isinstance(value, dict) and "digests" in value
+
+    @staticmethod
+    def _pages_to_string(value):
+        return f"{len(value['digests'])} pages of {value['page_size']} bytes"
+
+    # addresses of differing pages
+    @staticmethod
+    def _pages_diff(pages_ref, pages_dut):
+        if pages_ref.get("page_size") != pages_dut.get("page_size") or len(
+            pages_ref["digests"]
+        ) != len(pages_dut["digests"]):
+            return None
+        return [
+            pages_ref["addr"] + i * pages_ref["page_size"]
+            for i, (a, b) in enumerate(zip(pages_ref["digests"], pages_dut["digests"]))
+            if a != b
+        ]
+
+    def _pages_diff_to_string(self, pages_ref, pages_dut):
+        diff = self._pages_diff(pages_ref, pages_dut)
+        if diff is None:
+            return "layout differs"
+        res = str(len(diff)) + " differ"
+        if len(diff) > 0:
+            res += ": " + ",".join(hex(addr) for addr in diff[:2])
+            if len(diff) > 2:
+                res += ",..."
+        return res
+
     def _bytes_to_hex_string(self, sname, value):
         res = "0x" + "".join("{:02x}".format(x) for x in value[::-1])
         if self._is_float_reg_name(sname):
@@ -356,6 +868,8 @@ class MachineState:
         # MISC
         for key in ["xmemhash", "dmemhash"]:
             self.state[1][key] = "########################################"
+        for key in ["xmempages", "dmempages"]:
+            self.state[1][key] = {"addr": 0, "page_size": 0, "digests": []}
         for key in ["lastPC", "#exceptions"]:
             self.state[1][key] = 0
         # I (+priv) state
@@ -435,6 +949,8 @@ class MachineState:
             force_single_line = False
             if isinstance(val, bool):
                 val = str(val)
+            elif self._is_pages(val):
+                val = self._pages_to_string(val)
             elif isinstance(val, int):
                 val = self._value_to_string(val)
             elif isinstance(val, bytes):
@@ -468,125 +984,20 @@ class MachineState:
 
         return output
 
-    def compare(self, other, diff_full=False):
-        output = ""
-        is_equal = True
-
-        regs_ref = self.state[0]
-        regs_dut = other.state[0]
-        output += (
-            "REG".ljust(self.FORMAT_MAX_NAME_WIDTH, " ")
-            + "REF".ljust(48, " ")
-            + "DUT".ljust(48, " ")
-            + "DIFF\n"
-        )
-        for regname in regs_ref.keys():
-            val_ref = regs_ref[regname]
-            val_dut = regs_dut[regname]
-            entry_is_equal = True
-            if val_ref != val_dut:
-                entry_is_equal = False
-                is_equal = False
-
-            if regname != "pc":
-                regname = regname + "(x" + str(RVREGS_IDX_DICT[regname]) + ")"
-            regname = regname.ljust(self.FORMAT_MAX_NAME_WIDTH, " ")
-
-            if diff_full or not entry_is_equal:
-                if not entry_is_equal:
-                    diff = "X"
-                else:
-                    diff = ""
-                output += (
-                    regname
-                    + self._value_to_string(val_ref).ljust(48, " ")
-                    + self._value_to_string(val_dut).ljust(48, " ")
-                    + diff
-                    + "\n"
-                )
-
-        def state_entry_compare(sname, val_ref, val_dut, diff_full):
-            is_equal = True
-            res = ""
-            if val_ref != val_dut:
-                is_equal = False
-
-            if isinstance(val_ref, bool) and isinstance(val_dut, bool):
-                val_ref_str = str(val_ref)
-                val_dut_str = str(val_dut)
-            elif isinstance(val_ref, int) and isinstance(val_dut, int):
-                val_ref_str = self._value_to_string(val_ref)
-                val_dut_str = self._value_to_string(val_dut)
-            elif isinstance(val_ref, bytes) and isinstance(val_dut, bytes):
-                if self._is_vector_reg_name(sname):
-                    val_ref_str = self._bytes_to_string(sname, val_ref)
-                    val_dut_str = self._bytes_to_string(sname, val_dut)
-                else:
-                    val_ref_str = self._bytes_to_hex_string(sname, val_ref)
-                    val_dut_str = self._bytes_to_hex_string(sname, val_dut)
-            else:
-                val_ref_str = str(val_ref)
-                val_dut_str = str(val_dut)
+    # names of differing registers and state entries (None .. layouts differ)
+    def diff_keys(self, other):
+        return self._compact.diff_keys(other._compact)
 
-            if diff_full or not is_equal:
-                if not is_equal:
-                    diff = "X"
-                else:
-                    diff = ""
-                if len(val_ref_str) < 48 and len(val_dut_str) < 48:
-                    sname = sname.ljust(self.FORMAT_MAX_NAME_WIDTH, " ")
-                    val_ref_str = val_ref_str.ljust(48, " ")
-                    val_dut_str = val_dut_str.ljust(48, " ")
-                    res += sname + str(val_ref_str) + str(val_dut_str) + diff
-                else:
-                    sname = sname.ljust(self.FORMAT_MAX_NAME_WIDTH + 48 + 48, " ")
-                    res += sname + diff + "\n"
-                    res += val_ref_str + "\n"
-                    res += val_dut_str + "\n"
-
-                    def str_helper(a, b):
-                        if a == b:
-                            return "  "
-                        else:
-                            return "^^"
-
-                    res += " ".join(
-                        [str_helper(a, b) for a, b in zip(val_ref, val_dut)]
-                    )
-
-            return (is_equal, res)
-
-        output += "\n"
-        output += (
-            "STATE".ljust(self.FORMAT_MAX_NAME_WIDTH, " ")
-            + "REF".ljust(48, " ")
-            + "DUT".ljust(48, " ")
-            + "DIFF\n"
-        )
-        state_ref = self.state[1]
-        state_dut = other.state[1]
-        for sname in state_ref.keys():
-            val_ref = state_ref[sname]
-            val_dut = state_dut[sname]
-            entry_is_equal, res = state_entry_compare(
-                sname, val_ref, val_dut, diff_full
-            )
-            if not entry_is_equal:
-                is_equal = False
-            if diff_full or not entry_is_equal:
-                output += res + "\n"
-            # output dstats
-            dstatekeys = self.dstate.get(sname, {}).keys()
-            for dsname in dstatekeys:
-                dval_ref = self.dstate[sname][dsname]
-                dval_dut = other.dstate[sname][dsname]
-                entry_is_equal, res = state_entry_compare(
-                    " " + sname + "." + dsname, dval_ref, dval_dut, diff_full
-                )
-                if diff_full or not entry_is_equal:
-                    output += res + "\n"
-
-        return (is_equal, output)
+    # returns (is_equal, MachineStateDiff)
+    # equality is determined vectorized, the diff entries are only collected
+    # (and text rendered) on access
+    def compare(self, other, diff_full=False):
+        diff_keys = self._compact.diff_keys(other._compact)
+        diff = MachineStateDiff(self, other, diff_full=diff_full, diff_keys=diff_keys)
+        if diff_keys is not None:
+            return (len(diff_keys) == 0, diff)
+        # different layouts -> compare all entries
+        return (diff.is_equal(), diff)
 
     def ann2matchset(ann):
         if ann is None:
@@ -628,11 +1039,32 @@ class MachineState:
             return True
         return False
 
+    # restorable state elements (see as_CodeFragmentList), each as set of names
+    # (e.g. for minimizing the restored state, see state_ddmin in CodeErrMinRunner)
+    def restore_elements(self):
+        elements = [
+            {regname}
+            for regname in self.state[0].keys()
+            if regname != "pc" and regname != "zero"
+        ]
+        elements.append({"mstatus.fs/vs"})
+        if self.has_float:
+            elements.append({"fcsr"})
+            elements += [{"f" + str(i)} for i in range(32)]
+        if self.has_vector:
+            elements.append({"vl", "vtype"})
+            elements.append({"vstart"})
+            elements.append({"vcsr", "vxrm", "vxsat"})
+            elements += [{"v" + str(i)} for i in range(32)]
+        return elements
+
     # TODO: rework (simplify/cleanup)
-    def as_CodeFragmentList(self, ann=None):
+    # mset .. explicit set of restored elements (overrides ann)
+    def as_CodeFragmentList(self, ann=None, mset=None):
 
         # create state element matchlist from ann
-        mset = MachineState.ann2matchset(ann)
+        if mset is None:
+            mset = MachineState.ann2matchset(ann)
 
         def gen_byte_data(symname, values):
             data = (symname + ":").ljust(9) + ".byte "
@@ -836,6 +1268,199 @@ _vector_data_end:
         return f
 
 
+# Differing (or all for diff_full) element of a machine state comparison
+#  section .. "reg" or "state"
+#  name .. element name (decoded fields: <parent>.<field>, e.g. vtype.vsew)
+#  parent .. state entry of decoded field (None for raw elements)
+#  ref/dut .. values
+#  mask .. byte-level difference mask for bytes values (float/vector registers)
+class MachineStateDiffEntry:
+    def __init__(self, section, name, ref, dut, parent=None):
+        self.section = section
+        self.name = name
+        self.parent = parent
+        self.ref = ref
+        self.dut = dut
+        self.equal = ref == dut
+        self.mask = None
+        if (
+            not self.equal
+            and isinstance(ref, bytes)
+            and isinstance(dut, bytes)
+            and len(ref) == len(dut)
+        ):
+            self.mask = np.frombuffer(ref, dtype=np.uint8) != np.frombuffer(
+                dut, dtype=np.uint8
+            )
+
+    def __repr__(self):
+        return f"MachineStateDiffEntry({self.name}: {self.ref!r} != {self.dut!r})"
+
+
+# Structured result of MachineState.compare
+# Entries are collected on first access (get_entries), the text diff is only
+# rendered on str() (e.g. print or log)
+class MachineStateDiff:
+    def __init__(self, ref, dut, diff_full=False, diff_keys=None):
+        self.ref = ref
+        self.dut = dut
+        self.diff_full = diff_full
+        # differing regs/state entries (None .. unknown -> compare all)
+        self.diff_keys = diff_keys
+        self.entries = None
+        self.text = None
+        self.appendix = []
+
+    def is_equal(self):
+        if self.diff_keys is not None:
+            return len(self.diff_keys) == 0
+        return all(entry.equal for entry in self.get_entries())
+
+    # entries in order of the machine state (differing only, unless diff_full)
+    def get_entries(self):
+        if self.entries is None:
+            self.entries = self._collect()
+        return self.entries
+
+    # entry by name (None .. not differing)
+    def get(self, name):
+        for entry in self.get_entries():
+            if entry.name == name:
+                return entry
+        return None
+
+    def names(self):
+        return [entry.name for entry in self.get_entries()]
+
+    # additional text appended on rendering (e.g. coverage)
+    def append_text(self, text):
+        self.appendix.append(text)
+        self.text = None
+
+    def _collect(self):
+        entries = []
+        if not self.diff_full and self.diff_keys is not None and not self.diff_keys:
+            return entries
+
+        def selected(key):
+            return self.diff_full or self.diff_keys is None or key in self.diff_keys
+
+        def add(entry):
+            if self.diff_full or not entry.equal:
+                entries.append(entry)
+
+        regs_ref = self.ref.state[0]
+        regs_dut = self.dut.state[0]
+        for regname in regs_ref.keys():
+            if selected(regname):
+                add(
+                    MachineStateDiffEntry(
+                        "reg", regname, regs_ref[regname], regs_dut[regname]
+                    )
+                )
+
+        state_ref = self.ref.state[1]
+        state_dut = self.dut.state[1]
+        for sname in state_ref.keys():
+            if not selected(sname):
+                continue
+            add(
+                MachineStateDiffEntry(
+                    "state", sname, state_ref[sname], state_dut[sname]
+                )
+            )
+            # decoded fields
+            for dsname, dval_ref in self.ref.dstate.get(sname, {}).items():
+                add(
+                    MachineStateDiffEntry(
+                        "state",
+                        sname + "." + dsname,
+                        dval_ref,
+                        self.dut.dstate[sname][dsname],
+                        parent=sname,
+                    )
+                )
+        return entries
+
+    def __str__(self):
+        if self.text is None:
+            self.text = self._render() + "".join(self.appendix)
+        return self.text
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _render_reg(self, entry):
+        ms = self.ref
+        regname = entry.name
+        if regname != "pc":
+            regname = regname + "(x" + str(RVREGS_IDX_DICT[regname]) + ")"
+        return (
+            regname.ljust(ms.FORMAT_MAX_NAME_WIDTH, " ")
+            + ms._value_to_string(entry.ref).ljust(48, " ")
+            + ms._value_to_string(entry.dut).ljust(48, " ")
+            + ("" if entry.equal else "X")
+        )
+
+    def _render_state(self, entry):
+        ms = self.ref
+        sname = entry.name if entry.parent is None else " " + entry.name
+        val_ref = entry.ref
+        val_dut = entry.dut
+        if isinstance(val_ref, bool) and isinstance(val_dut, bool):
+            val_ref_str = str(val_ref)
+            val_dut_str = str(val_dut)
+        elif isinstance(val_ref, int) and isinstance(val_dut, int):
+            val_ref_str = ms._value_to_string(val_ref)
+            val_dut_str = ms._value_to_string(val_dut)
+        elif ms._is_pages(val_ref) and ms._is_pages(val_dut):
+            val_ref_str = ms._pages_to_string(val_ref)
+            val_dut_str = ms._pages_diff_to_string(val_ref, val_dut)
+        elif isinstance(val_ref, bytes) and isinstance(val_dut, bytes):
+            if ms._is_vector_reg_name(sname):
+                val_ref_str = ms._bytes_to_string(sname, val_ref)
+                val_dut_str = ms._bytes_to_string(sname, val_dut)
+            else:
+                val_ref_str = ms._bytes_to_hex_string(sname, val_ref)
+                val_dut_str = ms._bytes_to_hex_string(sname, val_dut)
+        else:
+            val_ref_str = str(val_ref)
+            val_dut_str = str(val_dut)
+
+        diff = "" if entry.equal else "X"
+        if len(val_ref_str) < 48 and len(val_dut_str) < 48:
+            sname = sname.ljust(ms.FORMAT_MAX_NAME_WIDTH, " ")
+            return (
+                sname + val_ref_str.ljust(48, " ") + val_dut_str.ljust(48, " ") + diff
+            )
+        res = sname.ljust(ms.FORMAT_MAX_NAME_WIDTH + 48 + 48, " ") + diff + "\n"
+        res += val_ref_str + "\n"
+        res += val_dut_str + "\n"
+        res += " ".join(["  " if a == b else "^^" for a, b in zip(val_ref, val_dut)])
+        return res
+
+    def _render(self):
+        width = self.ref.FORMAT_MAX_NAME_WIDTH
+        columns = "REF".ljust(48, " ") + "DUT".ljust(48, " ") + "DIFF\n"
+        output = "REG".ljust(width, " ") + columns
+        entries = self.get_entries()
+        for entry in entries:
+            if entry.section == "reg":
+                output += self._render_reg(entry) + "\n"
+        output += "\n"
+        output += "STATE".ljust(width, " ") + columns
+        for entry in entries:
+            if entry.section == "state":
+                output += self._render_state(entry) + "\n"
+        return output
+
+    # text of a single entry (as in the rendered diff)
+    def render_entry(self, entry):
+        if entry.section == "reg":
+            return self._render_reg(entry)
+        return self._render_state(entry)
+
+
 class StateDump:
     def get_len(self):
         return 0
@@ -846,9 +1471,23 @@ class StateDump:
     def gen_load(self, values):
         pass
 
-    def extract(self, dumpfile):
+    # extract from dump (buffer, e.g. memoryview of mmap'ed dump file)
+    # base .. position of the dump area in buf (None .. buf holds the whole memory)
+    def extract(self, buf, base=None):
         pass
 
+    def _base(self, base):
+        return self.addr - self.memstart if base is None else base
+
+    # split slice of buffer into equally sized bytes values
+    def _extract_bytes(self, buf, offset, size, base=None):
+        pos = self._base(base) + offset
+        end = pos + len(self.reglist) * size
+        return [
+            bytes(buf[i:j])
+            for i, j in zip(range(pos, end, size), range(pos + size, end + size, size))
+        ]
+
 
 class RegStateDump(StateDump):
     def __init__(self, config=None, addr=None, offset=0, reglist=[5, 6, 7]):
@@ -911,14 +1550,10 @@ class RegStateDump(StateDump):
                 )
         return code
 
-    # extract from dump file
-    def extract(self, dumpfile):
-        values = []
-        dumpfile.seek(self.addr - self.memstart + self.offset)
-        for i in self.reglist:
-            val = dumpfile.read(self.xlenb)
-            values.append(int.from_bytes(val, byteorder="little"))
-        return values
+    # extract from dump (all registers in bulk)
+    def extract(self, buf, base=None):
+        fmt = "<" + str(len(self.reglist)) + ("I" if self.xlenb == 4 else "Q")
+        return list(struct.unpack_from(fmt, buf, self._base(base) + self.offset))
 
     def _gen_load_store(self, store=False, reg=0, offset=0, x3gp_in_mscratch=False):
         code = ""
@@ -987,14 +1622,9 @@ class VRegStateDump(StateDump):
     def gen_set(self, values):
         raise Exception("not implemented")
 
-    # extract from dump file
-    def extract(self, dumpfile):
-        values = []
-        dumpfile.seek(self.addr - self.memstart + self.offset)
-        for i in self.reglist:
-            val = dumpfile.read(self.vlenb)
-            values.append(val)
-        return values
+    # extract from dump (all registers in bulk)
+    def extract(self, buf, base=None):
+        return self._extract_bytes(buf, self.offset, self.vlenb, base)
 
     def _gen_load_store(self, store=False, reg="v0"):
         code = "    "
@@ -1029,6 +1659,13 @@ class DumpFile:
         self.addr = addr
         self.len = 0
 
+        # page size for memory digests (see page_digests)
+        self.page_size = config.get("DumpFile_page_size", 4096)
+        self.zero_page = bytes(self.page_size)
+        self.zero_page_digest = hashlib.blake2b(
+            self.zero_page, digest_size=8
+        ).hexdigest()
+
         # for temporary register (save/restore (t0,t1,t2))
         self.tmpregstore = RegStateDump(
             config=config, addr=addr, offset=self.len, reglist=[5, 6, 7]
@@ -1082,6 +1719,25 @@ class DumpFile:
             )
             self.len += self.vregs.get_len()
 
+        # per fragment state trace (see BuildRunner.trace_code)
+        # entries of (index + 1, hash) behind the dump area
+        self.trace = config.get("DumpFile_trace", False)
+        self.trace_xlenb = self.rvisacfg.get_xlen() // 8
+        self.trace_offset = -(-self.len // self.trace_xlenb) * self.trace_xlenb
+        self.trace_entry_len = 2 * self.trace_xlenb
+        # with DumpFile_trace_states, the saved dump area (registers) of every
+        # entry is kept as well (slots behind the entries)
+        self.trace_states = self.trace and config.get("DumpFile_trace_states", False)
+        self.trace_state_len = self.trace_offset if self.trace_states else 0
+        self.trace_capacity = max(
+            0,
+            (self.dumpfile_reserve - self.trace_offset)
+            // (self.trace_entry_len + self.trace_state_len),
+        )
+        self.trace_states_offset = (
+            self.trace_offset + self.trace_capacity * self.trace_entry_len
+        )
+
     def get_len(self):
         return self.len
 
@@ -1095,86 +1751,160 @@ class DumpFile:
         if os.path.exists(self.filename):
             os.remove(self.filename)
 
-    def sha1(self, dumpfile, start=0, len=0):
-        BUF_SIZE = 65536
-
-        # get size
-        dumpfile.seek(0, 2)
-        size = dumpfile.tell()
-
-        # check bounds
-        if len == 0 or len > size:
-            len = size
-
-        # set to start
-        dumpfile.seek(start)
+    # per page digests of memory range [addr, addr + len) in buf
+    # returns {"addr": ..., "page_size": ..., "digests": [...]}
+    def page_digests(self, buf, addr, len):
+        start = addr - self.memstart
+        page_size = self.page_size
+        digests = []
+        for pos in range(start, start + len, page_size):
+            end = min(pos + page_size, start + len)
+            page = bytes(buf[pos:end])
+            if page == self.zero_page:
+                # fast path for untouched memory
+                digests.append(self.zero_page_digest)
+            else:
+                digests.append(hashlib.blake2b(page, digest_size=8).hexdigest())
+        return {"addr": addr, "page_size": page_size, "digests": digests}
 
-        # init
-        sha1 = hashlib.sha1()
+    # digest over all page digests
+    @staticmethod
+    def pages_hash(pages):
+        return hashlib.sha1("".join(pages["digests"]).encode()).hexdigest()
+
+    # everything needed for extraction (see _extract) from the dump in buf:
+    # (dump area (registers) as bytes, page digests of xmem and dmem)
+    # -> the full memory image is not kept
+    def _read_dump(self, buf):
+        pos = self.addr - self.memstart
+        end = pos + self.len
+        area = bytes(buf[pos:end])
+        # exclude dump area from xmemhash (TODO: cleanup the whole dumpfile_reserve handling)
+        xmempages = self.page_digests(
+            buf, self.xmemstart, self.xmemlen - self.dumpfile_reserve
+        )
+        dmempages = self.page_digests(buf, self.dmemstart, self.dmemlen)
+        return (area, xmempages, dmempages)
+
+    # digest over the dump (registers and memory page digests)
+    # equal fingerprints -> equal extracted states
+    def fingerprint(self, area, xmempages, dmempages):
+        h = hashlib.blake2b(digest_size=16)
+        # dump area without temporary register store
+        start = self.tmpregstore.get_len()
+        h.update(area[start:])
+        h.update(self.pages_hash(xmempages).encode())
+        h.update(self.pages_hash(dmempages).encode())
+        return h.hexdigest()
+
+    def _read_dumpfile(self):
+        trace = None
+        states = None
+        with open(self.filename, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as buf:
+                    dump = self._read_dump(buf)
+                    if self.trace:
+                        trace = self.extract_trace(buf)
+                    if self.trace_states:
+                        states = self.extract_trace_states(buf, len(trace))
 
-        # while len:
-        while True:
-            readlen = min(len, BUF_SIZE)
-            data = dumpfile.read(readlen)
-            len -= readlen
-            # safety
-            if not data:
-                break
-            sha1.update(data)
+        if not self.keep_dumpfile:
+            self.delete()
 
-        return sha1.hexdigest()
+        return (dump, trace, states)
 
     def extract(self):
+        dump, trace, states = self._read_dumpfile()
+        return self._extract(*dump)
+
+    # read dump file and compute fingerprint only
+    # returns (fingerprint, extract, trace, states), extract() returns
+    # (regs, state) like extract, trace .. see extract_trace, states .. list of
+    # extract functions of trace entries (see extract_trace_states)
+    # (None, if trace/trace states are disabled)
+    # (independent of the dump file, which may be overwritten by the next run;
+    # only registers and page digests are kept until extract is called)
+    def extract_lazy(self):
+        dump, trace, states = self._read_dumpfile()
+
+        def extract():
+            return self._extract(*dump)
+
+        def extract_state(area):
+            return lambda: self._extract(area, *dump[1:])
+
+        if states is not None:
+            states = [extract_state(area) for area in states]
+
+        return (self.fingerprint(*dump), extract, trace, states)
+
+    # hashes of trace entries in order (until first invalid entry)
+    def extract_trace(self, buf):
+        fmt = "<2" + ("I" if self.trace_xlenb == 4 else "Q")
+        pos = self.addr - self.memstart + self.trace_offset
+        trace = []
+        for i in range(self.trace_capacity):
+            marker, h = struct.unpack_from(fmt, buf, pos)
+            if marker != i + 1:
+                break
+            trace.append(h)
+            pos += self.trace_entry_len
+        return trace
+
+    # saved dump areas (registers) of the first count trace entries
+    # (memory is not traced -> page digests of trace states are the ones at
+    # the end of the run)
+    def extract_trace_states(self, buf, count):
+        pos = self.addr - self.memstart + self.trace_states_offset
+        states = []
+        for i in range(count):
+            end = pos + self.len
+            states.append(bytes(buf[pos:end]))
+            pos += self.trace_state_len
+        return states
+
+    # registers and state from _read_dump
+    # returns (regs, state)
+    def _extract(self, area, xmempages, dmempages):
         regs = {}
         ret = {}
-        with open(self.filename, "rb") as file:
-            # exclude dump area from xmemhash (TODO: cleanup the whole dumpfile_reserve handling)
-            ret["xmemhash"] = self.sha1(
-                file,
-                self.xmemstart - self.memstart,
-                self.xmemlen - self.dumpfile_reserve,
-            )
-            ret["dmemhash"] = self.sha1(
-                file, self.dmemstart - self.memstart, self.dmemlen
-            )
-            val = self.estate.extract(file)
-            ret["lastPC"] = val[0]
-            ret["#exceptions"] = val[1]
-            ret["mstatus.fs/vs"] = val[2]
-
-            val = self.istate.extract(file)
-            for idx, regname in enumerate(RVREGS_IDX_DICT):
-                regs[regname] = val[idx]
-
-            if self.rvisacfg.is_float_needed():
-                val = self.fstate.extract(file)
-                ret["fcsr"] = val[0]
-
-                val = self.fregs.extract(file)
-                i = 0
-                for freg in val:
-                    ret["f" + str(i)] = freg
-                    i += 1
-
-            if self.rvisacfg.is_needed("v"):
-                val = self.vstate.extract(file)
-                ret["vtype"] = val[0]
-                ret["vl"] = val[1]
-                ret["vlenb"] = val[2]
-                ret["vstart"] = val[3]
-                ret["vxrm"] = val[4]
-                ret["vxsat"] = val[5]
-                ret["vcsr"] = val[6]
-
-                val = self.vregs.extract(file)
-                i = 0
-                for vreg in val:
-                    ret["v" + str(i)] = vreg
-                    i += 1
-
-        if not self.keep_dumpfile:
-            self.delete()
-
+        ret["xmemhash"] = self.pages_hash(xmempages)
+        ret["dmemhash"] = self.pages_hash(dmempages)
+        val = self.estate.extract(area, base=0)
+        ret["lastPC"] = val[0]
+        ret["#exceptions"] = val[1]
+        ret["mstatus.fs/vs"] = val[2]
+
+        val = self.istate.extract(area, base=0)
+        for idx, regname in enumerate(RVREGS_IDX_DICT):
+            regs[regname] = val[idx]
+
+        if self.rvisacfg.is_float_needed():
+            val = self.fstate.extract(area, base=0)
+            ret["fcsr"] = val[0]
+
+            val = self.fregs.extract(area, base=0)
+            for i, freg in enumerate(val):
+                ret["f" + str(i)] = freg
+
+        if self.rvisacfg.is_needed("v"):
+            val = self.vstate.extract(area, base=0)
+            ret["vtype"] = val[0]
+            ret["vl"] = val[1]
+            ret["vlenb"] = val[2]
+            ret["vstart"] = val[3]
+            ret["vxrm"] = val[4]
+            ret["vxsat"] = val[5]
+            ret["vcsr"] = val[6]
+
+            val = self.vregs.extract(area, base=0)
+            for i, vreg in enumerate(val):
+                ret["v" + str(i)] = vreg
+
+        # memory page digests (shows which pages differ on compare)
+        ret["xmempages"] = xmempages
+        ret["dmempages"] = dmempages
         return (regs, ret)
 
 
@@ -1224,14 +1954,9 @@ class FDQRegStateDump(StateDump):
     def gen_set(self, values):
         raise Exception("not implemented")
 
-    # extract from dump file
-    def extract(self, dumpfile):
-        values = []
-        dumpfile.seek(self.addr - self.memstart + self.offset)
-        for i in self.reglist:
-            val = dumpfile.read(self.flenb)
-            values.append(val)
-        return values
+    # extract from dump (all registers in bulk)
+    def extract(self, buf, base=None):
+        return self._extract_bytes(buf, self.offset, self.flenb, base)
 
     def _gen_load_store(self, store=False, regnr=0):
         regoffset = self.offset + regnr * self.flenb
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import os
+import time
+import queue
+import shutil
+import tempfile
+import threading
+import jsonpickle
+from .BasicRunner import Runner, RunnerOutcome, RunnerFile, lazy_runner
+from .CodeErrMinRunner import CodeErrMinRunner
+from .FailureBuckets import FailureBuckets
+
+
+# Decoupled minimization of failing tests (see FuzzCodeErrMinRunner)
+# Fuzz workers submit failing tests (code blocks) with submit() and continue
+# generating tests. Minimization workers (threads, MinimizeService_workers)
+# reduce and minimize them with own CodeErrMinRunners and archive the results
+# like ArchiveRunner (<dir>/ERROR-<category>-<instr>-case_<n>). Outcomes and
+# AFC categories are summed up in stats.log.
+# Cases are passed
+#  * in-process (no spool dir): queued (at most MinimizeService_max_queue,
+#    further cases are dropped) -> share the instance between fuzz runners
+#    by passing it in the config ("MinimizeService")
+#  * across processes (MinimizeService_spool_dir): spooled as files
+#    (<spool>/pending/*.json, claimed by atomic rename) -> fuzz processes use
+#    services without workers, minimize processes run serve()
+# -> ratio of fuzz to minimize workers = fuzz runners (processes) : workers
+# Failure buckets (CodeErrMinRunner_bucket_exemplars) are shared by all
+# workers of a service.
+class MinimizeService(Runner):
+    def setup(self, config):
+
+        super().setup(config)
+
+        self.workers = config.get("MinimizeService_workers", 1)
+        self.max_queue = config.get("MinimizeService_max_queue", 100)
+        self.spool_dir = config.get("MinimizeService_spool_dir", None)
+        self.poll_interval = config.get("MinimizeService_poll_interval", 1.0)
+        if self.workers <= 0 and self.spool_dir is None:
+            raise Exception("MinimizeService: no workers and no spool dir")
+
+        if self.spool_dir is not None:
+            os.makedirs(os.path.join(self.spool_dir, "pending"), exist_ok=True)
+            os.makedirs(os.path.join(self.spool_dir, "claimed"), exist_ok=True)
+
+        self.subconfig = config.copy()
+        self.subconfig["dir"] = self.get_dir()
+        # workers minimize inline
+        self.subconfig["MinimizeService"] = None
+        self.subconfig["CodeErrMinRunner_minimize"] = True
+        # artifacts are written per case (see minimize)
+        self.subconfig["persist_deferred"] = True
+        bucket_exemplars = config.get("CodeErrMinRunner_bucket_exemplars", 0)
+        if config.get("FailureBuckets", None) is None and bucket_exemplars > 0:
+            self.subconfig["FailureBuckets"] = FailureBuckets(
+                exemplars=bucket_exemplars,
+                sample_every=config.get("CodeErrMinRunner_bucket_sample_every", 0),
+            )
+
+        if self.log:
+            self.statfile = RunnerFile(dir=self.get_dir(), name="stats.log")
+
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.submitted = 0
+        self.dropped = 0
+        self.cases = 0
+        self.outcomes = {}
+        self.AFC_category_errors = {}
+        self.instr_errors = {}
+
+    # service is not serialized (e.g. config of MachineState in json files)
+    # -> restored instances are inert
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+
+    # one runner per worker (not shared between threads)
+    @lazy_runner
+    def codeerrminrunners(self):
+        return [CodeErrMinRunner(self.subconfig) for i in range(self.workers)]
+
+    # queue failing test (code_block) for minimization
+    # returns False, if the queue is full (test dropped)
+    def submit(self, code_block, **kwargs):
+        if self.spool_dir is not None:
+            return self.__spool(code_block, kwargs)
+        with self.lock:
+            if self.queue.qsize() >= self.max_queue:
+                self.dropped += 1
+                return False
+            self.submitted += 1
+        self.start()
+        self.queue.put((code_block, kwargs))
+        return True
+
+    def __spool(self, code_block, kwargs):
+        pending = os.path.join(self.spool_dir, "pending")
+        with self.lock:
+            self.submitted += 1
+            name = f"{time.time_ns():020d}-{os.getpid()}-{self.submitted}.json"
+        fd, tmpname = tempfile.mkstemp(dir=pending, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(jsonpickle.encode({"code_block": code_block, "kwargs": kwargs}))
+            # rename -> case is complete if visible
+            os.replace(tmpname, os.path.join(pending, name))
+        except OSError as e:
+            print(f"MinimizeService: WARNING: unable to spool case: {e}")
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            with self.lock:
+                self.dropped += 1
+            return False
+        return True
+
+    # claim oldest spooled case
+    # returns (filename, code_block, kwargs) or None
+    def __claim(self):
+        pending = os.path.join(self.spool_dir, "pending")
+        for name in sorted(os.listdir(pending)):
+            if not name.endswith(".json"):
+                continue
+            claimed = os.path.join(self.spool_dir, "claimed", name)
+            try:
+                os.rename(os.path.join(pending, name), claimed)
+            except FileNotFoundError:
+                # claimed by another worker
+                continue
+            try:
+                with open(claimed, "r") as f:
+                    case = jsonpickle.decode(f.read())
+            except Exception as e:
+                print(f"MinimizeService: WARNING: invalid case {claimed}: {e}")
+                os.remove(claimed)
+                continue
+            return (claimed, case["code_block"], case["kwargs"])
+        return None
+
+    # start workers (once)
+    def start(self):
+        with self.lock:
+            if len(self.threads) > 0 or self.workers <= 0:
+                return
+            self.stop_event.clear()
+            for runner in self.codeerrminrunners:
+                thread = threading.Thread(
+                    target=self.__threadf, args=(runner,), daemon=True
+                )
+                self.threads.append(thread)
+                thread.start()
+
+    def __threadf(self, runner):
+        while not self.stop_event.is_set():
+            claimed = None
+            if self.spool_dir is None:
+                item = self.queue.get()
+                if item is None:
+                    self.queue.task_done()
+                    break
+                code_block, kwargs = item
+            else:
+                item = self.__claim()
+                if item is None:
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+                claimed, code_block, kwargs = item
+            try:
+                self.minimize(runner, code_block, **kwargs)
+            except Exception as e:
+                print(f"MinimizeService: WARNING: minimization failed: {e}")
+            if claimed is not None:
+                os.remove(claimed)
+            else:
+                self.queue.task_done()
+
+    # minimize and archive case with runner (CodeErrMinRunner)
+    def minimize(self, runner, code_block, **kwargs):
+        ret = runner.run(blocking=True, code_block=code_block, **kwargs)
+
+        archivedir = None
+        with self.lock:
+            idx = self.cases
+            self.cases += 1
+            self.outcomes[ret[0].name] = self.outcomes.get(ret[0].name, 0) + 1
+            if ret[0] == RunnerOutcome.ERROR:
+                archivedir = (
+                    self.get_dir()
+                    + "/ERROR-"
+                    + runner.get_error_cause()
+                    + "-case_"
+                    + f"{idx:010d}"
+                )
+                category = runner.error_cause_category
+                instr = runner.error_cause_instr
+                self.AFC_category_errors[category] = (
+                    self.AFC_category_errors.get(category, 0) + 1
+                )
+                self.instr_errors[instr] = self.instr_errors.get(instr, 0) + 1
+
+        # write deferred artifacts of the case (see Runner.persist_artifact)
+        runner.persist_flush(
+            failure=ret[0] != RunnerOutcome.COMPLETE, archive=archivedir is not None
+        )
+        if archivedir is not None:
+            shutil.copytree(runner.get_dir(), archivedir)
+
+        if self.log:
+            stats = self.get_stats()
+            self.statfile.set_content(
+                "".join(key + ": " + str(value) + "\n" for key, value in stats.items())
+            )
+        return ret
+
+    # wait until all queued cases are minimized (in-process only)
+    def wait_idle(self):
+        self.queue.join()
+
+    # run workers on spooled cases until interrupted (minimize processes)
+    def serve(self):
+        self.start()
+        try:
+            while not self.stop_event.wait(self.poll_interval):
+                pass
+        except KeyboardInterrupt:
+            pass
+        self.close()
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "pending": self.queue.qsize(),
+                "cases": self.cases,
+                "outcomes": dict(self.outcomes),
+                "AFC_category_errors": dict(self.AFC_category_errors),
+                "instr_errors": dict(self.instr_errors),
+            }
+
+    # artifacts of cases are written by the workers (see minimize)
+    # -> not flushed with the runner tree of the submitter (e.g. ArchiveRunner)
+    def _persist_flush(self, failure, archive, seen):
+        seen.add(id(self))
+
+    def _close(self, seen):
+        # stop workers before child runners are closed
+        # (queued cases are discarded, claimed spooled cases are finished)
+        if len(self.threads) > 0:
+            self.stop_event.set()
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                self.queue.task_done()
+            for thread in self.threads:
+                self.queue.put(None)
+            for thread in self.threads:
+                thread.join()
+            self.threads = []
+        super()._close(seen)
@@ -10,6 +10,10 @@ from .BasicRunner import ProcessTimeoutRunner
 
 
 class QEMURunner(ProcessTimeoutRunner):
+
+    # supported debug link transports (see DuTGDBRunner)
+    DEBUG_LINK_TRANSPORTS = ["tcp", "unix"]
+
     def setup(self, config=None):
 
         super().setup(config=config)
@@ -43,11 +47,30 @@ class QEMURunner(ProcessTimeoutRunner):
                 "none",
                 "-serial",
                 "mon:stdio",
-                "-gdb",
-                "tcp::" + str(config["debug_port"]),
                 "-S",
             ]
         )
 
-    def run_handler(self, binary="", **kwargs):
-        return super().run_handler(parameters=["-bios", binary], **kwargs)
+        # fixed debug port (legacy) -> used if no debug_link is given on run
+        self.debug_port = config.get("debug_port", None)
+
+    def debug_parameters(self, debug_link):
+        if debug_link is None:
+            return ["-gdb", "tcp::" + str(self.debug_port)]
+        if debug_link.transport == "unix":
+            return [
+                "-chardev",
+                "socket,id=rvvts_gdb,path=" + debug_link.path + ",server=on,wait=off",
+                "-gdb",
+                "chardev:rvvts_gdb",
+            ]
+        return ["-gdb", "tcp::" + str(debug_link.port)]
+
+    # extra_parameters .. additional qemu parameters (e.g. drives, -loadvm)
+    def run_handler(self, binary="", debug_link=None, extra_parameters=[], **kwargs):
+        return super().run_handler(
+            parameters=self.debug_parameters(debug_link)
+            + extra_parameters
+            + ["-bios", binary],
+            **kwargs,
+        )
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import os
+import subprocess
+from .BasicRunner import RunnerOutcome, RunnerFile
+from .CodeBlock import CodeBlock, CodeFragment, CodeFragmentList
+from .CodeCompareRunner import CodeCompareRunner
+from .DuTGDBRunner import DuTGDBRunner
+from .QEMURunner import QEMURunner
+
+
+# CodeCompareRunner for prefix reduction with QEMU as DuT
+# Instead of executing every candidate prefix from reset on the DuT, the
+# complete test is executed once (record) and QEMU VM snapshots are taken at
+# fragment boundaries. A candidate prefix of k fragments is then evaluated by
+# restoring the nearest snapshot <= k and executing only the remaining
+# fragments up to k.
+#
+# To keep memory layout (and therefore snapshots) valid for all candidates,
+# all programs are built from an instrumented code block:
+#  * every main fragment is preceded by a 4 byte boundary instruction
+#    (label _rvvts_boundary_<k>; nop in the recorded program)
+#  * the deinit fragments are preceded by label _rvvts_stop
+# The candidate for prefix k replaces boundary instruction k with a jump to
+# _rvvts_stop. On restore, the candidate binary is loaded into the DuT memory
+# via gdb (only the boundary instruction differs).
+#
+# NOTE: the reference simulators can not restore snapshots -> the reference
+# is executed on the (layout identical) candidate binary for every candidate
+# NOTE: requires a QEMU build with snapshot (savevm/loadvm) support and
+# qemu-img in qemu_path
+class QEMUSnapshotCompareRunner(CodeCompareRunner):
+
+    SNAPSHOT_PREFIX = "rvvts_"
+
+    @staticmethod
+    def is_supported(config):
+        dut = config.get("CompareRunner_dut", None)
+        gdb_dut = config.get("DuTGDBRunner_dut", None)
+        return (
+            isinstance(dut, type)
+            and issubclass(dut, DuTGDBRunner)
+            and isinstance(gdb_dut, type)
+            and issubclass(gdb_dut, QEMURunner)
+        )
+
+    def setup(self, config):
+
+        super().setup(config)
+
+        # maximum number of snapshots per recording (defines distance between snapshots)
+        self.max_snapshots = config.get("QEMUSnapshotCompareRunner_max_snapshots", 32)
+        # timeout for recording (executes complete test and takes snapshots)
+        self.record_timeout = config.get(
+            "QEMUSnapshotCompareRunner_record_timeout", 30.0
+        )
+
+        self.qemu_img = config["qemu_path"] + "/qemu-img"
+        self.image = os.path.join(self.get_dir(), "snapshots.qcow2")
+        self.drive_parameters = [
+            "-drive",
+            "if=none,id=rvvts_snapshots,format=qcow2,file=" + self.image,
+        ]
+
+        # separate build runner for recording binary
+        subconfig = config.copy()
+        subconfig["dir"] = self.get_dir()
+        self.record_binary_file = RunnerFile(dir=self.get_dir(), name="record.bin")
+        subconfig["binary"] = self.record_binary_file.get_name()
+        self.record_build_runner = type(self.build_runner)(config=subconfig)
+
+        self.breakpoint = self.build_runner.get_breakpoint()
+        self.xmemstart = config["xmemstart"]
+
+        self.reset_record()
+
+    def reset_record(self):
+        self.code_block = None
+        self.snapshots = []
+        self.prefix_len = None
+
+    def gen_code_block(self, code_block, prefix_len=None):
+        boundary_code = (
+            ".option push\n.option norvc\n_rvvts_boundary_{}:\n    {}\n.option pop"
+        )
+        main_fragments = CodeFragmentList()
+        for k, fragment in enumerate(code_block.main_fragments.as_list()):
+            ins = "j _rvvts_stop" if k == prefix_len else "nop"
+            main_fragments.add(CodeFragment(boundary_code.format(k, ins)))
+            main_fragments.add(fragment)
+        main_fragments.add(CodeFragment("_rvvts_stop:"))
+        return CodeBlock(
+            init_fragments=code_block.init_fragments,
+            main_fragments=main_fragments,
+            deinit_fragments=code_block.deinit_fragments,
+        )
+
+    def snapshot_name(self, idx):
+        return self.SNAPSHOT_PREFIX + str(idx)
+
+    def qemu_img_run(self, parameters):
+        try:
+            result = subprocess.run(
+                [self.qemu_img] + parameters,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                timeout=self.record_timeout,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"QEMUSnapshotCompareRunner: WARNING: qemu-img failed: {e}")
+            return None
+        if result.returncode != 0:
+            print(
+                "QEMUSnapshotCompareRunner: WARNING: qemu-img failed: " + result.stdout
+            )
+            return None
+        return result.stdout
+
+    def list_snapshots(self):
+        out = self.qemu_img_run(["snapshot", "-l", self.image])
+        if out is None:
+            return []
+        snapshots = []
+        for line in out.splitlines():
+            for tok in line.split():
+                if tok.startswith(self.SNAPSHOT_PREFIX):
+                    idx = tok.split("_", 1)[1]
+                    if idx.isdigit():
+                        snapshots.append(int(idx))
+        return sorted(set(snapshots))
+
+    # execute code_block once on the DuT and take snapshots at fragment boundaries
+    # returns True, if at least one snapshot was taken
+    def record(self, code_block, timeout=1.0):
+        self.reset_record()
+
+        main_len = code_block.main_len()
+        if main_len == 0:
+            return False
+
+        self.record_build_runner.run(
+            code=self.gen_code_block(code_block).as_code(),
+            blocking=True,
+            timeout=timeout,
+        )
+        if self.record_build_runner.get_result()[0] != RunnerOutcome.COMPLETE:
+            return False
+
+        # (re)create snapshot image
+        if os.path.exists(self.image):
+            os.remove(self.image)
+        if self.qemu_img_run(["create", "-f", "qcow2", self.image, "16M"]) is None:
+            return False
+
+        # gdb commands: stop at boundaries and take snapshots
+        # (end breakpoint first -> no endless loop if a boundary is not reached)
+        interval = max(1, -(-main_len // self.max_snapshots))
+        cmds = "set $pc = " + hex(self.xmemstart) + "\n"
+        cmds += "break *" + hex(self.breakpoint) + "\n"
+        for idx in range(0, main_len, interval):
+            label = "_rvvts_boundary_" + str(idx)
+            cmds += "tbreak *" + label + "\n"
+            cmds += "cont\n"
+            cmds += "if $pc == &" + label + "\n"
+            cmds += "monitor savevm " + self.snapshot_name(idx) + "\n"
+            cmds += "end\n"
+
+        dut = self.compare_runner.CompareRunner_dut
+        dut.run(
+            binary=self.record_binary_file.get_name(),
+            blocking=True,
+            timeout=self.record_timeout,
+            dut_kwargs={"extra_parameters": self.drive_parameters},
+            gdb_kwargs={
+                "symbol_file": self.record_binary_file.get_name(),
+                "entry_commands": cmds,
+            },
+        )
+
+        self.snapshots = self.list_snapshots()
+        if len(self.snapshots) == 0:
+            return False
+        self.code_block = code_block
+        return True
+
+    def task(self):
+        if self.prefix_len is None:
+            # no prefix given -> normal execution
+            return super().task()
+
+        if self.code_block is None:
+            raise Exception("QEMUSnapshotCompareRunner: no recording")
+
+        # nearest snapshot <= prefix_len
+        snapshot = None
+        for idx in self.snapshots:
+            if idx <= self.prefix_len:
+                snapshot = idx
+        if snapshot is None:
+            # prefix ends before first snapshot -> execute from reset
+            self.code = self.code_block.get_part(0, self.prefix_len).as_code()
+            return super().task()
+
+        code = self.gen_code_block(self.code_block, prefix_len=self.prefix_len)
+        self.build_runner.run(code=code.as_code(), blocking=True, timeout=self.timeout)
+        res = self.build_runner.get_result()
+        if res[0] != RunnerOutcome.COMPLETE:
+            if self.build_ignore_error:
+                return (RunnerOutcome.IGNORE, res[1])
+            return res
+
+        # restore snapshot, load candidate (keep pc of snapshot) and continue
+        cmds = "set $rvvts_pc = $pc\n"
+        cmds += "load\n"
+        cmds += "set $pc = $rvvts_pc\n"
+
+        self.compare_runner.run(
+            binary=self.binary_file.get_name(),
+            blocking=True,
+            timeout=self.timeout,
+            dut_kwargs={
+                "dut_kwargs": {
+                    "extra_parameters": self.drive_parameters
+                    + ["-loadvm", self.snapshot_name(snapshot)]
+                },
+                "gdb_kwargs": {
+                    "symbol_file": self.binary_file.get_name(),
+                    "entry_commands": cmds,
+                },
+            },
+        )
+        return self.compare_runner.get_result()
+
+    # prefix_len .. number of main fragments of recorded code block to execute
+    # (None .. execute code like CodeCompareRunner)
+    def run_handler(self, prefix_len=None, **kwargs):
+        self.prefix_len = prefix_len
+        return super().run_handler(**kwargs)
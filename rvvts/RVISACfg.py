@@ -36,6 +36,7 @@ class RVISACfg:
                     ("zifencei", False),
                 ]
             )
+            self.isa_str_cache = {}
             self.update_float()
 
         def update_float(self):
@@ -90,6 +91,7 @@ class RVISACfg:
                 if ext not in self.ext.keys():
                     raise Exception(f"RVExtension: unsupported extension to set {ext}")
                 self.ext[ext] = True
+            self.isa_str_cache = {}
             self.update_float()
 
         def is_set_any(self, exts):
@@ -130,12 +132,21 @@ class RVISACfg:
                         )
             return "".join(map(str, isa_str))
 
-        def to_isa_str(self):
+        # cached (invalidated on set)
+        # NOTE: setdefault -> objects restored by jsonpickle don't have the cache yet
+        def _isa_str_cached(self, name, gen_f):
+            cache = self.__dict__.setdefault("isa_str_cache", {})
+            isa_str = cache.get(name, None)
+            if isa_str is None:
+                isa_str = gen_f()
+                cache[name] = isa_str
+            return isa_str
+
+        def _gen_isa_str(self):
             enabled_ext = [ext for ext, val in self.ext.items() if val]
             return f"rv{self.xlen}i" + self.to_isa_str_raw(enabled_ext)
 
-        # used for spike
-        def to_isa_str_alt(self):
+        def _gen_isa_str_alt(self):
             enabled_ext = [ext for ext, val in self.ext.items() if val]
             if self.is_set("v"):
                 enabled_ext.remove("v")
@@ -143,6 +154,13 @@ class RVISACfg:
                 enabled_ext.append(f"zve{self.velen}d")
             return f"rv{self.xlen}i" + self.to_isa_str_raw(enabled_ext)
 
+        def to_isa_str(self):
+            return self._isa_str_cached("isa_str", self._gen_isa_str)
+
+        # used for spike
+        def to_isa_str_alt(self):
+            return self._isa_str_cached("isa_str_alt", self._gen_isa_str_alt)
+
         def __repr__(self):
             return (
                 f"(extensions = {self.to_isa_str()}, flen = {self.flen}, fload_max = {self.fload_max}"
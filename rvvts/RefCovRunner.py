@@ -9,6 +9,7 @@
 from .BasicRunner import Runner, RunnerOutcome
 from .RISCVOVPSIMRunner import RISCVOVPSIMRunner
 from .SpikeRunner import SpikeRunner
+from .RefStateStore import RefStateStore
 
 import os
 import re
@@ -150,6 +151,16 @@ class RefCovRunner(Runner):
             self.RefCovRunner_cov = config["RefCovRunner_coverage"](config=subconfig)
         else:
             self.RefCovRunner_cov = None
+
+        # persistent store of reference results (None .. disabled)
+        self.subconfig = subconfig
+        self.store = None
+        store_dir = config.get("RefCovRunner_store_dir", None)
+        if store_dir:
+            self.store = RefStateStore(
+                store_dir, RefStateStore.get_identity(config, self.RefCovRunner_ref)
+            )
+
         self.binary = ""
         self.timeout = 1.0
 
@@ -163,31 +174,62 @@ class RefCovRunner(Runner):
         # and coverage sum. With this we will be able to parallelize coverage and reference
         # runs again.
 
-        # run reference
-        self.RefCovRunner_ref.run(
-            binary=self.binary, blocking=False, timeout=self.timeout
-        )
-        self.RefCovRunner_ref.wait()
-        res_ref = self.RefCovRunner_ref.get_result()
+        # run reference (or get result from store)
+        store_key = None
+        stored = None
+        if self.store is not None:
+            store_key = self.store.get_key(self.binary)
+            stored = self.store.get(store_key, self.subconfig)
+        if stored is not None:
+            res_ref = (RunnerOutcome.COMPLETE, stored[0])
+        else:
+            self.RefCovRunner_ref.run(
+                binary=self.binary, blocking=False, timeout=self.timeout
+            )
+            self.RefCovRunner_ref.wait()
+            res_ref = self.RefCovRunner_ref.get_result()
+
+        # add new reference result to store
+        def store_result(coverage):
+            if store_key is not None and stored is None:
+                self.store.put(store_key, res_ref[1], coverage)
 
         # check acceptance of test-case
         if self.ignore_invalid_sequences and res_ref[0] == RunnerOutcome.COMPLETE:
             if res_ref[1].state[1]["#exceptions"] > 0:
                 # detected exception -> ignore case (do not run/add coverage)
+                store_result(None)
                 return (RunnerOutcome.IGNORE, {"ref:": res_ref[1], "cov:": None})
 
         # run coverage runner
-        if self.RefCovRunner_cov:
+        # (stored coverage is used, if no coverage sum is accumulated)
+        use_stored_cov = (
+            self.RefCovRunner_cov is not None
+            and stored is not None
+            and stored[1] is not None
+            and not getattr(self.RefCovRunner_cov, "coversum_en", False)
+        )
+        if use_stored_cov:
+            res_cov = (RunnerOutcome.COMPLETE, stored[1])
+        elif self.RefCovRunner_cov:
             self.RefCovRunner_cov.run(
                 binary=self.binary, blocking=False, timeout=self.timeout
             )
-        if self.RefCovRunner_cov:
             self.RefCovRunner_cov.wait()
-        if self.RefCovRunner_cov:
             res_cov = self.RefCovRunner_cov.get_result()
         else:
             res_cov = (RunnerOutcome.COMPLETE, None)
 
+        if (
+            res_ref[0] == RunnerOutcome.COMPLETE
+            and res_cov[0] == RunnerOutcome.COMPLETE
+        ):
+            coverage = res_cov[1]
+            if coverage is not None:
+                # sum depends on previous runs -> not stored
+                coverage = {"current": coverage.get("current", None)}
+            store_result(coverage)
+
         res_output = {
             "ref:": res_ref[1],
             "cov:": res_cov[1],
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import os
+import json
+import hashlib
+import tempfile
+from .MachineState import MachineState
+from .SetupCache import SetupCache
+
+
+# Persistent, content addressed store of reference results (see RefCovRunner)
+# The end state of the reference (and its coverage) depends only on the
+# binary, the reference simulator and the configuration. Results are stored
+# in dir (shared between sessions and processes) with the key
+#  * hash of the binary
+#  * identity of the reference: runner class and simulator binary (path,
+#    size, mtime -> a new simulator build invalidates the entries)
+#  * isa and memory configuration
+# -> e.g. regression runs of test sets against new DuT versions execute
+# the reference only once.
+# Layout: <dir>/<key[:2]>/<key>.bin (MachineState, binary format) and
+# <key>.json (coverage), written atomically (temporary file + rename)
+class RefStateStore:
+
+    # configuration values the reference result depends on (besides rvisacfg)
+    CONFIG_KEYS = [
+        "memstart",
+        "memlen",
+        "xmemstart",
+        "xmemlen",
+        "dmemstart",
+        "dmemlen",
+        "dumpfile_reserve",
+        "breakpoint",
+        "quirk_ara_csrs",
+        "DumpFile_page_size",
+    ]
+
+    def __init__(self, dir, identity):
+        self.dir = dir
+        self.identity = identity
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    # identity of reference runner and configuration
+    @classmethod
+    def get_identity(cls, config, ref_runner):
+        program = getattr(ref_runner, "program", None)
+        return [
+            type(ref_runner).__name__,
+            SetupCache.file_key(program[0]) if program else None,
+            repr(config["rvisacfg"]),
+            [config.get(key, None) for key in cls.CONFIG_KEYS],
+        ]
+
+    def get_key(self, binary):
+        h = hashlib.blake2b(digest_size=16)
+        with open(binary, "rb") as f:
+            h.update(f.read())
+        keystr = json.dumps([self.identity, h.hexdigest()], default=repr)
+        return hashlib.sha1(keystr.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.dir, key[:2], key)
+
+    # returns (mstate, coverage) or None
+    def get(self, key, config):
+        path = self._path(key)
+        try:
+            with open(path + ".json", "r") as f:
+                coverage = json.load(f)["coverage"]
+            mstate = MachineState.load_bin(path + ".bin", config=config)
+        except FileNotFoundError:
+            mstate = None
+        except Exception as e:
+            print(f"RefStateStore: WARNING: unable to load {path}: {e}")
+            mstate = None
+
+        if mstate is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return (mstate, coverage)
+
+    def _write(self, dir, filename, write_f):
+        fd, tmpname = tempfile.mkstemp(dir=dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            write_f(tmpname)
+            os.replace(tmpname, filename)
+        except Exception:
+            os.remove(tmpname)
+            raise
+
+    def put(self, key, mstate, coverage=None):
+        path = self._path(key)
+        dir = os.path.dirname(path)
+
+        def write_coverage(filename):
+            with open(filename, "w") as f:
+                json.dump({"coverage": coverage}, f)
+
+        try:
+            os.makedirs(dir, exist_ok=True)
+            # machine state last -> entry is complete if it exists
+            self._write(dir, path + ".json", write_coverage)
+            self._write(dir, path + ".bin", mstate.save_bin)
+        except (OSError, TypeError) as e:
+            print(f"RefStateStore: WARNING: unable to store {path}: {e}")
+            return
+        self.stores += 1
+
+    def get_stats(self):
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores}
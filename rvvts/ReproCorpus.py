@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import os
+import re
+import glob
+import json
+import shutil
+import hashlib
+import tempfile
+from .Artifact import ARTIFACT_FORMATS, load_artifact
+
+# Indexed store of minimized repros (see ReproCorpusRunner)
+# Repros are collected from archived failing tests (e.g. ArchiveRunner
+# ERROR-<category>-<instr>-iteration_<n>, MinimizeService ERROR-...-case_<n>)
+# Layout:
+#  <dir>/index.json .. id -> entry (category, instr, bucket, source)
+#  <dir>/<id>/ .. artifacts of repro (code, begin and end states; any format)
+# id .. hash of the repro code -> repros are stored only once
+# bucket .. error cause (<category>-<instr>, see CodeErrMinRunner.get_error_cause)
+
+# artifacts copied per repro (without extension; first one is mandatory)
+REPRO_ARTIFACTS = [
+    "99_res_code_block",
+    "02_min_beg_mstate",
+    "99_res_end_ref_mstate",
+    "99_res_end_dut_mstate",
+]
+
+ARCHIVE_NAME = re.compile(r"^ERROR-(.+?)-(.+)-(?:iteration|case)_\d+$")
+
+
+class ReproCorpus:
+    def __init__(self, dir):
+        self.dir = dir
+        self.index_filename = os.path.join(dir, "index.json")
+        self.index = {}
+        try:
+            with open(self.index_filename, "r") as f:
+                self.index = json.load(f)
+        except FileNotFoundError:
+            pass
+
+    def _save_index(self):
+        os.makedirs(self.dir, exist_ok=True)
+        # write to temporary file and rename -> index is always complete
+        fd, tmpname = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmpname, self.index_filename)
+
+    @staticmethod
+    def _find_artifact(dir, name):
+        for ext in ARTIFACT_FORMATS.values():
+            if os.path.exists(os.path.join(dir, name + ext)):
+                return os.path.join(dir, name + ext)
+        return None
+
+    # category and instruction of archived test (AFC report, archive name)
+    @staticmethod
+    def _error_cause(artifact_dir, archive_name):
+        category = None
+        instr = "unknown"
+        m = ARCHIVE_NAME.match(archive_name)
+        if m:
+            category, instr = m.group(1), m.group(2)
+        try:
+            with open(os.path.join(artifact_dir, "AFC_report.log"), "r") as f:
+                for line in f:
+                    if line.startswith("CATEGORY: "):
+                        category = line.split(":", 1)[1].strip()
+        except FileNotFoundError:
+            pass
+        return (category if category is not None else "UNKNOWN", instr)
+
+    # add repro of artifact dir (e.g. .../ERROR-.../CodeErrMinRunner_0)
+    # returns id or None (no repro)
+    def add(self, artifact_dir, archive_name=None):
+        code_file = self._find_artifact(artifact_dir, REPRO_ARTIFACTS[0])
+        if code_file is None:
+            return None
+        if archive_name is None:
+            archive_name = os.path.basename(os.path.dirname(artifact_dir))
+        code = load_artifact(code_file).as_code()
+        id = hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+        if id in self.index:
+            return id
+
+        repro_dir = os.path.join(self.dir, id)
+        os.makedirs(repro_dir, exist_ok=True)
+        for name in REPRO_ARTIFACTS:
+            filename = self._find_artifact(artifact_dir, name)
+            if filename is not None:
+                shutil.copy2(filename, repro_dir)
+        category, instr = self._error_cause(artifact_dir, archive_name)
+        self.index[id] = {
+            "category": category,
+            "instr": instr,
+            "bucket": category + "-" + instr,
+            "source": os.path.abspath(artifact_dir),
+        }
+        self._save_index()
+        return id
+
+    # collect repros of all archived failing tests (ERROR-*) in dirs (recursive)
+    # returns list of ids of new repros
+    def collect(self, dirs):
+        added = []
+        for top in dirs:
+            for code_file in sorted(
+                glob.glob(
+                    os.path.join(top, "**", REPRO_ARTIFACTS[0] + ".*"), recursive=True
+                )
+            ):
+                artifact_dir = os.path.dirname(code_file)
+                archive_dir = os.path.dirname(artifact_dir)
+                if not os.path.basename(archive_dir).startswith("ERROR-"):
+                    # e.g. working dirs of runners
+                    continue
+                known = len(self.index)
+                id = self.add(artifact_dir, os.path.basename(archive_dir))
+                if id is not None and len(self.index) > known:
+                    added.append(id)
+        return added
+
+    def get_entries(self):
+        return self.index
+
+    def get_repro_dir(self, id):
+        return os.path.join(self.dir, id)
+
+    # repro code block of entry
+    def load_code_block(self, id):
+        return load_artifact(
+            self._find_artifact(self.get_repro_dir(id), REPRO_ARTIFACTS[0])
+        )
+
+    # ids per bucket
+    def get_buckets(self):
+        buckets = {}
+        for id, entry in self.index.items():
+            buckets.setdefault(entry["bucket"], []).append(id)
+        return buckets
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import json
+from .BasicRunner import Runner, RunnerOutcome, RunnerFile, lazy_runner
+from .CodeCompareRunner import ThreadingCodeCompareRunner
+from .ReproCorpus import ReproCorpus
+from .AFC import AFC
+
+
+# Re-validation of a repro corpus (see ReproCorpus) against the configured
+# DuT (e.g. after a DuT fix)
+# All repros are executed on ReproCorpusRunner_parallel concurrent runners
+# and categorized (AFC, see AFC.hint). Reference results are reused from the
+# reference store (RefCovRunner_store_dir) and setup artifacts from the setup
+# cache (SetupCache_dir), if configured -> mostly DuT runs.
+# Status per repro:
+#  FIXED .. completes
+#  FAILING .. fails with the stored category
+#  CHANGED .. fails with another category
+#  <outcome> .. other outcomes (e.g. TIMEOUT)
+# Status per bucket (first match): FAILING (any repro), CHANGED (any repro),
+# FIXED (all repros), OTHER
+# Results are written to report.log and report.json and returned as
+# (COMPLETE, report) with report = {"repros": ..., "buckets": ...}
+class ReproCorpusRunner(Runner):
+    def setup(self, config):
+
+        super().setup(config)
+
+        self.corpus = ReproCorpus(config["ReproCorpus_dir"])
+        self.parallel = config.get("ReproCorpusRunner_parallel", 4)
+
+        self.subconfig = config.copy()
+        self.subconfig["dir"] = self.get_dir()
+        self.subconfig["RefCovRunner_coverage"] = None
+        self.subconfig["RunMemo"] = None
+
+        AFC_Categorizer_class = config.get("AFC_Categorizer", None)
+        if AFC_Categorizer_class is None:
+            AFC_Categorizer_class = AFC
+        self.AFC_Categorizer = AFC_Categorizer_class(config)
+
+        if self.log:
+            self.reportlog = RunnerFile(dir=self.get_dir(), name="report.log")
+        self.report = None
+
+    @lazy_runner
+    def codecomparerunners(self):
+        return [
+            ThreadingCodeCompareRunner(config=self.subconfig)
+            for i in range(self.parallel)
+        ]
+
+    def _status(self, entry, code_block, runner):
+        ret = runner.get_result()
+        if ret[0] == RunnerOutcome.COMPLETE:
+            return ("FIXED", None)
+        if ret[0] != RunnerOutcome.ERROR:
+            return (ret[0].name, None)
+        category = self.AFC_Categorizer.hint(
+            code_block,
+            runner.compare_runner.ref_mstate,
+            runner.compare_runner.dut_mstate,
+        )
+        if category == entry["category"]:
+            return ("FAILING", category)
+        return ("CHANGED", category)
+
+    @staticmethod
+    def bucket_status(statuses):
+        for status in ["FAILING", "CHANGED"]:
+            if status in statuses:
+                return status
+        if all(status == "FIXED" for status in statuses):
+            return "FIXED"
+        return "OTHER"
+
+    def task(self):
+        entries = self.corpus.get_entries()
+        ids = sorted(entries)
+        runners = self.codecomparerunners
+
+        # repros in batches of concurrent runs
+        repros = {}
+        for start in range(0, len(ids), len(runners)):
+            end = start + len(runners)
+            batch = []
+            for runner, id in zip(runners, ids[start:end]):
+                code_block = self.corpus.load_code_block(id)
+                runner.run(blocking=False, code=code_block.as_code(), **self.runkwargs)
+                batch.append((runner, id, code_block))
+            for runner, id, code_block in batch:
+                runner.wait()
+                status, category = self._status(entries[id], code_block, runner)
+                repros[id] = {
+                    "bucket": entries[id]["bucket"],
+                    "status": status,
+                    "category": category,
+                }
+
+        buckets = {}
+        for bucket, bucket_ids in self.corpus.get_buckets().items():
+            statuses = [repros[id]["status"] for id in bucket_ids]
+            buckets[bucket] = {
+                "status": self.bucket_status(statuses),
+                "repros": len(bucket_ids),
+                "counts": {s: statuses.count(s) for s in sorted(set(statuses))},
+                "categories": sorted(
+                    {
+                        repros[id]["category"]
+                        for id in bucket_ids
+                        if repros[id]["status"] == "CHANGED"
+                    }
+                ),
+            }
+        self.report = {"repros": repros, "buckets": buckets}
+        return (RunnerOutcome.COMPLETE, self.report)
+
+    def task_post(self, ret):
+        if self.log and self.report is not None:
+            lines = ""
+            for bucket, b in sorted(self.report["buckets"].items()):
+                lines += f"{b['status']} {bucket} repros={b['repros']} {b['counts']}"
+                if len(b["categories"]) > 0:
+                    lines += f" categories={b['categories']}"
+                lines += "\n"
+            self.reportlog.set_content(lines)
+            with open(self.get_dir() + "/report.json", "w") as f:
+                json.dump(self.report, f, indent=2, sort_keys=True)
+        return ret
+
+    def run_handler(self, blocking, **kwargs):
+        self.runkwargs = kwargs
+        return super().run_handler(blocking=blocking, **kwargs)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# Bounded in-session memo of run results (e.g. CodeCompareRunner, CodeCheckRunner)
+# During reduction and minimization the same code is executed several times
+# (e.g. init fragments, good prefix, final result) -> earlier results are
+# returned without re-execution.
+# Entries are identified by the configuration of the runner (keys affecting
+# results, see CONFIG_KEYS), the code and the timeout. Least recently used entries
+# are dropped, if max_entries is exceeded.
+# Shared between runners (and threads) by passing it in the config ("RunMemo").
+# NOTE: results (machine states) are shared -> must not be modified by users
+class RunMemo:
+
+    # outcomes worth keeping (timeouts may depend on host load)
+    OUTCOMES = ["COMPLETE", "ERROR", "IGNORE"]
+
+    # config entries affecting results (all others, e.g. dirs, logging or
+    # objects shared between runners, are ignored)
+    CONFIG_KEYS = [
+        # build, simulators, DuT and coverage
+        "BuildRunner_class",
+        "RefCovRunner_ref",
+        "RefCovRunner_coverage",
+        "CompareRunner_dut",
+        "DuTGDBRunner_dut",
+        "gcc_bin",
+        "spike_bin",
+        "sail_riscv_bin",
+        "qemu_path",
+        "vp_path",
+        "ara_tb_bin",
+        "riscvovpsim_bin",
+        "gdb_bin",
+        "RISCVOVPSIMCover_extensions",
+        "RISCVOVPSIMCover_sum_enable",
+        # isa
+        "rvisacfg",
+        "float_flen",
+        "quirk_ara_csrs",
+        # memory layout
+        "memstart",
+        "memlen",
+        "xmemstart",
+        "xmemlen",
+        "dmemstart",
+        "dmemlen",
+        "dumpfile_reserve",
+        # outcomes (exceptions, build errors, hangs) and results
+        "stop_on_exception",
+        "skip_on_exception",
+        "build_ignore_error",
+        "AraRunner_count_hang_as_error",
+        "CompareRunner_mstate_diff_full",
+        "commit_log",
+        "FakeDuTRunner_error_rate",
+        "FakeDuTRunner_timeout_rate",
+    ]
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # entries are not serialized (e.g. config of MachineState in json files)
+    def __getstate__(self):
+        return {"max_entries": self.max_entries}
+
+    def __setstate__(self, d):
+        self.__init__(d["max_entries"])
+
+    # identity of runner configuration (e.g. coverage enabled or not)
+    @classmethod
+    def config_signature(cls, kind, config):
+        items = [(key, repr(config.get(key, None))) for key in cls.CONFIG_KEYS]
+        return hashlib.sha1(repr([kind, items]).encode()).hexdigest()
+
+    @staticmethod
+    def get_key(signature, code, timeout):
+        h = hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+        return (signature, h, timeout)
+
+    # returns entry or None
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    # entry .. tuple starting with the run result (outcome, ...)
+    def put(self, key, entry):
+        if self.max_entries <= 0 or entry[0][0].name not in self.OUTCOMES:
+            return
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
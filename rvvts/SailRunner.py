@@ -9,7 +9,9 @@
 
 from .MachineState import MachineState, DumpFile
 from .BasicRunner import ProcessTimeoutRunner, RunnerOutcome, RunnerFile
+from .SetupCache import SetupCache
 
+import os
 import re
 import json
 import math
@@ -17,6 +19,10 @@ import subprocess
 
 
 class SailRunner(ProcessTimeoutRunner):
+
+    # format of commit log (see CommitLog)
+    COMMIT_LOG_FORMAT = "sail"
+
     def setup(self, config=None):
 
         super().setup(config=config)
@@ -33,7 +39,52 @@ class SailRunner(ProcessTimeoutRunner):
 
         #
         # Create sail_riscv.cfg file
+        # (depends only on sail-riscv binary and configuration -> generate once and share between runners)
         #
+        cfgstr = SetupCache.get(
+            config,
+            "SailRunner_cfg",
+            [
+                SetupCache.file_key(sail_riscv_bin),
+                repr(config["rvisacfg"]),
+                config["memstart"],
+                config["memlen"],
+            ],
+            lambda: self.gen_cfg(config),
+        )
+        self.cfgfile = RunnerFile(
+            dir=self.get_dir(), name="sail-riscv.cfg", content=cfgstr
+        )
+
+        # Create command
+        program = [
+            sail_riscv_bin,
+            "--config",
+            str(self.cfgfile.get_name()),
+            "--use-abi-names",
+            "--stop-at-pc",
+            str(config["breakpoint"]),
+            "--dump-memory",
+            "mem",
+        ]
+
+        # per instruction commit log (see TraceCompareRunner)
+        self.commit_log = None
+        if config.get("commit_log", False):
+            self.commit_log = self.get_dir() + "/commit.log"
+            program += [
+                "--trace-instr",
+                "--trace-reg",
+                "--trace-mem",
+                "--trace-output",
+                self.commit_log,
+            ]
+
+        self.set_program(program)
+
+    def gen_cfg(self, config):
+
+        sail_riscv_bin = config["sail_riscv_bin"]
 
         rvisacfg = config["rvisacfg"]
         xlen = rvisacfg.get_xlen()
@@ -103,28 +154,13 @@ class SailRunner(ProcessTimeoutRunner):
         # Apply memory configuration
         self.cfg_set_mem(cfg, config["memstart"], config["memlen"])
 
-        # Create the adjusted sail-riscv cfg file
-        cfgstr = json.dumps(cfg)
-        self.cfgfile = RunnerFile(
-            dir=self.get_dir(), name="sail-riscv.cfg", content=cfgstr
-        )
-
-        # Create command
-        self.set_program(
-            [
-                sail_riscv_bin,
-                "--config",
-                str(self.cfgfile.get_name()),
-                "--use-abi-names",
-                "--stop-at-pc",
-                str(config["breakpoint"]),
-                "--dump-memory",
-                "mem",
-            ]
-        )
+        return json.dumps(cfg)
 
     def task_pre(self):
         self.dumpfile.delete()
+        self.persist_reset()
+        if self.commit_log is not None and os.path.exists(self.commit_log):
+            os.remove(self.commit_log)
 
     def task_post(self, result):
         outcome, ret = super().task_post(result)
@@ -150,13 +186,12 @@ class SailRunner(ProcessTimeoutRunner):
             return (outcome, None)
 
         try:
-            regs, state = self.dumpfile.extract()
+            mstate = MachineState.from_dumpfile(self.config, self.dumpfile)
+            self.persist_artifact("sim_mstate", self.mstate_filename, mstate.save)
 
         except Exception as e:
             return (RunnerOutcome.ERROR, e)
 
-        mstate = MachineState(self.config, (regs, state))
-        mstate.save(self.mstate_filename)
         return (outcome, mstate)
 
     def run_handler(self, binary="", **kwargs):
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+
+
+# Cache for immutable setup artifacts of runners (e.g. build harness, linker
+# script, sail-riscv config)
+# Artifacts are identified by kind and a key (all configuration values the
+# artifact depends on) and are shared
+#  * between all runners of a process (memory), and
+#  * between processes (files in config["SetupCache_dir"], if set)
+# NOTE: artifacts must be json serializable and must not be modified by users
+class SetupCache:
+
+    _mem = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def key_hash(kind, key):
+        keystr = json.dumps([kind, key], sort_keys=True, default=repr)
+        return hashlib.sha1(keystr.encode()).hexdigest()
+
+    @staticmethod
+    def file_key(filename):
+        # identity of an external file (e.g. simulator binary) -> invalidates
+        # cached artifacts if the file is replaced
+        try:
+            st = os.stat(filename)
+            return [filename, st.st_size, st.st_mtime_ns]
+        except OSError:
+            return [filename, None, None]
+
+    @classmethod
+    def _load(cls, filename):
+        try:
+            with open(filename, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def _store(cls, cache_dir, filename, artifact):
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # write to temporary file and rename -> atomic for concurrent processes
+            fd, tmpname = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(artifact, f)
+            os.replace(tmpname, filename)
+        except OSError as e:
+            print(f"SetupCache: WARNING: unable to store {filename}: {e}")
+
+    @classmethod
+    def get(cls, config, kind, key, create_f):
+        khash = cls.key_hash(kind, key)
+        memkey = kind + "_" + khash
+
+        with cls._lock:
+            artifact = cls._mem.get(memkey, None)
+        if artifact is not None:
+            return artifact
+
+        cache_dir = config.get("SetupCache_dir", None)
+        filename = None
+        if cache_dir:
+            filename = os.path.join(cache_dir, memkey + ".json")
+            artifact = cls._load(filename)
+
+        if artifact is None:
+            artifact = create_f()
+            if filename is not None:
+                cls._store(cache_dir, filename, artifact)
+
+        with cls._lock:
+            # keep first entry if another thread was faster
+            artifact = cls._mem.setdefault(memkey, artifact)
+        return artifact
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._mem.clear()
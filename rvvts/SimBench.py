@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import json
+import time
+import random
+from .RVISACfg import RVISACfg
+from .BasicRunner import RunnerOutcome, RunnerFile
+from .MachineState import MachineState
+from .BuildRunner import BuildRunner
+from .DuTGDBRunner import DuTGDBRunner
+from .SpikeRunner import SpikeRunner
+from .SailRunner import SailRunner
+from .QEMURunner import QEMURunner
+from .VPRunner import VPRunner
+from .AraRunner import AraRunner
+from .FakeRunner import FakeSpikeRunner, FakeDuTRunner
+from .ISG import ProgramMultiGenerator
+
+# simulators known by sim_bench (name -> runner class and additional config)
+SIMBENCH_SIMULATORS = {
+    "Spike": (SpikeRunner, {}),
+    "Sail": (SailRunner, {}),
+    "QEMU": (DuTGDBRunner, {"DuTGDBRunner_dut": QEMURunner}),
+    "VP": (DuTGDBRunner, {"DuTGDBRunner_dut": VPRunner}),
+    "ARA": (AraRunner, {}),
+    # stand-ins without external tools (see FakeRunner)
+    "FakeSpike": (FakeSpikeRunner, {}),
+    "FakeDuT": (FakeDuTRunner, {}),
+}
+
+# stages reported by sim_bench (in this order)
+SIMBENCH_STAGES = ["build", "launch", "execute", "extract", "compare"]
+
+
+def sim_bench_table(results):
+    header = ["simulator", "vlen", "fragments", "ok/total"]
+    header += [stage + "[ms]" for stage in SIMBENCH_STAGES] + ["total[ms]"]
+    rows = []
+    for r in results:
+        row = [
+            r["simulator"],
+            str(r["vlen"]),
+            str(r["fragments"]),
+            str(r["completes"]) + "/" + str(r["programs"]),
+        ]
+        for stage in SIMBENCH_STAGES + ["total"]:
+            value = r["stages"].get(stage, None) if stage != "total" else r["total"]
+            row.append("-" if value is None else f"{value * 1000.0:.2f}")
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = []
+    for row in [header] + rows:
+        lines.append("  ".join(col.rjust(w) for col, w in zip(row, widths)))
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+# Cross-simulator benchmark over a VLEN x fragment count matrix
+# Every matrix point runs the same fixed-seed corpus of programs through all
+# simulators and reports the mean per-program latency of each stage:
+#  build .. assembling/linking (once per program, shared by all simulators)
+#  launch .. process start (+ debug stub ready for DuTGDBRunner)
+#  execute .. simulation until breakpoint and dump
+#  extract .. machine state extraction from dump (fingerprint and registers)
+#  compare .. comparison of extracted state with state of first simulator (reference)
+# returns list of result dicts (also stored as json, if json_filename is given)
+def sim_bench(
+    config,
+    simulators=["Spike", "QEMU"],
+    vlens=[128, 512],
+    fragments=[10, 100, 1000],
+    programs=10,
+    seed=0,
+    timeout=10.0,
+    json_filename=None,
+    log=True,
+):
+
+    base_rvisacfg = config["rvisacfg"]
+    results = []
+
+    for vlen in vlens:
+        vconfig = config.copy()
+        vconfig["rvisacfg"] = RVISACfg(
+            xlen=base_rvisacfg.get_xlen(),
+            extensions_under_test=base_rvisacfg.get_under_test(),
+            vlen=vlen,
+            velen=base_rvisacfg.get_velen(),
+        )
+        vconfig["binary"] = RunnerFile(
+            dir=config["dir"], name="simbench.bin"
+        ).get_name()
+        BuildRunner_class = config.get("BuildRunner_class", None)
+        if BuildRunner_class is None:
+            BuildRunner_class = BuildRunner
+        build_runner = BuildRunner_class(config=vconfig)
+        vconfig["breakpoint"] = build_runner.get_breakpoint()
+
+        sim_runners = {}
+        for name in simulators:
+            sim_class, sim_config = SIMBENCH_SIMULATORS[name]
+            sconfig = vconfig.copy()
+            sconfig.update(sim_config)
+            sim_runners[name] = sim_class(config=sconfig)
+
+        generator = ProgramMultiGenerator(config=vconfig)
+
+        for nfragments in fragments:
+            # fixed seed per matrix point -> same corpus for every run of the benchmark
+            random.seed(f"{seed}_{vlen}_{nfragments}")
+            corpus = [
+                generator.gen_code_block(
+                    min_fragments=nfragments, max_fragments=nfragments
+                )
+                for i in range(programs)
+            ]
+
+            times = {name: dict.fromkeys(SIMBENCH_STAGES, 0.0) for name in simulators}
+            counts = {
+                name: dict.fromkeys(["completes", "errors", "timeouts"], 0)
+                for name in simulators
+            }
+
+            for code in corpus:
+                start = time.perf_counter()
+                res = build_runner.run(
+                    code=code.as_code(), blocking=True, timeout=timeout
+                )
+                build_time = time.perf_counter() - start
+                if res[0] != RunnerOutcome.COMPLETE:
+                    raise Exception("sim_bench: build failed: " + str(res[1]))
+
+                ref_mstate = None
+                for name in simulators:
+                    runner = sim_runners[name]
+                    runner.reset_stage_times()
+                    res = runner.run(
+                        binary=vconfig["binary"], blocking=True, timeout=timeout
+                    )
+                    times[name]["build"] += build_time
+                    for stage, seconds in runner.get_stage_times().items():
+                        times[name][stage] = times[name].get(stage, 0.0) + seconds
+
+                    if res[0] == RunnerOutcome.TIMEOUT:
+                        counts[name]["timeouts"] += 1
+                        continue
+                    if res[0] != RunnerOutcome.COMPLETE or not isinstance(
+                        res[1], MachineState
+                    ):
+                        counts[name]["errors"] += 1
+                        continue
+                    counts[name]["completes"] += 1
+
+                    # states are extracted lazily on first use (see
+                    # MachineState.from_dumpfile) -> extract now (extract stage)
+                    start = time.perf_counter()
+                    res[1].dstate
+                    times[name]["extract"] += time.perf_counter() - start
+
+                    if ref_mstate is None:
+                        ref_mstate = res[1]
+                        continue
+                    start = time.perf_counter()
+                    res[1].compare(ref_mstate)
+                    times[name]["compare"] += time.perf_counter() - start
+
+            for name in simulators:
+                stages = {
+                    stage: times[name][stage] / programs for stage in SIMBENCH_STAGES
+                }
+                if name == simulators[0]:
+                    # reference -> not compared
+                    stages["compare"] = None
+                result = {
+                    "simulator": name,
+                    "vlen": vlen,
+                    "fragments": nfragments,
+                    "programs": programs,
+                    "seed": seed,
+                    "stages": stages,
+                    "total": sum(v for v in stages.values() if v is not None),
+                }
+                result.update(counts[name])
+                results.append(result)
+                if log:
+                    print(
+                        f"sim_bench: {name} vlen={vlen} fragments={nfragments}: "
+                        + f"{result['completes']}/{programs} complete"
+                    )
+
+        for runner in sim_runners.values():
+            runner.close()
+        build_runner.close()
+
+    if log:
+        print(sim_bench_table(results))
+
+    if json_filename is not None:
+        with open(json_filename, "w") as f:
+            json.dump(
+                {
+                    "rvisacfg": repr(base_rvisacfg),
+                    "simulators": simulators,
+                    "stages": SIMBENCH_STAGES,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    return results
@@ -6,11 +6,16 @@
 # SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
 #
 
+import os
 from .MachineState import MachineState, DumpFile
 from .BasicRunner import ProcessTimeoutRunner, RunnerOutcome, RunnerFile
 
 
 class SpikeRunner(ProcessTimeoutRunner):
+
+    # format of commit log (see CommitLog)
+    COMMIT_LOG_FORMAT = "spike"
+
     def setup(self, config=None):
 
         super().setup(config=config)
@@ -33,20 +38,29 @@ class SpikeRunner(ProcessTimeoutRunner):
         )
 
         # create command
-        self.set_program(
-            [
-                config["spike_bin"],
-                "--isa",
-                config["rvisacfg"].to_isa_str_alt(),
-                "-d",
-                "-m" + hex(config["memstart"]) + ":" + hex(config["memlen"]),
-                "--pc=" + hex(config["xmemstart"]),
-                "--debug-cmd=" + str(self.cmdfile.get_name()),
-            ]
-        )
+        program = [
+            config["spike_bin"],
+            "--isa",
+            config["rvisacfg"].to_isa_str_alt(),
+            "-d",
+            "-m" + hex(config["memstart"]) + ":" + hex(config["memlen"]),
+            "--pc=" + hex(config["xmemstart"]),
+            "--debug-cmd=" + str(self.cmdfile.get_name()),
+        ]
+
+        # per instruction commit log (see TraceCompareRunner)
+        self.commit_log = None
+        if config.get("commit_log", False):
+            self.commit_log = self.get_dir() + "/commit.log"
+            program += ["--log-commits", "--log=" + self.commit_log]
+
+        self.set_program(program)
 
     def task_pre(self):
         self.dumpfile.delete()
+        self.persist_reset()
+        if self.commit_log is not None and os.path.exists(self.commit_log):
+            os.remove(self.commit_log)
 
     def task_post(self, result):
         outcome, ret = super().task_post(result)
@@ -55,9 +69,8 @@ class SpikeRunner(ProcessTimeoutRunner):
             return (outcome, None)
 
         try:
-            regs, state = self.dumpfile.extract()
-            mstate = MachineState(self.config, (regs, state))
-            mstate.save(self.mstate_filename)
+            mstate = MachineState.from_dumpfile(self.config, self.dumpfile)
+            self.persist_artifact("sim_mstate", self.mstate_filename, mstate.save)
             return (outcome, mstate)
         except Exception as e:
             return (RunnerOutcome.ERROR, e)
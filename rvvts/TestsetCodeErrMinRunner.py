@@ -10,6 +10,7 @@ from .CodeBlock import CodeStats, CodeBlock
 from .BasicRunner import Runner, RunnerOutcome, RunnerFile
 from .CodeErrMinRunner import CodeErrMinRunner
 
+import os
 import math
 import glob
 
@@ -41,6 +42,8 @@ class TestsetCodeErrMinRunner(Runner):
         # runner for register values
         subconfig = config.copy()
         subconfig["dir"] = self.get_dir()
+        # timeout triage next to own dir (see CodeErrMinRunner)
+        subconfig["TimeoutTriageRunner_dir"] = os.path.dirname(self.get_dir())
         self.codeerrminrunner = CodeErrMinRunner(subconfig)
 
     # subruns subrun laststate
@@ -111,10 +114,18 @@ class TestsetCodeErrMinRunner(Runner):
                 + "\n"
             )
 
+        # written on demand (see Runner.persist_artifact)
+        self.persist_reset()
         if self.code_block:
-            self.code_block.save(self.dir + "/code_block.json")
+            self.persist_artifact(
+                "code_block", self.dir + "/code_block.json", self.code_block.save
+            )
         if self.res_code_block:
-            self.res_code_block.save(self.dir + "/res_code_block.json")
+            self.persist_artifact(
+                "code_block",
+                self.dir + "/res_code_block.json",
+                self.res_code_block.save,
+            )
 
         return ret
 
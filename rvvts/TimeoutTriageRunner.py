@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+import queue
+import threading
+from .BasicRunner import Runner, RunnerOutcome, lazy_runner
+from .CodeCheckRunner import CodeCheckRunner
+from .CodeCompareRunner import CodeCompareRunner
+
+
+# Background triage of timed out tests
+# Tests are queued with submit() and re-executed in a background thread with
+# an extended timeout (TimeoutTriageRunner_timeout_factor) and low priority
+# (processes with nice TimeoutTriageRunner_nice). The caller continues
+# immediately.
+# Classification:
+#  REF_HANG .. reference alone does not complete
+#  DUT_HANG .. reference completes, DuT still times out
+#  FLAKE .. completes and matches (e.g. host load)
+#  FLAKE_ERROR .. completes with longer budget, but states differ
+#  UNKNOWN .. other outcomes (e.g. build errors)
+# DUT_HANG and FLAKE_ERROR cases are kept and can be fetched with pop_cases
+# (they are not minimized automatically)
+class TimeoutTriageRunner(Runner):
+
+    REF_HANG = "REF_HANG"
+    DUT_HANG = "DUT_HANG"
+    FLAKE = "FLAKE"
+    FLAKE_ERROR = "FLAKE_ERROR"
+    UNKNOWN = "UNKNOWN"
+
+    def setup(self, config):
+
+        super().setup(config)
+
+        self.timeout_factor = config.get("TimeoutTriageRunner_timeout_factor", 4.0)
+        # maximum number of queued tests (further tests are dropped)
+        self.max_queue = config.get("TimeoutTriageRunner_max_queue", 100)
+        # categories kept for minimization
+        self.keep_categories = [self.DUT_HANG, self.FLAKE_ERROR]
+
+        self.subconfig = config.copy()
+        self.subconfig["dir"] = self.get_dir()
+        self.subconfig["RefCovRunner_coverage"] = None
+        self.subconfig["ProcessTimeoutRunner_nice"] = config.get(
+            "TimeoutTriageRunner_nice", 10
+        )
+
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.submitted = 0
+        self.dropped = 0
+        self.categories = {}
+        self.cases = []
+
+    @lazy_runner
+    def codecheckrunner(self):
+        return CodeCheckRunner(config=self.subconfig)
+
+    @lazy_runner
+    def codecomparerunner(self):
+        return CodeCompareRunner(config=self.subconfig)
+
+    # queue timed out test (code_block) for triage
+    # returns False, if the queue is full (test dropped)
+    def submit(self, code_block, timeout=1.0, **kwargs):
+        with self.lock:
+            if self.queue.qsize() >= self.max_queue:
+                self.dropped += 1
+                return False
+            self.submitted += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.__threadf, daemon=True)
+                self.thread.start()
+        self.queue.put((code_block, timeout, kwargs))
+        return True
+
+    def __threadf(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                break
+            code_block, timeout, kwargs = item
+            try:
+                category = self.triage(code_block, timeout, **kwargs)
+            except Exception as e:
+                print(f"TimeoutTriageRunner: WARNING: triage failed: {e}")
+                category = self.UNKNOWN
+            with self.lock:
+                self.categories[category] = self.categories.get(category, 0) + 1
+                if category in self.keep_categories:
+                    self.cases.append((category, code_block))
+                idx = sum(self.categories.values())
+            if self.log:
+                code_block.save(self.get_dir() + f"/{category}-{idx:010d}.json")
+            self.queue.task_done()
+
+    def triage(self, code_block, timeout, **kwargs):
+        code = code_block.as_code()
+        timeout = timeout * self.timeout_factor
+
+        res = self.codecheckrunner.run(
+            blocking=True, code=code, timeout=timeout, **kwargs
+        )
+        if res[0] == RunnerOutcome.TIMEOUT:
+            return self.REF_HANG
+        if res[0] != RunnerOutcome.COMPLETE:
+            return self.UNKNOWN
+
+        res = self.codecomparerunner.run(
+            blocking=True, code=code, timeout=timeout, **kwargs
+        )
+        if res[0] == RunnerOutcome.TIMEOUT:
+            return self.DUT_HANG
+        if res[0] == RunnerOutcome.COMPLETE:
+            return self.FLAKE
+        if res[0] == RunnerOutcome.ERROR:
+            return self.FLAKE_ERROR
+        return self.UNKNOWN
+
+    # wait until all queued tests are triaged
+    def wait_idle(self):
+        self.queue.join()
+
+    # returns and removes triaged cases kept for minimization
+    # -> list of (category, code_block)
+    def pop_cases(self):
+        with self.lock:
+            cases = self.cases
+            self.cases = []
+        return cases
+
+    def get_stats(self):
+        with self.lock:
+            stats = {
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "pending": self.queue.qsize(),
+            }
+            stats.update(self.categories)
+        return stats
+
+    def _close(self, seen):
+        # stop triage thread before child runners are closed
+        # (pending tests are discarded)
+        if self.thread is not None:
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                self.queue.task_done()
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        super()._close(seen)
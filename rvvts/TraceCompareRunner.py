@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+#
+
+from .BasicRunner import RunnerOutcome
+from .CodeBlock import CodeBlock, CodeFragment, CodeFragmentList
+from .CodeCompareRunner import CodeCompareRunner
+from .SpikeRunner import SpikeRunner
+from .CommitLog import COMMIT_LOG_MARKER, read_commit_log, commit_log_divergence
+
+
+# CodeCompareRunner with lockstep comparison of commit logs
+# Reference and DuT write per instruction commit logs (config "commit_log",
+# see SpikeRunner, SailRunner), which are compared record by record after
+# the run (see CommitLog). The first divergent instruction (with its register
+# writes) is reported as error, even if the end states are equal.
+# Code built with mark_code contains a marker in front of every main fragment
+# -> divergence.fragment is the index of the fragment containing the first
+# divergent instruction (see commit_log_code_reduction in CodeErrMinRunner)
+# NOTE: reference and DuT need commit log support (see is_supported); the
+# reference is always executed (RefStateStore disabled)
+class TraceCompareRunner(CodeCompareRunner):
+
+    @staticmethod
+    def commit_log_format(runner_class):
+        if runner_class is None:
+            runner_class = SpikeRunner
+        return getattr(runner_class, "COMMIT_LOG_FORMAT", None)
+
+    @staticmethod
+    def is_supported(config):
+        return (
+            TraceCompareRunner.commit_log_format(config.get("RefCovRunner_ref", None))
+            is not None
+            and TraceCompareRunner.commit_log_format(
+                config.get("CompareRunner_dut", None)
+            )
+            is not None
+        )
+
+    def setup(self, config):
+
+        config = config.copy()
+        config["commit_log"] = True
+        config["RefCovRunner_store_dir"] = None
+        # commit logs are read after each run -> no memo
+        config["RunMemo"] = None
+
+        super().setup(config)
+
+        # compared write kinds (csrs differ in implicit updates between simulators)
+        self.kinds = config.get("TraceCompareRunner_compare", ["x", "f", "v", "mem"])
+        self.divergence = None
+
+    # code block as code with marker in front of every main fragment
+    def mark_code(self, code_block):
+        marker = (
+            ".option push\n.option norvc\n    " + COMMIT_LOG_MARKER + "\n.option pop"
+        )
+        marked = CodeFragmentList()
+        for fragment in code_block.main_fragments.as_list():
+            marked.add(CodeFragment(marker))
+            marked.add(fragment)
+        return CodeBlock(
+            init_fragments=code_block.init_fragments,
+            main_fragments=marked,
+            deinit_fragments=code_block.deinit_fragments,
+        ).as_code()
+
+    def task_run(self):
+        self.divergence = None
+        res = super().task_run()
+        if res[0] not in [RunnerOutcome.COMPLETE, RunnerOutcome.ERROR]:
+            return res
+        ref_runner = self.compare_runner.CompareRunner_refcov.RefCovRunner_ref
+        dut_runner = self.compare_runner.CompareRunner_dut
+        try:
+            self.divergence = commit_log_divergence(
+                read_commit_log(ref_runner.commit_log, ref_runner.COMMIT_LOG_FORMAT),
+                read_commit_log(dut_runner.commit_log, dut_runner.COMMIT_LOG_FORMAT),
+                kinds=self.kinds,
+            )
+        except OSError as e:
+            print(f"TraceCompareRunner: WARNING: unable to read commit logs: {e}")
+            return res
+        if self.divergence is None:
+            return res
+        return (RunnerOutcome.ERROR, self.divergence)
@@ -10,6 +10,10 @@ from .BasicRunner import ProcessTimeoutRunner
 
 
 class VPRunner(ProcessTimeoutRunner):
+
+    # supported debug link transports (see DuTGDBRunner)
+    DEBUG_LINK_TRANSPORTS = ["tcp"]
+
     def setup(self, config=None):
 
         super().setup(config=config)
@@ -26,12 +30,18 @@ class VPRunner(ProcessTimeoutRunner):
             "--error-on-zero-traphandler=true",
             "--intercept-syscalls",
             "--debug-mode",
-            "--debug-port",
-            str(config["debug_port"]),
         ]
         if rvisacfg.is_needed("zfh"):
             program.append("--en-ext-Zfh")
         self.set_program(program)
 
-    def run_handler(self, binary="", **kwargs):
-        return super().run_handler(parameters=[binary], **kwargs)
+        # fixed debug port (legacy) -> used if no debug_link is given on run
+        self.debug_port = config.get("debug_port", None)
+
+    def run_handler(self, binary="", debug_link=None, **kwargs):
+        debug_port = self.debug_port
+        if debug_link is not None:
+            debug_port = debug_link.port
+        return super().run_handler(
+            parameters=["--debug-port", str(debug_port), binary], **kwargs
+        )
@@ -8,10 +8,14 @@
 
 from .RVISACfg import *
 
+from .BinFormat import *
 from .CodeBlock import *
 from .MachineState import *
 
 from .BasicRunner import *
+from .SetupCache import *
+from .RunMemo import *
+from .RefStateStore import *
 
 from .BuildRunner import *
 from .ArchiveRunner import *
@@ -27,16 +31,28 @@ from .QEMURunner import *
 from .VPRunner import *
 from .AraRunner import *
 from .SailRunner import *
+from .QEMUSnapshotCompareRunner import *
+from .CommitLog import *
+from .TraceCompareRunner import *
 
+from .ISG_Exclusion import *
 from .ISG_Base import *
 from .ISG_RVI import *
 from .ISG_RVB import *
 from .ISG_RVF import *
 from .ISG_RVV import *
 from .ISG import *
+from .SimBench import *
 from .CovGuidedFuzzerGenRunner import *
 
+from .Artifact import *
 from .AFC import *
+from .FailureBuckets import *
+from .TimeoutTriageRunner import *
 from .CodeErrMinRunner import *
+from .MinimizeService import *
 from .FuzzCodeErrMinRunner import *
 from .TestsetCodeErrMinRunner import *
+from .ReproCorpus import *
+from .ReproCorpusRunner import *
+from .FakeRunner import *
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# (C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz
+#
+# SPDX-License-Identifier: BSD 3-clause "New" or "Revised" License
+
+import os
+import argparse
+import config_base
+import config_host
+import rvvts
+
+parser = argparse.ArgumentParser(
+    description="Cross-simulator benchmark (VLEN x fragment count matrix, per-stage latencies)",
+    epilog="(C) 2026 Manfred Schlaegl <manfred.schlaegl@jku.at>, Institute for Complex Systems, JKU Linz",
+)
+parser.add_argument(
+    "-s",
+    "--simulators",
+    default="Spike,QEMU",
+    help="comma separated simulators (first is reference for compare); "
+    + "available: "
+    + ",".join(rvvts.SIMBENCH_SIMULATORS.keys()),
+)
+parser.add_argument("-v", "--vlens", default="128,512", help="comma separated VLENs")
+parser.add_argument(
+    "-f", "--fragments", default="10,100,1000", help="comma separated fragment counts"
+)
+parser.add_argument(
+    "-x", "--extensions", default="v", help="comma separated extensions under test"
+)
+parser.add_argument("-l", "--xlen", type=int, default=64)
+parser.add_argument(
+    "-n", "--programs", type=int, default=10, help="programs per matrix point"
+)
+parser.add_argument("-r", "--seed", type=int, default=0)
+parser.add_argument("-t", "--timeout", type=float, default=10.0)
+parser.add_argument("-d", "--dir", default=os.getcwd() + "/run/SimBench")
+parser.add_argument("-o", "--json", default=None, help="json output file")
+args = parser.parse_args()
+
+config = dict()
+config.update(config_base.config.copy())
+config.update(config_host.config.copy())
+config.update(
+    dict(
+        dir=args.dir,
+        rvisacfg=rvvts.RVISACfg(
+            xlen=args.xlen, extensions_under_test=args.extensions.split(","), velen=64
+        ),
+    )
+)
+os.makedirs(args.dir, exist_ok=True)
+
+rvvts.sim_bench(
+    config,
+    simulators=args.simulators.split(","),
+    vlens=[int(v) for v in args.vlens.split(",")],
+    fragments=[int(f) for f in args.fragments.split(",")],
+    programs=args.programs,
+    seed=args.seed,
+    timeout=args.timeout,
+    json_filename=args.json,
+)